@@ -5,15 +5,28 @@ Integrated with premium odds API fetcher
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from src.fetcher import NBAFetcher, normalize_name
-from src.analyzer import NBAAnalyzer
-from src.odds_fetcher import get_odds_fetcher, convert_to_simple_format
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta
+from src.env import load_env_file
+from src.names import normalize_name
+from src.odds_diff import OddsDiff, group_predictions, merge_predictions
+from src.picks_index import PicksIndex
+from src.picks_summary import summarize
+from src.records import as_rows, parse_date
+from src.shared_cache import InProcessCache, get_shared_cache, materialize
+from src.single_flight import SingleFlight
+from src.rate_limiter import get_rate_limiter
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from zoneinfo import ZoneInfo
+import sys
 import time
+import threading
 import os
 import json
-import pandas as pd
+
+# Only light modules are imported above. pandas / numpy (fetcher, analyzer, game log
+# store, parlays) and requests (odds fetcher) load with the services that need them,
+# so a cold start answering /, /api/health or cached picks never imports them.
+load_env_file()
 
 app = Flask(__name__)
 CORS(app)
@@ -34,38 +47,209 @@ def safe_float(x, default=0.0):
 # Initialize services
 print("Initializing NBA Props Predictor services...")
 
-try:
-    fetcher = NBAFetcher()
-    print("NBAFetcher initialized")
-except Exception as e:
-    print(f"Failed to initialize NBAFetcher: {e}")
-    raise
-
-try:
-    analyzer = NBAAnalyzer(num_games=10)
-    print("NBAAnalyzer initialized")
-except Exception as e:
-    print(f"Failed to initialize NBAAnalyzer: {e}")
-    raise
+# Record or replay all ESPN / Odds API traffic (see src/cassette.py)
+HTTP_CASSETTE = os.getenv('HTTP_CASSETTE')
+if HTTP_CASSETTE:
+    from src.cassette import install_cassette
+    cassette_mode = os.getenv('HTTP_CASSETTE_MODE', 'replay')
+    install_cassette(HTTP_CASSETTE, cassette_mode)
+    print(f"HTTP cassette {cassette_mode} mode ({HTTP_CASSETTE})")
 
 USE_REAL_ODDS = os.getenv('USE_REAL_ODDS', 'false').lower() == 'true'
 
+# PICKS_MODEL: "normal" (default), or Monte Carlo "bootstrap" / "negbin" (see src/simulation.py)
+PICKS_MODEL = os.getenv('PICKS_MODEL', 'normal')
+ANALYZER_NUM_GAMES = 10
+
+# Wall-clock cap (seconds) on fetching a full slate of game logs; keeps refreshes
+# inside the 120s Lambda timeout even when ESPN is slow
+GAMELOG_SLATE_BUDGET = float(os.getenv('GAMELOG_SLATE_BUDGET', '60'))
+
+# "gamelog" = one ESPN gamelog call per prop player; "boxscore" = pivot per-player
+# logs out of each slate team's recent box scores (~20 teams instead of ~250 players).
+# Box scores cover the team's last 15 games, so a player who sat some of them out
+# gets fewer games than from their gamelog, which lists their last 15 played.
+GAMELOG_SOURCE = os.getenv('GAMELOG_SOURCE', 'gamelog')
+
+# "frame" = game logs and schedules as pandas DataFrames; "records" = pandas-free
+# GameLogs and row dicts (src/records.py), with the same predictions
+GAMELOG_FORMAT = os.getenv('GAMELOG_FORMAT', 'frame')
+
+# "consensus" = score each prop at its median line; "ladder" = score every bookmaker's
+# line and price and keep the best-EV book per prop
+PICKS_LINE_MODE = os.getenv('PICKS_LINE_MODE', 'consensus')
+
+# Once picks expire, keep serving them (flagged stale) while one background thread
+# rebuilds, instead of making the next request wait for a full rebuild. Past
+# PICKS_MAX_STALE seconds beyond the TTL the request rebuilds synchronously again.
+# On Lambda the thread only runs while the container is handling a request.
+PICKS_STALE_WHILE_REVALIDATE = os.getenv('PICKS_STALE_WHILE_REVALIDATE', 'true').lower() == 'true'
+PICKS_MAX_STALE = float(os.getenv('PICKS_MAX_STALE', '21600'))
+
+# PICKS_BUILDER=false makes this instance a reader: it serves the picks a builder
+# instance published to the shared cache (CACHE_BACKEND, see src/shared_cache.py)
+# and never calls the Odds API itself
+PICKS_BUILDER = os.getenv('PICKS_BUILDER', 'true').lower() == 'true'
+
+# How often (seconds) an instance already holding fresh picks checks the shared cache for a newer build
+CACHE_POLL_INTERVAL = float(os.getenv('CACHE_POLL_INTERVAL', '5'))
+
+# Refreshes within a slate diff the new odds against the ones the cached picks were
+# built from and only re-analyze props whose offers moved; player ids, game logs and
+# the predictions of unchanged props are reused. POST /api/picks/refresh?full=true
+# (or PICKS_INCREMENTAL=false) rebuilds everything from scratch.
+PICKS_INCREMENTAL = os.getenv('PICKS_INCREMENTAL', 'true').lower() == 'true'
+
+# Upper bound (seconds) on one /api/parlays search
+PARLAY_BUDGET = float(os.getenv('PARLAY_BUDGET', '2.0'))
+
+# Build every service at import instead of on first use, e.g. where the init phase
+# is cheaper than the first request (provisioned concurrency, long-lived servers)
+PRELOAD_SERVICES = os.getenv('PRELOAD_SERVICES', 'false').lower() == 'true'
+
+# Services are built on first use and then kept for the life of the process
+_services = {}
+_services_lock = threading.RLock()
+
+
+def _service(name, build):
+    if name not in _services:
+        with _services_lock:
+            if name not in _services:
+                _services[name] = build()
+    return _services[name]
+
+
+def _loaded(name) -> bool:
+    """Whether the service has been built; health reports don't build anything."""
+    return _services.get(name) is not None
+
+
+def get_gamelog_store():
+    def build():
+        from src.gamelog_store import GameLogStore
+        try:
+            store = GameLogStore()
+            print(f"GameLogStore initialized ({store.path})")
+            return store
+        except Exception as e:
+            # Not fatal: without the store every refresh just refetches every player
+            print(f"GameLogStore unavailable, fetching full logs every refresh: {e}")
+            return None
+    return _service('gamelog_store', build)
+
+
+def get_http_cache():
+    def build():
+        from src.http_cache import ConditionalCache
+        try:
+            cache = ConditionalCache()
+            print(f"ConditionalCache initialized ({cache.directory})")
+            return cache
+        except Exception as e:
+            print(f"ConditionalCache unavailable, ESPN responses won't be revalidated: {e}")
+            return None
+    return _service('http_cache', build)
+
+
+def get_fetcher():
+    def build():
+        from src.fetcher import NBAFetcher
+        try:
+            fetcher = NBAFetcher(store=get_gamelog_store(), http_cache=get_http_cache(), log_format=GAMELOG_FORMAT)
+            print("NBAFetcher initialized")
+            return fetcher
+        except Exception as e:
+            print(f"Failed to initialize NBAFetcher: {e}")
+            raise
+    return _service('fetcher', build)
+
+
+def get_analyzer():
+    def build():
+        from src.analyzer import NBAAnalyzer
+        try:
+            analyzer = NBAAnalyzer(num_games=ANALYZER_NUM_GAMES, model=PICKS_MODEL)
+            print(f"NBAAnalyzer initialized (model: {analyzer.model})")
+            return analyzer
+        except Exception as e:
+            print(f"Failed to initialize NBAAnalyzer: {e}")
+            raise
+    return _service('analyzer', build)
+
+
+def get_odds_fetcher():
+    def build():
+        from src import odds_fetcher
+        try:
+            fetcher = odds_fetcher.get_odds_fetcher(use_real_api=USE_REAL_ODDS)
+            print(f"OddsFetcher initialized (mode: {'REAL API' if USE_REAL_ODDS else 'MOCK'})")
+            return fetcher
+        except Exception as e:
+            print(f"Failed to initialize OddsFetcher: {e}")
+            raise
+    return _service('odds_fetcher', build)
+
+
+def get_line_history_store():
+    """Every real odds snapshot is appended to the line-movement history (src/line_history.py); None with mock odds."""
+    def build():
+        if not USE_REAL_ODDS:
+            return None
+        from src.line_history import LineHistoryStore
+        try:
+            store = LineHistoryStore()
+            print(f"LineHistoryStore initialized ({store.path})")
+            return store
+        except Exception as e:
+            print(f"LineHistoryStore unavailable, line movements won't be recorded: {e}")
+            return None
+    return _service('line_history', build)
+
+
 try:
-    odds_fetcher = get_odds_fetcher(use_real_api=USE_REAL_ODDS)
-    print(f"OddsFetcher initialized (mode: {'REAL API' if USE_REAL_ODDS else 'MOCK'})")
+    shared_cache = get_shared_cache()
+    print(f"Shared cache initialized (backend: {shared_cache.name}, {'builder' if PICKS_BUILDER else 'reader'})")
 except Exception as e:
-    print(f"Failed to initialize OddsFetcher: {e}")
-    raise
+    # Not fatal: every instance just builds and caches for itself
+    print(f"Shared cache unavailable, caching in this process only: {e}")
+    shared_cache = InProcessCache()
 
-print("All services initialized successfully!\n")
+if PRELOAD_SERVICES:
+    for preload in (get_fetcher, get_analyzer, get_odds_fetcher, get_line_history_store):
+        preload()
+    print("All services initialized successfully!\n")
+else:
+    print("Services will be initialized on first use\n")
 
 
-# cache for 6 hours — Odds API tokens are limited
+# cache for up to 6 hours — Odds API tokens are limited. After each build the TTL
+# follows the odds refresh scheduler (shorter close to tip-off, longer under quota pressure)
 picks_cache = {
     'data': None,
     'raw_odds': None,
+    'game_logs': None,   # player_name -> game logs fetched for the slate (parlays, incremental refresh)
+    'player_ids': None,  # player_name -> ESPN id for names that resolved, reused by incremental refreshes
+    'slate': None,       # _slate_key() and _picks_config() of the build; incremental only within both
+    'config': None,
+    'index': None,       # PicksIndex over 'data', rebuilt with it
+    'summary': None,     # (data, /api/stats/summary payload), rebuilt with it
     'timestamp': None,
-    'ttl': 21600
+    'ttl': 21600,
+    'version': None,     # shared cache version the data came from or was published as
+    'checked_at': 0.0    # last time the shared cache was polled for a newer version
+}
+
+# Concurrent picks builds for the same slate run once; every caller shares the result
+picks_flight = SingleFlight()
+
+# state of the stale-while-revalidate rebuild
+picks_refresh = {
+    'lock': threading.Lock(),
+    'thread': None,
+    'started_at': None,
+    'count': 0,
+    'last_error': None
 }
 
 # cache for 40 minutes
@@ -73,17 +257,56 @@ games_cache = {
     'data': None,
     'date': None,
     'timestamp': None,
-    'ttl': 2400
+    'ttl': 2400,
+    'version': None
 }
 
 # cache for 24 hours
 players_cache = {
     'data': None,
     'timestamp': None,
-    'ttl': 86400
+    'ttl': 86400,
+    'version': None
 }
 
-PLAYERS_CACHE_FILE = os.path.join(os.path.dirname(__file__), 'cache', 'active_players.json')
+PLAYERS_CACHE_FILE = os.getenv(
+    'PLAYERS_CACHE_FILE',
+    os.path.join(os.path.dirname(__file__), 'cache', 'active_players.json'),
+)
+
+
+def _shared_get(key, since=None):
+    try:
+        return shared_cache.get(key, since=since)
+    except Exception as e:
+        print(f"Shared cache read failed for {key}: {e}")
+        return None
+
+
+def _shared_publish(key, value, ttl):
+    """Publish to the shared cache; returns the new version, or None if it failed."""
+    try:
+        return shared_cache.publish(key, value, ttl).version
+    except Exception as e:
+        print(f"Shared cache publish failed for {key}: {e}")
+        return None
+
+
+def _adopt_shared(key, cache):
+    """
+    When `cache` (games_cache / players_cache) has expired, fill it from a fresh
+    entry another instance published under `key`. True when it did.
+    """
+    if cache['data'] and cache['timestamp'] and (datetime.now() - cache['timestamp']).total_seconds() < cache['ttl']:
+        return False
+    entry = _shared_get(key, since=cache['version'])
+    if entry is None or entry.age() >= cache['ttl']:
+        return False
+    cache.update(entry.value)
+    cache['timestamp'] = entry.timestamp()
+    cache['version'] = entry.version
+    print(f"Loaded {key} version {entry.version} from the shared cache")
+    return True
 
 
 def _load_players_disk_cache():
@@ -115,14 +338,18 @@ def _get_cached_active_players():
         if age < players_cache['ttl']:
             return players_cache['data']
 
+    if _adopt_shared('players', players_cache):
+        return players_cache['data']
+
     if _load_players_disk_cache():
         return players_cache['data']
 
-    players = fetcher.get_active_players_with_stats()
+    players = get_fetcher().get_active_players_with_stats()
     players.sort(key=lambda p: p['name'])
     now = datetime.now()
     players_cache['data'] = players
     players_cache['timestamp'] = now
+    players_cache['version'] = _shared_publish('players', {'data': players}, players_cache['ttl'])
     try:
         _save_players_disk_cache(players, now)
     except Exception as e:
@@ -135,49 +362,290 @@ def _days_since_last_game(game_logs) -> int | None:
     Return the number of calendar days since the player's most recent logged game.
     """
     try:
-        last_date = pd.to_datetime(game_logs['GAME_DATE'].iloc[0])
-        return (datetime.now() - last_date).days
+        # Logs are most recent first; dates are UTC
+        last_date = parse_date(next(iter(game_logs['GAME_DATE'])))
+        return (datetime.now(timezone.utc) - last_date).days
     except Exception:
         return None
 
 
-def generate_all_picks(force_refresh: bool = False):
+def _picks_index(predictions):
+    """The cached index when it covers `predictions`, else a fresh one (e.g. an empty early return)."""
+    index = picks_cache['index']
+    if index is None or index.predictions is not predictions:
+        index = PicksIndex(predictions)
+    return index
+
+
+def _picks_summary(predictions, raw_odds):
+    """The summary built with the cache when it covers `predictions`, else computed now."""
+    cached = picks_cache['summary']
+    if cached is not None and cached[0] is predictions:
+        return cached[1]
+    return summarize(predictions, players_analyzed=len(raw_odds or {}))
+
+
+def _picks_age(cache=None):
+    cache = picks_cache if cache is None else cache
+    if not cache['timestamp']:
+        return None
+    return (datetime.now() - cache['timestamp']).total_seconds()
+
+
+def _freshness():
+    """Cache age and stale-while-revalidate state, for API responses."""
+    age = _picks_age()
+    return {
+        'cache_age_seconds': int(age) if age is not None else None,
+        'stale': age is not None and age >= picks_cache['ttl'],
+        'refreshing': picks_refresh['thread'] is not None,
+    }
+
+
+def _slate_key():
+    """Picks are built per NBA slate, i.e. per US Eastern calendar day."""
+    return f"picks:{datetime.now(ZoneInfo('America/New_York')).date().isoformat()}"
+
+
+def _snapshot():
     """
-    Generate picks for all players with odds today
+    The picks cache as of one moment. Builds swap in with a single picks_cache.update()
+    and copy() doesn't release the GIL, so every field of the copy is from the same build.
     """
-    if not force_refresh and picks_cache['data'] and picks_cache['timestamp']:
-        age = (datetime.now() - picks_cache['timestamp']).total_seconds()
-        if age < picks_cache['ttl']:
-            print(f"Using cached picks with age: {int(age)}s")
-            return picks_cache['data'], picks_cache['raw_odds']
-    
+    return picks_cache.copy()
+
+
+def _fresh_picks():
+    snapshot = _snapshot()
+    if snapshot['data'] is not None and snapshot['timestamp'] and _picks_age(snapshot) < snapshot['ttl']:
+        return snapshot
+    return None
+
+
+def _adopt_picks(entry):
+    value = entry.value
+    data = value['data']
+    picks_cache.update({
+        'data': data,
+        'raw_odds': value['raw_odds'],
+        'game_logs': value['game_logs'],
+        'player_ids': value['player_ids'],
+        'slate': value['slate'],
+        'config': value['config'],
+        'index': PicksIndex(data),
+        'summary': (data, value['summary']),
+        'timestamp': entry.timestamp(),
+        'ttl': entry.ttl,
+        'version': entry.version,
+    })
+    print(f"Loaded picks version {entry.version} from the shared cache ({len(data)} predictions)")
+
+
+def _sync_picks(force: bool = False):
+    """
+    Adopt picks published to the shared cache when they're newer than ours. While
+    ours are fresh the shared cache is polled at most every CACHE_POLL_INTERVAL.
+    """
+    now = time.time()
+    if not force and _fresh_picks() is not None and now - picks_cache['checked_at'] < CACHE_POLL_INTERVAL:
+        return False
+
+    def sync():
+        picks_cache['checked_at'] = time.time()
+        entry = _shared_get('picks', since=picks_cache['version'])
+        if entry is None or (picks_cache['timestamp'] and entry.timestamp() <= picks_cache['timestamp']):
+            return False
+        _adopt_picks(entry)
+        return True
+
+    # Concurrent requests share one read and decode of the payload
+    adopted, _ = picks_flight.do('picks:shared-sync', sync)
+    return adopted
+
+
+def _build_picks_once(force_refresh: bool = False, full: bool = False):
+    """_build_picks through the single-flight layer: callers arriving mid-build wait and share it."""
+    def build():
+        # A build may have finished between this caller's cache check and getting here,
+        # in this process or on another instance that published it
+        if not force_refresh:
+            _sync_picks(force=True)
+        cached = None if force_refresh else _fresh_picks()
+        return cached if cached is not None else _build_picks(full)
+
+    result, shared = picks_flight.do(_slate_key(), build)
+    if shared:
+        print("Joined the picks build already in progress")
+    return result
+
+
+def _background_refresh():
+    try:
+        _build_picks_once()
+    except Exception as e:
+        # Keep serving the stale picks; the next request past the TTL tries again
+        picks_refresh['last_error'] = str(e)
+        print(f"Background picks refresh failed: {e}")
+    finally:
+        with picks_refresh['lock']:
+            picks_refresh['thread'] = None
+
+
+def _start_background_refresh():
+    """Start a rebuild unless one is already running."""
+    with picks_refresh['lock']:
+        if picks_refresh['thread'] is not None:
+            return False
+        picks_refresh['thread'] = threading.Thread(target=_background_refresh, name='picks-refresh', daemon=True)
+        picks_refresh['started_at'] = datetime.now()
+        picks_refresh['count'] += 1
+        picks_refresh['thread'].start()
+    return True
+
+
+def generate_all_picks(force_refresh: bool = False, full: bool = False):
+    """
+    Generate picks for all players with odds today. `full` skips the incremental
+    refresh and re-resolves, refetches and re-analyzes every player.
+    """
+    snapshot = _current_picks(force_refresh, full)
+    return snapshot['data'] or [], snapshot['raw_odds'] or {}
+
+
+def _current_picks(force_refresh: bool = False, full: bool = False):
+    """
+    generate_all_picks, returning the whole picks snapshot (data, raw_odds, game_logs, ...)
+    so callers needing more than the predictions get fields from the same build.
+    """
+    if not PICKS_BUILDER:
+        # Reader instance: picks only ever come from a builder through the shared cache
+        _sync_picks(force=force_refresh)
+        snapshot = _snapshot()
+        if snapshot['data'] is None:
+            print("No picks published to the shared cache yet")
+        return snapshot
+
+    if not force_refresh:
+        _sync_picks()
+        snapshot = _snapshot()
+        if snapshot['data'] is not None and snapshot['timestamp']:
+            age = _picks_age(snapshot)
+            if age < snapshot['ttl']:
+                print(f"Using cached picks with age: {int(age)}s")
+                return snapshot
+            if PICKS_STALE_WHILE_REVALIDATE and age < snapshot['ttl'] + PICKS_MAX_STALE:
+                if _start_background_refresh():
+                    print(f"Picks expired {int(age - snapshot['ttl'])}s ago, refreshing in the background")
+                print(f"Serving stale picks with age: {int(age)}s")
+                return snapshot
+
+    return _build_picks_once(force_refresh, full)
+
+
+def _record_line_history(raw_odds, player_ids=None):
+    line_history = get_line_history_store()
+    if line_history is None:
+        return
+    try:
+        result = line_history.append(raw_odds, player_ids=player_ids)
+        print(f"Line history: {result['changes']} changes across {result['offers']} offers")
+    except Exception as e:
+        print(f"Failed to record line history: {e}")
+
+
+def _picks_config():
+    """Settings the predictions depend on; an incremental refresh needs the same ones."""
+    return f"{PICKS_LINE_MODE}/{PICKS_MODEL}/{ANALYZER_NUM_GAMES}/{GAMELOG_SOURCE}"
+
+
+def _incremental_base():
+    """The cached build to refresh incrementally from, or None when a full rebuild is needed."""
+    if not PICKS_INCREMENTAL or picks_cache['data'] is None or picks_cache['game_logs'] is None:
+        return None
+    if picks_cache['slate'] != _slate_key() or picks_cache['config'] != _picks_config():
+        return None
+    # game logs adopted from the shared cache are still encoded (see shared_cache.LazyFrame)
+    return {
+        'data': picks_cache['data'],
+        'raw_odds': picks_cache['raw_odds'],
+        'game_logs': materialize(picks_cache['game_logs']),
+        'player_ids': picks_cache['player_ids'],
+    }
+
+
+def _publish_picks(build, ttl):
+    """
+    Publish a finished build to the shared cache and swap it into picks_cache. Everything
+    is built first and swapped in with one update, so requests served during a
+    background refresh never see a half-built cache. Returns the new snapshot.
+    """
+    summary = summarize(build['data'], players_analyzed=len(build['raw_odds']))
+    version = _shared_publish('picks', {**build, 'summary': summary}, ttl)
+    snapshot = {
+        **build,
+        'index': PicksIndex(build['data']),
+        'summary': (build['data'], summary),
+        'timestamp': datetime.now(),
+        'ttl': ttl,
+        'version': version,
+    }
+    picks_cache.update(snapshot)
+    return snapshot
+
+
+def _build_picks(full: bool = False):
+    from src.odds_fetcher import convert_to_ladder_format, convert_to_simple_format
+    from src.odds_quota import MIN_REFRESH_SECONDS
     print("GENERATING FRESH PICKS")
     start_time = time.time()
+    fetcher, analyzer, odds_fetcher = get_fetcher(), get_analyzer(), get_odds_fetcher()
     
     print("\nFetching prop lines from Odds API...")
     raw_odds = odds_fetcher.get_all_player_props()
     print(f"Found odds for {len(raw_odds)} players")
     
-    picks_cache['raw_odds'] = raw_odds
-    
     simple_props = convert_to_simple_format(raw_odds)
     
     if not simple_props:
         print("No prop lines available, cant convert to simple format")
-        return [], raw_odds
+        _record_line_history(raw_odds)
+        # An empty build replaces the cached predictions rather than leaving them next to
+        # odds they weren't built from; slate None makes the next build a full one. Props
+        # may just not be posted yet, so check again soon.
+        return _publish_picks({
+            'data': [],
+            'raw_odds': raw_odds,
+            'game_logs': {},
+            'player_ids': {},
+            'slate': None,
+            'config': _picks_config(),
+        }, MIN_REFRESH_SECONDS)
+
+    base = None if full else _incremental_base()
+    diff = OddsDiff(base['raw_odds'], raw_odds) if base else None
+    if diff:
+        print(f"Incremental refresh, odds diff: {diff.stats()}")
+    known_ids = (base['player_ids'] or {}) if base else {}
+    known_logs = base['game_logs'] if base else {}
     
     print("\nMapping player names to IDs...")
     active_players = _get_cached_active_players()
     # Normalized lookup so suffix variants ("Jr" vs "Jr.") match across sources.
     norm_id_map = {normalize_name(p['name']): p['id'] for p in active_players}
+    norm_team_map = {normalize_name(p['name']): p.get('team') for p in active_players}
 
     resolved = {}   # player_name -> (player_id, prop_lines)
+    player_ids = {}
     skipped_no_id = []
     for player_name, prop_lines in simple_props.items():
-        player_id = norm_id_map.get(normalize_name(player_name))
+        # Names that didn't resolve are looked up again: the active-player list may have refreshed
+        player_id = known_ids.get(player_name)
         if not player_id:
-            player_id = fetcher.find_player_id(player_name, active_players)
+            player_id = norm_id_map.get(normalize_name(player_name))
+            if not player_id:
+                player_id = fetcher.find_player_id(player_name, active_players)
         if player_id:
+            player_ids[player_name] = player_id
             resolved[player_name] = (player_id, prop_lines)
         else:
             skipped_no_id.append(player_name)
@@ -185,29 +653,26 @@ def generate_all_picks(force_refresh: bool = False):
     for name in skipped_no_id[:5]:
         print(f"skipping {name} (cannot find player id)")
 
-    # Fetch all game logs in parallel with a short timeout
-    print(f"\nFetching game logs for {len(resolved)} players in parallel...")
-
-    def _fetch_logs(item):
-        pname, (pid, _) = item
-        try:
-            time.sleep(1.5)
-            logs = fetcher.get_player_stats(pid, num_games=15, timeout=30)
-            return pname, logs, None
-        except Exception as exc:
-            return pname, None, exc
-
-    game_log_map = {}   # player_name -> DataFrame | None
-    error_map = {}      # player_name -> exception
-
-    with ThreadPoolExecutor(max_workers=2) as pool:
-        futures = {pool.submit(_fetch_logs, item): item[0] for item in resolved.items()}
-        for future in as_completed(futures):
-            pname, logs, exc = future.result()
-            if exc is not None:
-                error_map[pname] = exc
-            else:
-                game_log_map[pname] = logs
+    _record_line_history(raw_odds, player_ids)
+
+    # Fetch the whole slate's game logs concurrently through the async engine; logs
+    # fetched earlier in the slate are reused (only completed games would change them)
+    to_fetch = {pname: pid for pname, (pid, _) in resolved.items() if pname not in known_logs}
+    game_log_map = {pname: known_logs[pname] for pname in resolved if pname in known_logs}
+    error_map = {}
+    if to_fetch:
+        print(f"\nFetching game logs for {len(to_fetch)} players concurrently ({len(game_log_map)} reused)...")
+        fetched, error_map = fetcher.get_player_stats_many(
+            to_fetch,
+            num_games=15,
+            budget=GAMELOG_SLATE_BUDGET,
+            teams={pname: norm_team_map.get(normalize_name(pname)) for pname in to_fetch},
+            source=GAMELOG_SOURCE,
+        )
+        game_log_map.update(fetched)
+        print(f"Game log fetch stats: {fetcher.fetch_stats}")
+    else:
+        print(f"\nReusing game logs for all {len(game_log_map)} players")
 
     # Generate predictions (pure computation, no more NBA API calls)
     print("\nAnalyzing confidence...")
@@ -216,6 +681,7 @@ def generate_all_picks(force_refresh: bool = False):
     error_count = len(error_map)
     skipped_count = len(skipped_no_id)
 
+    to_analyze = {}
     for player_name, (player_id, prop_lines) in resolved.items():
         if player_name in error_map:
             print(f"Error analyzing {player_name}: {error_map[player_name]}")
@@ -237,28 +703,61 @@ def generate_all_picks(force_refresh: bool = False):
             print(f"skipping {player_name} (last played {days_out} days ago — likely inactive)")
             continue
 
-        try:
-            predictions = analyzer.analyze_player(
-                game_logs=game_logs,
-                player_name=player_name,
-                prop_lines=prop_lines
-            )
-
-            if player_name in raw_odds:
-                event_info = raw_odds[player_name]
-                for pred in predictions:
-                    pred['event_id'] = event_info.get('event_id', 'N/A')
-                    pred['home_team'] = event_info.get('home_team', 'N/A')
-                    pred['away_team'] = event_info.get('away_team', 'N/A')
-                    pred['commence_time'] = event_info.get('commence_time', 'N/A')
-
-            all_predictions.extend(predictions)
-            analyzed_count += 1
+        to_analyze[player_name] = (game_logs, prop_lines)
+
+    if PICKS_LINE_MODE == 'ladder':
+        ladders = convert_to_ladder_format(raw_odds)
+        inputs = {name: (game_logs, ladders.get(name, {})) for name, (game_logs, _) in to_analyze.items()}
+    else:
+        inputs = to_analyze
+
+    # Props to (re)analyze per player: everything on a full build or for freshly fetched
+    # logs, otherwise only the props whose offers moved since the cached build
+    dirty = {name: None if diff is None or name in to_fetch else diff.dirty(name) for name in inputs}
+    pending = {}
+    for name, (game_logs, props) in inputs.items():
+        stats = dirty[name]
+        if stats is None:
+            pending[name] = (game_logs, props)
+        elif stats:
+            pending[name] = (game_logs, {stat: props[stat] for stat in props if stat in stats})
+    if diff:
+        print(f"Re-analyzing {sum(len(p) for _, p in pending.values())} props for {len(pending)} players")
+
+    # One vectorized pass over the whole slate; same predictions as analyze_player per player
+    if not pending:
+        predictions_map, analyze_errors = {}, {}
+    elif PICKS_LINE_MODE == 'ladder':
+        predictions_map, analyze_errors = analyzer.analyze_ladder(pending)
+    else:
+        predictions_map, analyze_errors = analyzer.analyze_slate(pending)
+    for player_name, e in analyze_errors.items():
+        error_count += 1
+        print(f"Error generating predictions for {player_name}: {e}")
+
+    previous = group_predictions(base['data']) if base else {}
+    for player_name, (_, props) in inputs.items():
+        if player_name in analyze_errors:
+            continue
+        team = norm_team_map.get(normalize_name(player_name))
+        event_info = raw_odds.get(player_name)
+        for pred in predictions_map.get(player_name, []):
+            pred['team'] = team
+            if event_info is not None:
+                pred['event_id'] = event_info.get('event_id', 'N/A')
+                pred['home_team'] = event_info.get('home_team', 'N/A')
+                pred['away_team'] = event_info.get('away_team', 'N/A')
+                pred['commence_time'] = event_info.get('commence_time', 'N/A')
+        predictions = merge_predictions(player_name, props, predictions_map.get(player_name, []),
+                                        previous, dirty[player_name])
+        # Reused predictions are shared with the cache still being served, so copy rather than mutate
+        predictions = [p if p.get('team') == team else {**p, 'team': team} for p in predictions]
+        if not predictions and player_name not in predictions_map:
+            continue
+
+        all_predictions.extend(predictions)
+        analyzed_count += 1
 
-        except Exception as e:
-            error_count += 1
-            print(f"Error generating predictions for {player_name}: {e}")
-    
     elapsed = time.time() - start_time
     print(f"Successfully analyzed: {analyzed_count} players")
     print(f"Skipped: {skipped_count} players")
@@ -266,11 +765,17 @@ def generate_all_picks(force_refresh: bool = False):
     print(f"Total predictions generated: {len(all_predictions)}")
     print(f"Time taken: {elapsed:.1f}s")
     
-    # Cache the results
-    picks_cache['data'] = all_predictions
-    picks_cache['timestamp'] = datetime.now()
+    snapshot = _publish_picks({
+        'data': all_predictions,
+        'raw_odds': raw_odds,
+        'game_logs': game_log_map,
+        'player_ids': player_ids,
+        'slate': _slate_key(),
+        'config': _picks_config(),
+    }, odds_fetcher.next_refresh_seconds())
+    print(f"Next picks refresh in {snapshot['ttl']}s")
     
-    return all_predictions, raw_odds
+    return snapshot
 
 
 @app.route('/')
@@ -285,6 +790,14 @@ def home():
     })
 
 
+def _session_stats():
+    # The pooled session belongs to the ESPN and Odds API clients
+    if not (_loaded('fetcher') or _loaded('odds_fetcher')):
+        return None
+    from src.http_session import session_stats
+    return session_stats()
+
+
 @app.route('/api/health')
 def health():
     """Detailed health check"""
@@ -295,16 +808,38 @@ def health():
     return jsonify({
         'status': 'healthy',
         'services': {
-            'fetcher': 'active',
-            'analyzer': 'active',
-            'odds_api': 'real' if USE_REAL_ODDS else 'mock'
+            'fetcher': 'active' if _loaded('fetcher') else 'not loaded',
+            'analyzer': 'active' if _loaded('analyzer') else 'not loaded',
+            'odds_api': 'real' if USE_REAL_ODDS else 'mock',
+            'analytics_imported': 'pandas' in sys.modules
         },
         'cache': {
             'has_data': picks_cache['data'] is not None,
             'predictions_count': len(picks_cache['data']) if picks_cache['data'] else 0,
             'age_seconds': cache_age,
-            'ttl_seconds': picks_cache['ttl']
+            'ttl_seconds': picks_cache['ttl'],
+            'stale': _freshness()['stale'],
+            'background_refresh': {
+                'running': picks_refresh['thread'] is not None,
+                'started_at': picks_refresh['started_at'].isoformat() if picks_refresh['started_at'] else None,
+                'count': picks_refresh['count'],
+                'last_error': picks_refresh['last_error']
+            }
+        },
+        'picks_single_flight': picks_flight.stats(),
+        'shared_cache': {
+            **shared_cache.stats(),
+            'role': 'builder' if PICKS_BUILDER else 'reader',
+            'picks_version': picks_cache['version'],
+            'games_version': games_cache['version'],
+            'players_version': players_cache['version']
         },
+        'rate_limits': get_rate_limiter().stats(),
+        # Services not built yet have nothing to report
+        'http_pool': _session_stats(),
+        'http_cache': get_http_cache().stats() if _loaded('http_cache') else None,
+        'odds_fetch': get_odds_fetcher().last_fetch_stats if _loaded('odds_fetcher') else None,
+        'odds_quota': get_odds_fetcher().quota_stats() if _loaded('odds_fetcher') else None,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -324,15 +859,14 @@ def get_top_picks():
 
         all_predictions, raw_odds = generate_all_picks(force_refresh=force_refresh)
 
-        filtered = all_predictions
-
-        if stat_type:
-            filtered = [p for p in filtered if p['stat_type'] == stat_type]
-
-        if pick_type:
-            filtered = [p for p in filtered if p['pick'] == pick_type.upper()]
-
-        top_picks = analyzer.rank_picks(filtered, min_ev=min_ev, min_confidence=min_confidence, top_n=limit)
+        # Same result as filtering all_predictions and calling analyzer.rank_picks
+        top_picks = _picks_index(all_predictions).top(
+            stat_type=stat_type,
+            pick=pick_type.upper() if pick_type else None,
+            min_ev=min_ev,
+            min_confidence=min_confidence,
+            top_n=limit,
+        )
 
         return jsonify({
             'success': True,
@@ -346,7 +880,7 @@ def get_top_picks():
                 'min_ev': min_ev,
                 'limit': limit
             },
-            'cache_age_seconds': int((datetime.now() - picks_cache['timestamp']).total_seconds()) if picks_cache['timestamp'] else None,
+            **_freshness(),
             'generated_at': datetime.now().isoformat()
         })
         
@@ -365,8 +899,7 @@ def get_player_picks(player_name):
     try:
         all_predictions, raw_odds = generate_all_picks()
         
-        target = normalize_name(player_name)
-        player_picks = [p for p in all_predictions if normalize_name(p['player_name']) == target]
+        player_picks = _picks_index(all_predictions).player(player_name)
         
         if not player_picks:
             return jsonify({
@@ -388,6 +921,7 @@ def get_player_picks(player_name):
             'player': player_name,
             'event_info': event_info,
             'predictions': player_picks,
+            **_freshness(),
             'generated_at': datetime.now().isoformat()
         })
         
@@ -404,6 +938,7 @@ def get_player_picks(player_name):
 def get_today_games():
     """Get next available NBA games (today or nearest future date with games)"""
     try:
+        _adopt_shared('games', games_cache)
         if games_cache['data'] and games_cache['timestamp']:
             age = (datetime.now() - games_cache['timestamp']).total_seconds()
             if age < games_cache['ttl']:
@@ -415,13 +950,14 @@ def get_today_games():
                     'date': games_cache['date']
                 })
 
-        games_df = fetcher.get_today_games()
-        games = games_df.to_dict('records')
+        fetcher = get_fetcher()
+        games = as_rows(fetcher.get_today_games())
         resolved_date = fetcher.resolved_game_date or datetime.now().strftime('%Y-%m-%d')
 
         games_cache['data'] = games
         games_cache['date'] = resolved_date
         games_cache['timestamp'] = datetime.now()
+        games_cache['version'] = _shared_publish('games', {'data': games, 'date': resolved_date}, games_cache['ttl'])
         
         return jsonify({
             'success': True,
@@ -444,7 +980,7 @@ def _filter_players_today(players: list) -> list:
     raw_odds = picks_cache.get('raw_odds')
     if not raw_odds:
         try:
-            raw_odds = odds_fetcher.get_all_player_props()
+            raw_odds = get_odds_fetcher().get_all_player_props()
         except Exception:
             return players
 
@@ -456,7 +992,7 @@ def _filter_players_today(players: list) -> list:
 
     picks_data = picks_cache.get('data')
     if picks_data:
-        players_with_picks = {normalize_name(p['player_name']) for p in picks_data}
+        players_with_picks = _picks_index(picks_data).by_player
         return [{**p, 'has_picks': normalize_name(p['name']) in players_with_picks} for p in filtered]
 
     return [{**p, 'has_picks': True} for p in filtered]
@@ -468,6 +1004,7 @@ def get_players():
     try:
         today_only = request.args.get('today_only', 'false').lower() == 'true'
 
+        _adopt_shared('players', players_cache)
         cached = players_cache['data'] and players_cache['timestamp']
         if cached:
             age = (datetime.now() - players_cache['timestamp']).total_seconds()
@@ -483,7 +1020,7 @@ def get_players():
 
         print("Fetching player index from ESPN...")
         try:
-            raw = fetcher.get_active_players_with_stats()
+            raw = get_fetcher().get_active_players_with_stats()
         except Exception as e:
             print(f"ESPN player index failed: {e}")
             return jsonify({'success': False, 'error': 'API unavailable, try again'}), 503
@@ -503,6 +1040,7 @@ def get_players():
 
         players_cache['data'] = players
         players_cache['timestamp'] = datetime.now()
+        players_cache['version'] = _shared_publish('players', {'data': players}, players_cache['ttl'])
 
         filtered = _filter_players_today(players) if today_only else players
         print(f"Fetched {len(players)} active players ({len(filtered)} playing today)" if today_only else f"Fetched {len(players)} active players")
@@ -539,7 +1077,8 @@ def get_odds_players():
         return jsonify({
             'success': True,
             'count': len(players_info),
-            'players': players_info
+            'players': players_info,
+            **_freshness()
         })
     except Exception as e:
         return jsonify({
@@ -552,8 +1091,9 @@ def get_odds_players():
 def refresh_picks():
     """Force refresh the picks cache"""
     try:
-        print("\nManual refresh triggered via API")
-        all_predictions, raw_odds = generate_all_picks(force_refresh=True)
+        full = request.args.get('full', 'false').lower() == 'true'
+        print(f"\nManual {'full ' if full else ''}refresh triggered via API")
+        all_predictions, raw_odds = generate_all_picks(force_refresh=True, full=full)
         
         return jsonify({
             'success': True,
@@ -571,6 +1111,95 @@ def refresh_picks():
         }), 500
 
 
+@app.route('/api/parlays')
+def get_parlays():
+    """Top same-game parlays by EV, legs drawn from the current picks"""
+    try:
+        top_k = int(request.args.get('limit', 10))
+        max_legs = min(4, int(request.args.get('legs', 4)))
+        min_leg_confidence = float(request.args.get('min_leg_confidence', 0.0))
+        budget = min(PARLAY_BUDGET, float(request.args.get('budget', PARLAY_BUDGET)))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if top_k < 1:
+        return jsonify({'success': False, 'error': 'limit must be at least 1'}), 400
+    if max_legs < 2:
+        return jsonify({'success': False, 'error': 'legs must be between 2 and 4'}), 400
+
+    try:
+        event_id = request.args.get('event_id', None)
+
+        from src.parlay import build_parlays
+        # Predictions and game logs from the same build, even if a refresh swaps the cache meanwhile
+        snapshot = _current_picks()
+        parlays, search = build_parlays(
+            snapshot['data'] or [], materialize(snapshot['game_logs']) or {}, top_k=top_k, max_legs=max_legs,
+            budget=budget, min_leg_confidence=min_leg_confidence, event_id=event_id,
+        )
+
+        return jsonify({
+            'success': True,
+            'count': len(parlays),
+            'parlays': parlays,
+            'search': search,
+            'filters': {
+                'limit': top_k,
+                'legs': max_legs,
+                'min_leg_confidence': min_leg_confidence,
+                'event_id': event_id
+            },
+            **_freshness(),
+            'generated_at': datetime.now().isoformat()
+        })
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/lines/history')
+def get_line_history():
+    """Recorded line and price changes for a player or event, oldest first (line-movement charts)"""
+    try:
+        player = request.args.get('player', None)
+        event_id = request.args.get('event_id', None)
+        if not player and not event_id:
+            return jsonify({'success': False, 'error': 'player or event_id is required'}), 400
+        line_history = get_line_history_store()
+        if line_history is None:
+            return jsonify({'success': False, 'error': 'Line history is only recorded with real odds'}), 503
+        limit = int(request.args.get('limit', 5000))
+        filters = {
+            'player': player,
+            'event_id': event_id,
+            'stat_type': request.args.get('stat_type', None),
+            'bookmaker': request.args.get('bookmaker', None),
+            'start': request.args.get('start', None),
+            'end': request.args.get('end', None)
+        }
+        changes = list(islice(line_history.history(**filters), limit))
+
+        return jsonify({
+            'success': True,
+            'count': len(changes),
+            'changes': changes,
+            'filters': filters,
+            'truncated': len(changes) == limit
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/stats/summary')
 def get_stats_summary():
     """Get summary statistics about current picks"""
@@ -583,34 +1212,11 @@ def get_stats_summary():
                 'message': 'No predictions available'
             })
         
-        total_picks = len(all_predictions)
-        avg_confidence = sum(p['confidence'] for p in all_predictions) / total_picks
-        
-        stat_breakdown = {}
-        for pred in all_predictions:
-            stat = pred['stat_type']
-            stat_breakdown[stat] = stat_breakdown.get(stat, 0) + 1
-        
-        pick_breakdown = {}
-        for pred in all_predictions:
-            pick = pred['pick']
-            pick_breakdown[pick] = pick_breakdown.get(pick, 0) + 1
-        
-        high_confidence = len([p for p in all_predictions if p['confidence'] >= 75])
-        medium_confidence = len([p for p in all_predictions if 65 <= p['confidence'] < 75])
-        
         return jsonify({
             'success': True,
-            'summary': {
-                'total_picks': total_picks,
-                'players_analyzed': len(raw_odds),
-                'average_confidence': round(avg_confidence, 1),
-                'high_confidence_picks': high_confidence,
-                'medium_confidence_picks': medium_confidence,
-                'stat_breakdown': stat_breakdown,
-                'pick_breakdown': pick_breakdown
-            },
+            'summary': _picks_summary(all_predictions, raw_odds),
             'cache_age': int((datetime.now() - picks_cache['timestamp']).total_seconds()) if picks_cache['timestamp'] else None,
+            'stale': _freshness()['stale'],
             'generated_at': datetime.now().isoformat()
         })
     except Exception as e:
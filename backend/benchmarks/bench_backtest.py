@@ -0,0 +1,86 @@
+"""
+Benchmark: season backtest, in-process vs sharded across a process pool
+Builds a game-log store from a synthetic season, records an odds snapshot per
+game date (lines near each player's prior 10-game average) and replays it.
+Run from backend/:  python -m benchmarks.bench_backtest [--players-per-team 13] [--history 82] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.backtest import SLATE_TZ, SharedGameLogs, print_report, report, run_backtest
+from src.fetcher import NBAFetcher
+from src.gamelog_store import GameLogStore
+from standin_server import SyntheticLeague
+
+PRICES = [-150, -130, -120, -115, -110, -105, 100, 110, 125]
+
+
+def build_store(path: str, league: SyntheticLeague) -> GameLogStore:
+    store = GameLogStore(path)
+    fetcher = NBAFetcher()
+    for aid in league.players:
+        store.merge(aid, fetcher._parse_gamelog(league.gamelog(aid), None))
+    return store
+
+
+def synthetic_snapshots(df, names: dict, seed: int) -> dict:
+    """One snapshot per game date: every player who played gets a line on each prop stat."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    df['DATE'] = df['GAME_DATE'].dt.tz_convert(SLATE_TZ).dt.strftime('%Y-%m-%d')
+    snapshots = {}
+    for stat in ('PTS', 'REB', 'AST', 'FG3M', 'BLK', 'STL'):
+        prior = df.groupby('ATHLETE_ID')[stat].transform(lambda s: s.shift(1).rolling(10, min_periods=1).mean())
+        lines = np.maximum(0.5, np.floor(prior.fillna(df[stat]).to_numpy() + rng.normal(0, 1.0, len(df))) + 0.5)
+        over = rng.choice(PRICES, len(df))
+        under = rng.choice(PRICES, len(df))
+        for date, aid, line, o, u in zip(df['DATE'], df['ATHLETE_ID'], lines, over, under):
+            entry = snapshots.setdefault(date, {}).setdefault(int(aid), {'name': names[int(aid)], 'props': {}})
+            entry['props'][stat] = {'line': float(line), 'over_price': int(o), 'under_price': int(u)}
+    return snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--history", type=int, default=82)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    league = SyntheticLeague(players_per_team=args.players_per_team, history=args.history)
+    workdir = tempfile.mkdtemp(prefix="bench-backtest-")
+    store = build_store(os.path.join(workdir, "gamelogs.sqlite"), league)
+    frame = store.load_all()
+    snapshots = synthetic_snapshots(frame, {aid: p['name'] for aid, p in league.players.items()}, args.seed)
+    props = sum(len(e['props']) for slate in snapshots.values() for e in slate.values())
+
+    start = time.perf_counter()
+    logs = SharedGameLogs.from_frame(frame)
+    load_time = time.perf_counter() - start
+    try:
+        runs = {}
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            runs[workers] = (run_backtest(logs, snapshots, workers=workers), time.perf_counter() - start)
+    finally:
+        logs.close()
+
+    serial, serial_time = runs[1]
+    pooled, pooled_time = runs[args.workers]
+    assert pooled == serial, "pooled backtest differs from the in-process run"
+
+    print(f"{len(snapshots)} dates, {len(league.players)} players, {props} props "
+          f"({len(frame)} game rows, shared arrays built in {load_time * 1000:.0f}ms; {os.cpu_count()} CPUs)")
+    print(f"  in-process:      {serial_time:6.2f}s")
+    print(f"  {args.workers} workers:       {pooled_time:6.2f}s  ({serial_time / pooled_time:.1f}x, results identical)")
+    print_report(report(serial))
+
+
+if __name__ == "__main__":
+    main()
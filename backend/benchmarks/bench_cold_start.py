@@ -0,0 +1,108 @@
+"""
+Benchmark: Lambda cold starts. Each run is a fresh process (a new container)
+importing lambda_handler and answering one request: /, /api/health, or
+/api/picks/top served from picks another instance already published to a shared
+sqlite cache. Compares lazy service construction (the default) with building
+every service at import (PRELOAD_SERVICES=true, how app.py used to start), and
+prints an import-time profile of `import lambda_handler` from `python -X importtime`.
+Run from backend/:  python -m benchmarks.bench_cold_start [--runs 3] [--games 4]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ENDPOINTS = ('/', '/api/health', '/api/picks/top?limit=5')
+ANALYTICS = ('pandas', 'numpy', 'requests')
+
+
+def instance(path):
+    """One cold start: import the Lambda entry point, answer `path`, print timings as JSON."""
+    import contextlib
+    import io
+    import resource
+    import time
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import lambda_handler
+        imported = time.perf_counter()
+        response = lambda_handler.app.test_client().get(path)
+    print(json.dumps({
+        'import': imported - started,
+        'request': time.perf_counter() - imported,
+        'status': response.status_code,
+        'loaded': [m for m in ANALYTICS if m in sys.modules],
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def cold_start(env, path):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_cold_start", "--instance", path],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_profile(env, top):
+    """Import time (ms) spent in each top-level package `import lambda_handler` pulls in, largest first."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import lambda_handler"],
+                         env=env, capture_output=True, text=True, check=True).stderr
+    self_us = defaultdict(int)
+    for line in err.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+\d+ \| (\s*)(\S+)", line)
+        if m:
+            self_us[m.group(3).split('.')[0]] += int(m.group(1))
+    total = sum(self_us.values()) / 1000
+    return total, sorted(((us / 1000, pkg) for pkg, us in self_us.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per endpoint and mode")
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--top", type=int, default=10, help="packages shown in the import profile")
+    parser.add_argument("--instance", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.instance:
+        return instance(args.instance)
+    # Not at the top: it imports requests, which would taint what an instance reports as loaded
+    from standin_server import StandInServer, SyntheticLeague
+
+    server = StandInServer(SyntheticLeague(games=args.games, players_per_team=args.players_per_team)).start()
+    workdir = tempfile.mkdtemp(prefix="bench-cold-")
+    base = dict(os.environ, **server.env(), CACHE_BACKEND='sqlite',
+                CACHE_SQLITE_PATH=os.path.join(workdir, "shared.sqlite"))
+    runs = iter(range(10**6))
+
+    def env(**extra):
+        # Each cold start gets its own store and HTTP cache, like a fresh container
+        local = os.path.join(workdir, str(next(runs)))
+        return dict(base, GAMELOG_STORE_PATH=os.path.join(local, "gamelogs.sqlite"),
+                    HTTP_CACHE_DIR=os.path.join(local, "http"),
+                    PLAYERS_CACHE_FILE=os.path.join(local, "active_players.json"), **extra)
+
+    # One instance builds and publishes the picks every later cold start reads
+    built = cold_start(env(), ENDPOINTS[-1])
+    print(f"builder: first picks request {built['request'] * 1000:.0f}ms (not a cached read)\n")
+
+    for label, extra in (("lazy", {}), ("preload", {'PRELOAD_SERVICES': 'true'})):
+        total, profile = import_profile(env(**extra), args.top)
+        print(f"{label}: import lambda_handler {total:.0f}ms (-X importtime), top packages: "
+              + ", ".join(f"{pkg} {ms:.0f}ms" for ms, pkg in profile))
+        for path in ENDPOINTS:
+            results = [cold_start(env(**extra), path) for _ in range(args.runs)]
+            mid = lambda key: sorted(r[key] for r in results)[len(results) // 2]
+            print(f"  {path:>24}: import {mid('import') * 1000:6.0f}ms  first request {mid('request') * 1000:6.0f}ms  "
+                  f"total {(mid('import') + mid('request')) * 1000:6.0f}ms  rss {mid('rss_mb'):5.0f}MB  "
+                  f"status {results[0]['status']}  loaded {results[0]['loaded'] or '-'}")
+        print()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
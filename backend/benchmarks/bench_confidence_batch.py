@@ -0,0 +1,108 @@
+"""
+Benchmark: per-prop analyze_player loop vs NBAAnalyzer.analyze_slate, plus
+analyze_ladder over every bookmaker offer on the same slate
+Run from backend/:  python -m benchmarks.bench_confidence_batch [--players 500] [--seed 7] [--books 8]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import NBAAnalyzer
+
+PRICES = [-250, -160, -130, -115, -110, -105, 100, 105, 120, 150, 210]
+
+
+def synthetic_slate(players: int, seed: int) -> dict:
+    """Game logs and all seven props per player, including the awkward cases:
+    short logs, flat (zero-variance) stats, zero averages and missing prices."""
+    rng = np.random.default_rng(seed)
+    slate = {}
+    for i in range(players):
+        n = int(rng.choice([15, 15, 15, 12, 10, 9, 7, 6, 5, 3]))
+        logs = {
+            'PTS': rng.poisson(rng.uniform(4, 30), n),
+            'REB': rng.poisson(rng.uniform(1, 12), n),
+            'AST': rng.poisson(rng.uniform(0.5, 9), n),
+            'BLK': rng.poisson(rng.uniform(0, 2), n),
+            'STL': rng.poisson(rng.uniform(0, 2), n),
+            'FG3M': rng.poisson(rng.uniform(0, 4), n),
+            'MIN': rng.normal(30, 5, n).round(),
+        }
+        if i % 25 == 0:
+            logs['STL'] = np.full(n, 1)
+        if i % 40 == 0:
+            logs['BLK'] = np.zeros(n)
+        game_logs = pd.DataFrame({k: v.astype(float) for k, v in logs.items()})
+
+        props = {}
+        for stat, values in logs.items():
+            line = max(0.5, np.floor(values.mean() + rng.normal(0, 1.5)) + 0.5)
+            over = int(rng.choice(PRICES))
+            under = None if rng.random() < 0.03 else int(rng.choice(PRICES))
+            props[stat] = {'line': float(line), 'over_price': over, 'under_price': under}
+        slate[f"Player {i}"] = (game_logs, props)
+    return slate
+
+
+def synthetic_ladders(slate: dict, books: int, seed: int) -> dict:
+    """Each book quotes both sides at the consensus line or half a point either side."""
+    rng = np.random.default_rng(seed + 1)
+    ladders = {}
+    for name, (game_logs, props) in slate.items():
+        ladders[name] = {}
+        for stat, prop in props.items():
+            offers = []
+            for b in range(books):
+                line = max(0.5, prop['line'] + float(rng.choice([-1.0, -0.5, 0.0, 0.0, 0.5, 1.0])))
+                for side in ('Over', 'Under'):
+                    offers.append({'line': line, 'side': side, 'price': int(rng.choice(PRICES)), 'bookmaker': f"book{b}"})
+            ladders[name][stat] = offers
+    return ladders
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--books", type=int, default=8)
+    args = parser.parse_args()
+
+    analyzer = NBAAnalyzer(num_games=10)
+    slate = synthetic_slate(args.players, args.seed)
+
+    loop_time, batch_time = float("inf"), float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        expected = {name: analyzer.analyze_player(logs, name, props) for name, (logs, props) in slate.items()}
+        loop_time = min(loop_time, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual, errors = analyzer.analyze_slate(slate)
+        batch_time = min(batch_time, time.perf_counter() - start)
+
+    assert not errors
+    assert actual == expected, "batch predictions differ from analyze_player"
+    props = sum(len(p) for p in expected.values())
+    print(f"{args.players} players x 7 stats ({props} props, best of {args.repeat})")
+    print(f"  analyze_player loop: {loop_time * 1000:7.1f}ms")
+    print(f"  analyze_slate batch: {batch_time * 1000:7.1f}ms  ({loop_time / batch_time:.1f}x, outputs identical)")
+
+    ladders = synthetic_ladders(slate, args.books, args.seed)
+    ladder_slate = {name: (slate[name][0], ladders[name]) for name in slate}
+    offers = sum(len(o) for stats in ladders.values() for o in stats.values())
+    ladder_time = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        best, errors = analyzer.analyze_ladder(ladder_slate)
+        ladder_time = min(ladder_time, time.perf_counter() - start)
+    assert not errors
+    print(f"  analyze_ladder:      {ladder_time * 1000:7.1f}ms  ({offers} offers from {args.books} books, "
+          f"{sum(len(p) for p in best.values())} best-EV picks)")
+
+
+if __name__ == "__main__":
+    main()
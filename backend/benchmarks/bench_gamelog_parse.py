@@ -0,0 +1,92 @@
+"""
+Benchmark: ESPN gamelog parsing, row-dict parse vs the columnar parse in NBAFetcher
+Run from backend/:  python -m benchmarks.bench_gamelog_parse [--players 300] [--games 82]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from src.fetcher import NBAFetcher, _rows_to_frame, _split_made, _to_float
+from standin_server import SyntheticLeague
+
+
+def legacy_parse(data: dict, num_games):
+    """The previous parse: one dict per game with per-row label lookups, then a full-frame dedupe/sort."""
+    labels = data.get("labels") or []
+    idx = {label: i for i, label in enumerate(labels)}
+    events_meta = data.get("events") or {}
+
+    rows = []
+    for season_type in data.get("seasonTypes") or []:
+        name = (season_type.get("displayName") or "").lower()
+        if "regular" not in name and "post" not in name:
+            continue
+        for category in season_type.get("categories") or []:
+            for ev in category.get("events") or []:
+                stats = ev.get("stats") or []
+                if not stats:
+                    continue
+                eid = str(ev.get("eventId") or "")
+                meta = events_meta.get(eid) or {}
+                rows.append({
+                    "GAME_ID": eid,
+                    "GAME_DATE": meta.get("gameDate"),
+                    "MATCHUP": (meta.get("opponent") or {}).get("displayName") or "",
+                    "MIN": _to_float(stats[idx["MIN"]]) if "MIN" in idx and idx["MIN"] < len(stats) else 0.0,
+                    "PTS": _to_float(stats[idx["PTS"]]) if "PTS" in idx and idx["PTS"] < len(stats) else 0.0,
+                    "REB": _to_float(stats[idx["REB"]]) if "REB" in idx and idx["REB"] < len(stats) else 0.0,
+                    "AST": _to_float(stats[idx["AST"]]) if "AST" in idx and idx["AST"] < len(stats) else 0.0,
+                    "BLK": _to_float(stats[idx["BLK"]]) if "BLK" in idx and idx["BLK"] < len(stats) else 0.0,
+                    "STL": _to_float(stats[idx["STL"]]) if "STL" in idx and idx["STL"] < len(stats) else 0.0,
+                    "FG3M": _split_made(stats[idx["3PT"]]) if "3PT" in idx and idx["3PT"] < len(stats) else 0.0,
+                })
+    return _rows_to_frame(rows, num_games)
+
+
+def payloads(players: int, games: int) -> list:
+    league = SyntheticLeague(players_per_team=-(-players // 30), history=games)
+    out = []
+    for aid in list(league.players)[:players]:
+        data = league.gamelog(aid)
+        # ESPN repeats a season's games under a postseason block and lists preseason separately
+        rows = data["seasonTypes"][0]["categories"][0]["events"]
+        data["seasonTypes"].append({"displayName": "Postseason", "categories": [{"events": rows[:4]}]})
+        data["seasonTypes"].append({"displayName": "Preseason", "categories": [{"events": rows[:6]}]})
+        out.append(data)
+    return out
+
+
+def timed(fn, datas, num_games, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = [fn(d, num_games) for d in datas]
+        best = min(best, time.perf_counter() - start)
+    return best, frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--games", type=int, default=82)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    datas = payloads(args.players, args.games)
+    fetcher = NBAFetcher()
+
+    print(f"{args.players} gamelogs x {args.games} games (best of {args.repeat})")
+    for num_games in (15, None):
+        legacy_time, legacy_frames = timed(legacy_parse, datas, num_games, args.repeat)
+        new_time, new_frames = timed(fetcher._parse_gamelog, datas, num_games, args.repeat)
+        for old, new in zip(legacy_frames, new_frames):
+            pd.testing.assert_frame_equal(old, new)
+        label = "full season" if num_games is None else f"last {num_games}"
+        print(f"  {label:>11}: row-dict {legacy_time * 1000:7.1f}ms  columnar {new_time * 1000:7.1f}ms  "
+              f"({legacy_time / new_time:.1f}x, frames identical)")
+
+
+if __name__ == "__main__":
+    main()
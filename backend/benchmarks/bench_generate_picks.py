@@ -0,0 +1,54 @@
+"""
+Benchmark: end-to-end generate_all_picks against the local stand-in server
+Cold run (empty game-log store and HTTP cache) followed by a warm refresh.
+Run from backend/:  python -m benchmarks.bench_generate_picks [--games 10] [--latency 0.15]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from standin_server import StandInServer, SyntheticLeague
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--source", default="gamelog", choices=["gamelog", "boxscore"])
+    args = parser.parse_args()
+
+    league = SyntheticLeague(games=args.games, players_per_team=args.players_per_team)
+    server = StandInServer(league, latency=args.latency, error_rate=args.error_rate).start()
+
+    # app reads its configuration at import time, so point it at the server first
+    workdir = tempfile.mkdtemp(prefix="bench-picks-")
+    os.environ.update(server.env())
+    os.environ["GAMELOG_STORE_PATH"] = os.path.join(workdir, "gamelogs.sqlite")
+    os.environ["HTTP_CACHE_DIR"] = os.path.join(workdir, "http")
+    os.environ["PLAYERS_CACHE_FILE"] = os.path.join(workdir, "active_players.json")
+    os.environ["GAMELOG_SOURCE"] = args.source
+    import app
+
+    runs = []
+    for label in ("cold", "warm"):
+        before = dict(server.requests)
+        start = time.perf_counter()
+        predictions, _ = app.generate_all_picks(force_refresh=True)
+        elapsed = time.perf_counter() - start
+        requests = {k: v - before.get(k, 0) for k, v in server.requests.items() if v - before.get(k, 0)}
+        runs.append((label, elapsed, len(predictions), requests))
+
+    server.stop()
+
+    print(f"\nSlate: {args.games} games, {args.players_per_team} players/team, "
+          f"latency {args.latency * 1000:.0f}ms, source={args.source}")
+    for label, elapsed, n, requests in runs:
+        print(f"{label:>5}: {elapsed:6.2f}s  {n} predictions  upstream requests {requests}")
+
+
+if __name__ == "__main__":
+    main()
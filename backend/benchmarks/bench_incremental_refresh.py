@@ -0,0 +1,79 @@
+"""
+Benchmark: forced picks refreshes against the local stand-in server, full rebuild
+vs incremental refresh when a given fraction of props moved since the last build.
+Odds are fetched from the stand-in each time; moved props get their first offer's
+price shifted. Also checks the incremental result equals a full rebuild.
+Run from backend/:  python -m benchmarks.bench_incremental_refresh [--games 10] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import os
+import random
+import tempfile
+import time
+
+from standin_server import StandInServer, SyntheticLeague
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--line-mode", default="consensus", choices=["consensus", "ladder"])
+    args = parser.parse_args()
+
+    server = StandInServer(SyntheticLeague(games=args.games, players_per_team=args.players_per_team),
+                           latency=args.latency).start()
+    workdir = tempfile.mkdtemp(prefix="bench-incremental-")
+    os.environ.update(server.env())
+    os.environ["GAMELOG_STORE_PATH"] = os.path.join(workdir, "gamelogs.sqlite")
+    os.environ["HTTP_CACHE_DIR"] = os.path.join(workdir, "http")
+    os.environ["PLAYERS_CACHE_FILE"] = os.path.join(workdir, "active_players.json")
+    os.environ["PICKS_LINE_MODE"] = args.line_mode
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        app.generate_all_picks(force_refresh=True, full=True)
+
+    fetch = app.get_odds_fetcher().get_all_player_props
+    state = {'moved': 0.0}
+
+    def moved_odds():
+        raw = copy.deepcopy(fetch())
+        rng = random.Random(int(state['moved'] * 1000))
+        for data in raw.values():
+            for offers in data['props'].values():
+                if offers and rng.random() < state['moved']:
+                    offers[0]['price'] = (offers[0]['price'] or -110) - 5
+        return raw
+
+    app.get_odds_fetcher().get_all_player_props = moved_odds
+
+    def refresh(full):
+        upstream = sum(server.requests.values())
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            picks, _ = app.generate_all_picks(force_refresh=True, full=full)
+        return time.perf_counter() - start, sum(server.requests.values()) - upstream, picks
+
+    def after_move(moved, full):
+        # rebuild the unmoved snapshot first, then refresh over the moved odds
+        state['moved'] = 0.0
+        refresh(True)
+        state['moved'] = moved
+        return refresh(full)
+
+    for moved in (0.0, 0.01, 0.1, 1.0):
+        incremental, inc_requests, inc_picks = after_move(moved, False)
+        full, full_requests, full_picks = after_move(moved, True)
+        print(f"{moved * 100:5.1f}% of props moved: full {full * 1000:8.1f}ms ({full_requests} upstream requests)  "
+              f"incremental {incremental * 1000:8.1f}ms ({inc_requests} upstream requests)  "
+              f"{full / incremental:5.1f}x  identical {inc_picks == full_picks}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: recording a day of odds snapshots in the line-movement history vs
+keeping every full snapshot as gzipped JSON lines. The stand-in slate's odds are
+snapshotted every --interval minutes, with a small share of offers moving each
+time. Reports storage, append time and range-query latency.
+Run from backend/:  python -m benchmarks.bench_line_history [--games 10] [--days 3] [--interval 5]
+"""
+
+import argparse
+import contextlib
+import copy
+import gzip
+import io
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src.line_history import LineHistoryStore
+from src.odds_fetcher import OddsFetcher
+from standin_server import StandInServer, SyntheticLeague
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--hours", type=float, default=12, help="hours of snapshots per day")
+    parser.add_argument("--interval", type=float, default=5, help="minutes between snapshots")
+    parser.add_argument("--move-rate", type=float, default=0.02, help="share of offers repriced per snapshot")
+    args = parser.parse_args()
+
+    with StandInServer(SyntheticLeague(games=args.games, players_per_team=args.players_per_team)) as server:
+        with contextlib.redirect_stdout(io.StringIO()):
+            base = OddsFetcher(api_key="bench", base_url=f"{server.url}/odds/v4").get_all_player_props()
+        ids = {p['name']: p['id'] for p in server.league.players.values()}
+
+    workdir = tempfile.mkdtemp(prefix="bench-lines-")
+    store = LineHistoryStore(os.path.join(workdir, "lines.sqlite"))
+    jsonl_path = os.path.join(workdir, "snapshots.jsonl.gz")
+    rng = random.Random(0)
+    per_day = int(args.hours * 60 / args.interval)
+    start_ts = 1_736_000_000
+    append_times, raw_bytes = [], 0
+
+    with gzip.open(jsonl_path, "wt") as jsonl:
+        for day in range(args.days):
+            # a new slate: same players, fresh event ids
+            odds = copy.deepcopy(base)
+            for data in odds.values():
+                data['event_id'] = f"{data['event_id']}-{day}"
+            for i in range(per_day):
+                for data in odds.values():
+                    for offers in data['props'].values():
+                        for o in offers:
+                            if rng.random() < args.move_rate:
+                                o['price'] += rng.choice((-5, 5))
+                            elif rng.random() < args.move_rate / 4:
+                                o['line'] += rng.choice((-1.0, 1.0))
+                ts = start_ts + day * 86400 + int(i * args.interval * 60)
+                line = json.dumps({'ts': ts, 'odds': odds})
+                raw_bytes += len(line)
+                jsonl.write(line + "\n")
+                started = time.perf_counter()
+                store.append(odds, ts=ts, player_ids=ids)
+                append_times.append(time.perf_counter() - started)
+
+    # fold the write-ahead log into the database so the size is the steady-state one
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    stats = store.stats()
+    player = next(iter(base))
+    event = base[player]['event_id'] + "-0"
+    timings = {}
+    for label, query in (
+        ("player, all days", lambda: list(store.history(player=player))),
+        ("player, 1 hour", lambda: list(store.history(player=player, start=start_ts + 3600, end=start_ts + 7200))),
+        ("event, all days", lambda: list(store.history(event_id=event))),
+        ("snapshot_at, one event", lambda: store.snapshot_at(start_ts + 3600, event_id=event)),
+        ("closing lines, all days", lambda: [p for day in store.closing_snapshots().values() for p in day]),
+    ):
+        started = time.perf_counter()
+        rows = query()
+        timings[label] = (time.perf_counter() - started, len(rows))
+
+    append_times.sort()
+    print(f"{args.days} days x {per_day} snapshots, {stats['offer_listings_seen'] // len(append_times)} offers each")
+    print(f"  raw JSON snapshots    {raw_bytes / 1e6:9.1f} MB")
+    print(f"  gzipped JSONL         {os.path.getsize(jsonl_path) / 1e6:9.1f} MB")
+    print(f"  line history          {stats['bytes'] / 1e6:9.1f} MB  "
+          f"({stats['changes_stored']} change rows for {stats['offer_listings_seen']} listings, "
+          f"dedup {stats['dedup_ratio']}x)")
+    print(f"  append median {append_times[len(append_times) // 2] * 1000:.1f}ms  "
+          f"p95 {append_times[int(len(append_times) * 0.95)] * 1000:.1f}ms")
+    for label, (elapsed, n) in timings.items():
+        print(f"  {label:>24}: {elapsed * 1000:8.1f}ms  ({n} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: same-game parlay branch and bound vs exhaustive enumeration
+Run from backend/:  python -m benchmarks.bench_parlays [--games 15] [--players-per-team 13] [--budget 5]
+"""
+
+import argparse
+import itertools
+import math
+import random
+import time
+
+from src.analyzer import NBAAnalyzer
+from src.fetcher import NBAFetcher
+from src.parlay import _bitsets, _Leg, build_parlays, conditional_lift
+from standin_server import SyntheticLeague
+
+PRICES = [-150, -130, -115, -110, -105, 100, 110, 125, 150]
+
+
+def slate_predictions(league: SyntheticLeague, seed: int) -> tuple:
+    """generate_all_picks-shaped predictions for every slate player, plus their game logs."""
+    rng = random.Random(seed)
+    fetcher = NBAFetcher()
+    slate, logs = {}, {}
+    for pair, event in enumerate(league.odds_events()):
+        for team in (2 * pair, 2 * pair + 1):
+            for player in league.roster(team):
+                df = fetcher._parse_gamelog(league.gamelog(player['id']), 15)
+                props = {
+                    stat: {'line': max(0.5, round(mean + rng.uniform(-1.5, 1.5)) - 0.5),
+                           'over_price': rng.choice(PRICES), 'under_price': rng.choice(PRICES)}
+                    for stat, mean in player['means'].items()
+                }
+                slate[player['name']] = (df, props)
+                logs[player['name']] = df
+    predictions_map, _ = NBAAnalyzer(num_games=10).analyze_slate(slate)
+    events = {p['name']: event for pair, event in enumerate(league.odds_events())
+              for team in (2 * pair, 2 * pair + 1) for p in league.roster(team)}
+    predictions = []
+    for name, preds in predictions_map.items():
+        for pred in preds:
+            pred['event_id'] = events[name]['id']
+        predictions.extend(preds)
+    return predictions, logs
+
+
+def exhaustive(predictions: list, logs: dict, top_k: int, max_legs: int) -> list:
+    """Every 2..max_legs combination in one event, with the same joint-probability estimate."""
+    game_index = {}
+    legs = sorted((_Leg(p, *_bitsets(p, logs.get(p['player_name']), game_index)) for p in predictions),
+                  key=lambda leg: -leg.gain)
+    evs = []
+    for size in range(2, max_legs + 1):
+        for combo in itertools.combinations(legs, size):
+            p, decimal = combo[0].p, combo[0].decimal
+            played, hits = combo[0].played, combo[0].hits
+            for leg in combo[1:]:
+                p *= min(1.0, leg.p * conditional_lift(played, hits, leg))
+                decimal *= leg.decimal
+                played, hits = played & leg.played, hits & leg.hits
+            evs.append(p * decimal - 1.0)
+    return sorted(evs, reverse=True)[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=15)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=5.0)
+    parser.add_argument("--check-candidates", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    league = SyntheticLeague(games=args.games, players_per_team=args.players_per_team, history=40)
+    predictions, logs = slate_predictions(league, args.seed)
+    per_event = len(predictions) / max(1, args.games)
+    brute = sum(math.comb(int(per_event), k) for k in (2, 3, 4)) * args.games
+
+    start = time.perf_counter()
+    parlays, stats = build_parlays(predictions, logs, top_k=args.top_k, budget=args.budget)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(predictions)} predictions in {args.games} events (~{per_event:.0f} per event)")
+    print(f"  exhaustive 2-4 legs: ~{brute:.2e} combinations")
+    print(f"  branch and bound:    {elapsed:6.2f}s  {stats['nodes']} nodes, {stats['pruned']} cuts, "
+          f"complete={stats['complete']}")
+    for parlay in parlays[:5]:
+        legs = ", ".join(f"{l['player_name']} {l['stat_type']} {l['pick']} {l['line']}" for l in parlay['legs'])
+        print(f"    EV {parlay['ev']:+.3f}  {parlay['american_odds']:+d}  p={parlay['probability']:.3f}  {legs}")
+
+    # Exactness on one event cut down to where brute force is feasible
+    event = predictions[0]['event_id']
+    subset = sorted((p for p in predictions if p['event_id'] == event), key=lambda p: -p['ev'])[:args.check_candidates]
+    start = time.perf_counter()
+    expected = exhaustive(subset, logs, args.top_k, 4)
+    brute_time = time.perf_counter() - start
+    start = time.perf_counter()
+    got, sub_stats = build_parlays(subset, logs, top_k=args.top_k, budget=60)
+    bnb_time = time.perf_counter() - start
+    assert [round(e, 4) for e in expected] == [p['ev'] for p in got], "branch and bound missed a top parlay"
+    print(f"  {args.check_candidates} candidates, one event: exhaustive {brute_time:.2f}s vs "
+          f"branch and bound {bnb_time:.3f}s ({sub_stats['nodes']} nodes), same top {args.top_k}")
+
+
+if __name__ == "__main__":
+    main()
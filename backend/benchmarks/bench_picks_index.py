@@ -0,0 +1,135 @@
+"""
+Benchmark: /api/picks/top and /api/picks/player, scanning the whole picks cache
+per request vs the prebuilt PicksIndex
+Run from backend/:  python -m benchmarks.bench_picks_index [--players 500] [--repeat 200]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_confidence_batch import synthetic_slate
+from src.analyzer import NBAAnalyzer
+from src.names import normalize_name
+from src.picks_index import PicksIndex
+
+QUERIES = [
+    {},
+    {'stat_type': 'PTS'},
+    {'pick': 'UNDER'},
+    {'stat_type': 'AST', 'pick': 'OVER', 'min_confidence': 65.0},
+    {'min_ev': 0.1, 'top_n': 25},
+]
+
+
+def synthetic_predictions(analyzer, players: int) -> list:
+    """generate_all_picks-shaped predictions: 7 props per player, 15 events, 30 teams."""
+    predictions_map, _ = analyzer.analyze_slate(synthetic_slate(players, 7))
+    predictions = []
+    for i, preds in enumerate(predictions_map.values()):
+        for p in preds:
+            p.update(team=f"T{i % 30:02d}", event_id=str(800000 + i % 30 // 2),
+                     home_team=f"T{i % 30 // 2 * 2:02d}", away_team=f"T{i % 30 // 2 * 2 + 1:02d}")
+        predictions.extend(preds)
+    return predictions
+
+
+def legacy_top(analyzer, predictions, stat_type=None, pick=None, min_ev=0.0, min_confidence=0.0, top_n=5):
+    """What get_top_picks did per request before the index."""
+    filtered = predictions
+    if stat_type:
+        filtered = [p for p in filtered if p['stat_type'] == stat_type]
+    if pick:
+        filtered = [p for p in filtered if p['pick'] == pick]
+    return analyzer.rank_picks(filtered, min_ev=min_ev, min_confidence=min_confidence, top_n=top_n)
+
+
+def legacy_player(predictions, name):
+    target = normalize_name(name)
+    return [p for p in predictions if normalize_name(p['player_name']) == target]
+
+
+class LegacyIndex:
+    """Stand-in for PicksIndex with the old per-request scans, to time the endpoints before/after."""
+
+    def __init__(self, analyzer, predictions):
+        self.analyzer, self.predictions = analyzer, predictions
+
+    def top(self, **query):
+        return legacy_top(self.analyzer, self.predictions, **query)
+
+    def player(self, name):
+        return legacy_player(self.predictions, name)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def prefilled_app(predictions, **cache):
+    """Import app against a scratch directory with the picks cache already filled."""
+    workdir = tempfile.mkdtemp(prefix="bench-index-")
+    os.environ["GAMELOG_STORE_PATH"] = os.path.join(workdir, "gamelogs.sqlite")
+    os.environ["HTTP_CACHE_DIR"] = os.path.join(workdir, "http")
+    os.environ["PLAYERS_CACHE_FILE"] = os.path.join(workdir, "active_players.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    app.picks_cache.update(data=predictions, raw_odds={}, timestamp=datetime.now(), **cache)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    analyzer = NBAAnalyzer(num_games=10)
+    predictions = synthetic_predictions(analyzer, args.players)
+    name = predictions[0]['player_name']
+
+    start = time.perf_counter()
+    index = PicksIndex(predictions)
+    build = time.perf_counter() - start
+
+    print(f"{len(predictions)} predictions; index built in {build * 1000:.1f}ms (once per picks rebuild)")
+    for q in QUERIES:
+        assert index.top(**q) == legacy_top(analyzer, predictions, **q), q
+        old = best_of(lambda: legacy_top(analyzer, predictions, **q), args.repeat)
+        new = best_of(lambda: index.top(**q), args.repeat)
+        print(f"  top {str(q):<62} scan {old * 1e6:8.1f}us  index {new * 1e6:6.1f}us  ({old / new:.0f}x)")
+    assert index.player(name) == legacy_player(predictions, name)
+    old = best_of(lambda: legacy_player(predictions, name), args.repeat)
+    new = best_of(lambda: index.player(name), args.repeat)
+    print(f"  player lookup{'':<58} scan {old * 1e6:8.1f}us  index {new * 1e6:6.1f}us  ({old / new:.0f}x)")
+
+    # End to end through Flask with the cache pre-filled, so only the request path is timed
+    app = prefilled_app(predictions, index=index)
+    client = app.app.test_client()
+    indexed = app._picks_index
+    legacy = LegacyIndex(analyzer, predictions)
+    for url in ("/api/picks/top?stat_type=PTS&pick_type=over&limit=10", "/api/picks/top?limit=10",
+                f"/api/picks/player/{name}"):
+        timings = []
+        for lookup in (lambda preds: legacy, indexed):
+            app._picks_index = lookup
+            with contextlib.redirect_stdout(io.StringIO()):
+                body = client.get(url).get_json()
+                timings.append((best_of(lambda: client.get(url), args.repeat // 4 or 1), body))
+        app._picks_index = indexed
+        (old, old_body), (new, new_body) = timings
+        assert {k: v for k, v in old_body.items() if k not in ("generated_at", "cache_age_seconds")} == \
+            {k: v for k, v in new_body.items() if k not in ("generated_at", "cache_age_seconds")}
+        print(f"  GET {url:<56} scan {old * 1000:6.2f}ms  index {new * 1000:6.2f}ms")
+
+if __name__ == "__main__":
+    main()
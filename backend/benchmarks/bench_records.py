@@ -0,0 +1,171 @@
+"""
+Benchmark: game logs as pandas DataFrames vs pandas-free GameLogs (src/records.py)
+through the picks pipeline.
+  parse      NBAFetcher._parse_gamelog over synthetic ESPN payloads, per format
+  memory     bytes still allocated for a slate of parsed logs (tracemalloc)
+  analyze    NBAAnalyzer.analyze_slate over those logs
+  process    a fresh interpreter importing the fetcher + analyzer, parsing and
+             analyzing one slate: wall time, RSS it added, whether pandas loaded
+  picks      a full app picks build against the stand-in server per GAMELOG_FORMAT,
+             each in its own process, checking both give identical picks
+Run from backend/:  python -m benchmarks.bench_records [--players 260] [--games 82]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+FORMATS = ('frame', 'records')
+
+
+def payloads(players: int, games: int) -> list:
+    """bench_gamelog_parse's payloads, without importing pandas along with that module."""
+    from standin_server import SyntheticLeague
+    league = SyntheticLeague(players_per_team=-(-players // 30), history=games)
+    out = []
+    for aid in list(league.players)[:players]:
+        data = league.gamelog(aid)
+        rows = data["seasonTypes"][0]["categories"][0]["events"]
+        data["seasonTypes"].append({"displayName": "Postseason", "categories": [{"events": rows[:4]}]})
+        out.append(data)
+    return out
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux, like Lambda)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def slate_props(logs):
+    return {name: {'PTS': {'line': 14.5, 'over_price': -110, 'under_price': -110},
+                   'REB': {'line': 5.5, 'over_price': -115, 'under_price': -105}} for name in logs}
+
+
+def process(fmt, players, games):
+    """One fresh process: import, parse a slate and analyze it; prints timings as JSON."""
+    data = payloads(players, games)
+    baseline = rss_mb()
+    built = time.perf_counter()
+    from src.analyzer import NBAAnalyzer
+    from src.fetcher import NBAFetcher
+    fetcher = NBAFetcher(log_format=fmt)
+    logs = {str(i): fetcher._parse_gamelog(d, 15) for i, d in enumerate(data)}
+    results, _ = NBAAnalyzer().analyze_slate({name: (l, p) for (name, l), p in
+                                              zip(logs.items(), slate_props(logs).values())})
+    print(json.dumps({
+        'seconds': time.perf_counter() - built,
+        'rss_added_mb': rss_mb() - baseline,
+        'pandas': 'pandas' in sys.modules,
+        'predictions': sum(len(v) for v in results.values()),
+    }))
+
+
+def build_picks(fmt):
+    """One fresh process: a full picks build through app.py; prints timings and a digest of the picks."""
+    import resource
+    import gc
+    os.environ['GAMELOG_FORMAT'] = fmt
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        started = time.perf_counter()
+        picks, _ = app.generate_all_picks(force_refresh=True)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    print(json.dumps({
+        'seconds': elapsed,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_mb': rss_mb(),
+        'pandas': 'pandas' in sys.modules,
+        'picks': len(picks),
+        'digest': hashlib.sha1(json.dumps(picks, sort_keys=True, default=str).encode()).hexdigest(),
+    }))
+
+
+def child(args, env=None):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_records", *args],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=260)
+    parser.add_argument("--games", type=int, default=82, help="games per player in each gamelog payload")
+    parser.add_argument("--slate-games", type=int, default=10, help="stand-in slate size for the picks build")
+    parser.add_argument("--process", choices=FORMATS, help=argparse.SUPPRESS)
+    parser.add_argument("--build", choices=FORMATS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.process:
+        return process(args.process, args.players, args.games)
+    if args.build:
+        return build_picks(args.build)
+
+    from src.analyzer import NBAAnalyzer
+    from src.fetcher import NBAFetcher
+    data = payloads(args.players, args.games)
+    fetchers = {fmt: NBAFetcher(log_format=fmt) for fmt in FORMATS}
+    analyzer = NBAAnalyzer()
+
+    print(f"{args.players} players, {args.games}-game gamelog payloads")
+    results = {}
+    for fmt, fetcher in fetchers.items():
+        window, logs = timed(lambda: {str(i): fetcher._parse_gamelog(d, 15) for i, d in enumerate(data)})
+        season, _ = timed(lambda: [fetcher._parse_gamelog(d, None) for d in data])
+        sizes = {}
+        for label, num_games in (("15 games", 15), ("full season", None)):
+            tracemalloc.start()
+            kept = [fetcher._parse_gamelog(d, num_games) for d in data]
+            sizes[label] = tracemalloc.get_traced_memory()[0] / len(kept)
+            tracemalloc.stop()
+            del kept
+        props = slate_props(logs)
+        analyze, predictions = timed(lambda: analyzer.analyze_slate({n: (l, props[n]) for n, l in logs.items()})[0])
+        results[fmt] = predictions
+        print(f"  {fmt:>8}: parse {window * 1000:7.1f}ms (15 games) {season * 1000:7.1f}ms (full season)  "
+              f"memory/player {sizes['15 games'] / 1024:6.1f}KB (15) {sizes['full season'] / 1024:6.1f}KB (season)  "
+              f"analyze_slate {analyze * 1000:6.1f}ms")
+    print(f"  identical predictions: {results['frame'] == results['records']}")
+
+    print("\nfresh process: import + parse + analyze one slate")
+    for fmt in FORMATS:
+        r = child(["--process", fmt, "--players", str(args.players), "--games", str(args.games)])
+        print(f"  {fmt:>8}: {r['seconds'] * 1000:7.1f}ms  rss added {r['rss_added_mb']:5.1f}MB  pandas loaded {r['pandas']}")
+
+    from standin_server import StandInServer, SyntheticLeague
+    print(f"\npicks build against the stand-in ({args.slate_games} games)")
+    with StandInServer(SyntheticLeague(games=args.slate_games)) as server:
+        digests = set()
+        for fmt in FORMATS:
+            workdir = tempfile.mkdtemp(prefix=f"bench-records-{fmt}-")
+            env = dict(os.environ, **server.env(),
+                       GAMELOG_STORE_PATH=os.path.join(workdir, "gamelogs.sqlite"),
+                       HTTP_CACHE_DIR=os.path.join(workdir, "http"),
+                       PLAYERS_CACHE_FILE=os.path.join(workdir, "active_players.json"))
+            r = child(["--build", fmt], env)
+            digests.add(r['digest'])
+            print(f"  {fmt:>8}: {r['seconds'] * 1000:7.1f}ms  {r['picks']} picks  rss {r['rss_mb']:5.0f}MB "
+                  f"(peak {r['peak_rss_mb']:.0f}MB)  "
+                  f"pandas loaded {r['pandas']}")
+        print(f"  identical picks: {len(digests) == 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: several serving instances coming up against the local stand-in server,
+each with its own per-process cache vs sharing picks through the sqlite and kv
+backends of src/shared_cache.py (one builder, the rest readers). Reports upstream
+ESPN / Odds API requests and each instance's first /api/picks/top latency.
+Each instance is a separate process, like separate Lambda containers.
+Run from backend/:  python -m benchmarks.bench_shared_cache [--instances 4] [--games 10] [--latency 0.05]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from standin_server import StandInServer, SyntheticLeague
+
+
+def instance():
+    """One serving instance: time its first picks request, print the result as JSON."""
+    import contextlib
+    import io
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        imported = time.perf_counter()
+        body = app.app.test_client().get("/api/picks/top?limit=5").get_json()
+    print(json.dumps({
+        'import': imported - started,
+        'first_request': time.perf_counter() - imported,
+        'picks': len(body.get('picks') or []),
+        'shared': app.shared_cache.stats(),
+    }))
+
+
+def run(server, backend, instances, workdir):
+    env = dict(os.environ, **server.env(), CACHE_BACKEND=backend,
+               CACHE_SQLITE_PATH=os.path.join(workdir, f"{backend}.sqlite"), CACHE_KV_URL=server.kv_url)
+    before = sum(v for k, v in server.requests.items() if not k.startswith('kv_'))
+    results = []
+    for i in range(instances):
+        # Each instance gets its own store and HTTP cache, like a fresh container
+        local = os.path.join(workdir, f"{backend}-{i}")
+        env.update({
+            'GAMELOG_STORE_PATH': os.path.join(local, "gamelogs.sqlite"),
+            'HTTP_CACHE_DIR': os.path.join(local, "http"),
+            'PLAYERS_CACHE_FILE': os.path.join(local, "active_players.json"),
+            # with a shared backend only the first instance builds
+            'PICKS_BUILDER': 'true' if backend == 'memory' or i == 0 else 'false',
+        })
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_shared_cache", "--instance"],
+                             env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    upstream = sum(v for k, v in server.requests.items() if not k.startswith('kv_')) - before
+    return results, upstream
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--instance", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.instance:
+        return instance()
+
+    server = StandInServer(SyntheticLeague(games=args.games, players_per_team=args.players_per_team),
+                           latency=args.latency).start()
+    workdir = tempfile.mkdtemp(prefix="bench-shared-")
+    for backend in ('memory', 'sqlite', 'kv'):
+        results, upstream = run(server, backend, args.instances, workdir)
+        first = [r['first_request'] * 1000 for r in results]
+        shared = results[-1]['shared']
+        print(f"{backend:>6}: {args.instances} instances  upstream requests {upstream:5d}  "
+              f"builder first request {first[0]:8.1f}ms  "
+              f"other instances {min(first[1:] or [0]):8.1f}-{max(first[1:] or [0]):8.1f}ms  "
+              f"picks served {[r['picks'] for r in results]}  "
+              f"payload {shared['bytes_read'] / 1024:.0f}KB read per reader")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
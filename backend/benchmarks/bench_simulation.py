@@ -0,0 +1,80 @@
+"""
+Benchmark: Monte Carlo models vs the normal approximation
+Times a full slate at 10k draws per prop and checks P(OVER) against the true
+probability for players whose games really are Poisson / negative binomial.
+Run from backend/:  python -m benchmarks.bench_simulation [--players 500] [--draws 10000]
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from src.analyzer import NBAAnalyzer
+from src.simulation import MODELS
+
+LOW_COUNT = ['BLK', 'STL', 'FG3M']
+
+
+def nb_tail(line: float, mean: float, shape: float) -> float:
+    """P(X > line) for a negative binomial with this mean and shape (Poisson when shape is inf)."""
+    k_max = int(math.floor(line))
+    cdf = 0.0
+    for k in range(k_max + 1):
+        if math.isinf(shape):
+            cdf += math.exp(-mean + k * math.log(mean) - math.lgamma(k + 1)) if mean > 0 else float(k == 0)
+        else:
+            p = shape / (shape + mean)
+            cdf += math.exp(math.lgamma(k + shape) - math.lgamma(shape) - math.lgamma(k + 1)
+                            + shape * math.log(p) + k * math.log1p(-p))
+    return 1.0 - cdf
+
+
+def synthetic_truth(players: int, games: int, seed: int):
+    """Per-player true (mean, shape) for each low-count stat, a sampled window and a line."""
+    rng = np.random.default_rng(seed)
+    stats = np.zeros((players, games, len(NBAAnalyzer.BATCH_STATS)))
+    lines = np.full((players, len(NBAAnalyzer.BATCH_STATS)), np.nan)
+    truth = np.full(lines.shape, np.nan)
+    for i in range(players):
+        for stat in LOW_COUNT:
+            j = NBAAnalyzer.BATCH_STATS.index(stat)
+            mean = rng.uniform(0.3, 3.0)
+            shape = float(rng.choice([np.inf, 2.0, 5.0]))
+            rate = mean if np.isinf(shape) else rng.gamma(shape, mean / shape, games)
+            stats[i, :, j] = rng.poisson(rate, games)
+            lines[i, j] = max(0.5, round(mean) - 0.5)
+            truth[i, j] = nb_tail(lines[i, j], mean, shape)
+    return stats, lines, truth
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--draws", type=int, default=10000)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    stats, lines, truth = synthetic_truth(args.players, args.games, args.seed)
+    counts = np.full(args.players, args.games)
+    # every stat gets a line for the timing run, as on a full 7-market slate
+    full_lines = np.where(np.isnan(lines), np.maximum(0.5, np.floor(stats.mean(axis=1)) + 0.5), lines)
+    mask = ~np.isnan(lines)
+
+    print(f"{args.players} players x 7 stats, {args.draws} draws per prop, {args.games}-game windows")
+    for model in MODELS:
+        analyzer = NBAAnalyzer(num_games=args.games, model=model, draws=args.draws)
+        start = time.perf_counter()
+        analyzer.calculate_confidence_batch(stats, counts, full_lines)
+        elapsed = time.perf_counter() - start
+
+        p_over = analyzer.calculate_confidence_batch(stats, counts, lines)['p_over'][mask]
+        error = np.abs(p_over - truth[mask])
+        print(f"  {model:>9}: {elapsed * 1000:8.1f}ms   low-count P(OVER) error vs truth: "
+              f"mean {error.mean():.3f}  p90 {np.quantile(error, 0.9):.3f}")
+
+
+if __name__ == "__main__":
+    main()
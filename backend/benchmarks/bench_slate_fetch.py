@@ -0,0 +1,76 @@
+"""
+Benchmark: full-slate game-log fetch against a local stand-in ESPN server
+Run from backend/:  python -m benchmarks.bench_slate_fetch [--players 250] [--latency 0.15]
+                                                           [--throttle-rate 0.05] [--error-rate 0.02]
+"""
+
+import argparse
+import time
+
+from src.fetch_engine import GameLogFetchEngine
+from src.fetcher import NBAFetcher
+from src.http_session import session_stats
+from src.rate_limiter import get_rate_limiter
+from standin_server import StandInServer, SyntheticLeague
+
+# A full slate is ~250 prop players; at 150ms upstream latency the engine must
+# finish inside this wall-clock target to leave room under the 120s Lambda timeout
+TARGET_SECONDS = 10.0
+
+
+def legacy_fetch(fetcher, players: dict):
+    """The previous path: 2 workers, 1.5s sleep per player."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _fetch(pid):
+        time.sleep(1.5)
+        return fetcher.get_player_stats(pid, num_games=15, timeout=30)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(_fetch, players.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=250)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--legacy-sample", type=int, default=10)
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="fraction of requests the stand-in server answers with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests the stand-in server answers with 500")
+    args = parser.parse_args()
+
+    league = SyntheticLeague(players_per_team=-(-args.players // 30))
+    server = StandInServer(league, latency=args.latency, throttle_rate=args.throttle_rate,
+                           error_rate=args.error_rate).start()
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    players = {p["name"]: p["id"] for p in list(league.players.values())[:args.players]}
+
+    sample = dict(list(players.items())[:args.legacy_sample])
+    start = time.perf_counter()
+    legacy_fetch(fetcher, sample)
+    legacy_per_player = (time.perf_counter() - start) / max(1, len(sample))
+    legacy_estimate = legacy_per_player * args.players
+
+    engine = GameLogFetchEngine(fetcher, max_concurrency=args.concurrency)
+    logs_map, error_map = engine.fetch(players, num_games=15)
+    elapsed = engine.last_run["elapsed_seconds"]
+
+    server.stop()
+
+    print(f"Players: {args.players}  upstream latency: {args.latency * 1000:.0f}ms")
+    print(f"Legacy thread pool (extrapolated from {len(sample)}): {legacy_estimate:.1f}s")
+    print(f"Async engine (concurrency {args.concurrency}): {elapsed:.2f}s "
+          f"({len(logs_map)} ok, {len(error_map)} errors)")
+    print(f"Speedup: {legacy_estimate / elapsed:.1f}x")
+    print(f"HTTP pool: {session_stats()}")
+    for host, stats in get_rate_limiter().stats().items():
+        print(f"Rate limiter {host}: {stats}")
+    status = "PASS" if elapsed <= TARGET_SECONDS and not error_map else "FAIL"
+    print(f"Target <= {TARGET_SECONDS:.0f}s: {status}")
+
+
+if __name__ == "__main__":
+    main()
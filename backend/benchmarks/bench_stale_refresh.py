@@ -0,0 +1,77 @@
+"""
+Benchmark: request latency right after the picks cache expires, synchronous
+rebuild vs stale-while-revalidate, against the local stand-in server. Also counts
+how many builds the single-flight layer actually ran for the burst.
+Run from backend/:  python -m benchmarks.bench_stale_refresh [--games 10] [--latency 0.15] [--requests 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from standin_server import StandInServer, SyntheticLeague
+
+
+def expire(app):
+    app.picks_cache['timestamp'] = datetime.now() - timedelta(seconds=app.picks_cache['ttl'] + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    server = StandInServer(SyntheticLeague(games=args.games, players_per_team=args.players_per_team),
+                           latency=args.latency).start()
+    workdir = tempfile.mkdtemp(prefix="bench-swr-")
+    os.environ.update(server.env())
+    os.environ["GAMELOG_STORE_PATH"] = os.path.join(workdir, "gamelogs.sqlite")
+    os.environ["HTTP_CACHE_DIR"] = os.path.join(workdir, "http")
+    os.environ["PLAYERS_CACHE_FILE"] = os.path.join(workdir, "active_players.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        app.generate_all_picks(force_refresh=True)
+    client = app.app.test_client()
+
+    def get(_):
+        start = time.perf_counter()
+        body = client.get("/api/picks/top?limit=5").get_json()
+        return time.perf_counter() - start, body
+
+    results = {}
+    for mode in (False, True):
+        app.PICKS_STALE_WHILE_REVALIDATE = mode
+        expire(app)
+        before, refreshes = app.picks_cache['data'], app.picks_refresh['count']
+        flight = app.picks_flight.stats()
+        upstream = sum(server.requests.values())
+        with contextlib.redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(args.requests) as pool:
+                timings = list(pool.map(get, range(args.requests)))
+            while app.picks_refresh['thread'] is not None:
+                time.sleep(0.05)
+        latencies = sorted(t for t, _ in timings)
+        results[mode] = latencies
+        label = "stale-while-revalidate" if mode else "synchronous rebuild"
+        stale = sum(body['stale'] for _, body in timings)
+        print(f"{label:>22}: {args.requests} concurrent requests after expiry  "
+              f"median {latencies[len(latencies) // 2] * 1000:8.1f}ms  max {latencies[-1] * 1000:8.1f}ms  "
+              f"served stale {stale}  background rebuilds {app.picks_refresh['count'] - refreshes}  "
+              f"builds {app.picks_flight.stats()['executions'] - flight['executions']} "
+              f"(coalesced {app.picks_flight.stats()['coalesced'] - flight['coalesced']})  "
+              f"upstream requests {sum(server.requests.values()) - upstream}  "
+              f"swapped {app.picks_cache['data'] is not before}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: /api/stats/summary computed per request (five passes) vs the
+aggregates built once with the picks cache
+Run from backend/:  python -m benchmarks.bench_stats_summary [--players 500] [--repeat 200]
+"""
+
+import argparse
+import contextlib
+import io
+
+from benchmarks.bench_picks_index import best_of, prefilled_app, synthetic_predictions
+from src.analyzer import NBAAnalyzer
+from src.picks_summary import summarize
+
+
+def legacy_summary(all_predictions, raw_odds):
+    """What get_stats_summary computed on every request before the precomputed aggregates."""
+    total_picks = len(all_predictions)
+    avg_confidence = sum(p['confidence'] for p in all_predictions) / total_picks
+    stat_breakdown = {}
+    for pred in all_predictions:
+        stat_breakdown[pred['stat_type']] = stat_breakdown.get(pred['stat_type'], 0) + 1
+    pick_breakdown = {}
+    for pred in all_predictions:
+        pick_breakdown[pred['pick']] = pick_breakdown.get(pred['pick'], 0) + 1
+    return {
+        'total_picks': total_picks,
+        'players_analyzed': len(raw_odds),
+        'average_confidence': round(avg_confidence, 1),
+        'high_confidence_picks': len([p for p in all_predictions if p['confidence'] >= 75]),
+        'medium_confidence_picks': len([p for p in all_predictions if 65 <= p['confidence'] < 75]),
+        'stat_breakdown': stat_breakdown,
+        'pick_breakdown': pick_breakdown,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    predictions = synthetic_predictions(NBAAnalyzer(num_games=10), args.players)
+    summary = summarize(predictions)
+    legacy = legacy_summary(predictions, {})
+    assert {k: summary[k] for k in legacy} == legacy
+
+    old = best_of(lambda: legacy_summary(predictions, {}), args.repeat)
+    build = best_of(lambda: summarize(predictions), args.repeat // 10 or 1)
+    print(f"{len(predictions)} predictions")
+    print(f"  per-request passes (old fields only): {old * 1000:6.2f}ms")
+    print(f"  summarize, once per rebuild:          {build * 1000:6.2f}ms  "
+          f"(+ {len(summary['by_event'])} events, {len(summary['by_team'])} teams, EV histograms)")
+
+    app = prefilled_app(predictions, summary=(predictions, summary))
+    client = app.app.test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        body = client.get("/api/stats/summary").get_json()
+        assert body['summary'] == summary
+        read = best_of(lambda: client.get("/api/stats/summary"), args.repeat // 4 or 1)
+    print(f"  GET /api/stats/summary (cached read): {read * 1000:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: parameter sweep from precomputed window features vs re-running the
+backtest per parameter set
+Run from backend/:  python -m benchmarks.bench_sweep [--players-per-team 13] [--history 82] [--random 200]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_backtest import build_store, synthetic_snapshots
+from src.backtest import SharedGameLogs, report, run_backtest
+from src.sweep import DEFAULT_GRID, precompute, random_search, run_sweep
+from standin_server import SyntheticLeague
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--history", type=int, default=82)
+    parser.add_argument("--random", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    league = SyntheticLeague(players_per_team=args.players_per_team, history=args.history)
+    store = build_store(os.path.join(tempfile.mkdtemp(prefix="bench-sweep-"), "gamelogs.sqlite"), league)
+    frame = store.load_all()
+    snapshots = synthetic_snapshots(frame, {aid: p['name'] for aid, p in league.players.items()}, args.seed)
+    combos = random_search(args.random, args.seed)
+    windows = DEFAULT_GRID['num_games']
+
+    logs = SharedGameLogs.from_frame(frame)
+    try:
+        start = time.perf_counter()
+        features = precompute(logs, snapshots, windows)
+        precompute_time = time.perf_counter() - start
+
+        # The naive sweep: a full backtest per parameter set (timed on a few, extrapolated)
+        sample = combos[:3]
+        start = time.perf_counter()
+        reports = [report(run_backtest(logs, snapshots, c)) for c in sample]
+        naive_time = (time.perf_counter() - start) / len(sample) * len(combos)
+
+        pooled_features = precompute(logs, snapshots, windows, workers=args.workers)
+    finally:
+        logs.close()
+
+    start = time.perf_counter()
+    table = run_sweep(features, combos)
+    score_time = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = run_sweep(pooled_features, combos, workers=args.workers)
+    pooled_time = time.perf_counter() - start
+
+    assert table.equals(pooled), "pooled sweep differs from the in-process sweep"
+    for c, rep in zip(sample, reports):
+        row = table[np.logical_and.reduce([table[k] == v for k, v in c.items()])].iloc[0]
+        assert row['log_loss'] == rep['all']['log_loss'] and row['roi'] == rep['ranked']['roi'], c
+
+    props = features[windows[0]].shape[1]
+    print(f"{len(combos)} parameter sets x {props} props ({len(snapshots)} dates, {os.cpu_count()} CPUs)")
+    print(f"  backtest per set:     {naive_time:7.1f}s  (extrapolated from {len(sample)})")
+    print(f"  precompute {len(windows)} windows: {precompute_time:7.1f}s")
+    print(f"  score all sets:       {score_time:7.1f}s  ({naive_time / (precompute_time + score_time):.0f}x overall, "
+          f"scores match the backtest)")
+    print(f"  score, {args.workers} workers:     {pooled_time:7.1f}s")
+    print(table.head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
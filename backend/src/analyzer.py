@@ -1,8 +1,8 @@
 import numpy as np
-import pandas as pd
 import math
 from typing import Dict, List
 from datetime import datetime
+from src.simulation import DEFAULT_DRAWS, DEFAULT_SEED, MODELS, simulate_p_over
 
 class NBAAnalyzer:
     STAT_COLS = {
@@ -15,8 +15,24 @@ class NBAAnalyzer:
         'MIN': 'MIN'
     }
 
-    def __init__(self, num_games=10):
+    def __init__(self, num_games=10, model='normal', draws=DEFAULT_DRAWS, seed=DEFAULT_SEED,
+                 trend_weight=0.27, consistency_weight=0.08, trend_baseline=0.85,
+                 consistency_floor=0.2, consistency_band=0.3):
+        if model not in MODELS:
+            raise ValueError(f"unknown model {model!r}, expected one of {MODELS}")
         self.num_games = num_games
+        # 'normal' = closed-form normal approximation; 'bootstrap'/'negbin' = Monte Carlo (src/simulation.py)
+        self.model = model
+        self.draws = draws
+        self.seed = seed
+        # confidence = P(pick) + (trend_score - trend_baseline) * trend_weight + (consistency - 0.5) * consistency_weight
+        # consistency falls from 1 to 0 as the coefficient of variation goes from floor to floor + band
+        # (tuned with src/sweep.py)
+        self.trend_weight = trend_weight
+        self.consistency_weight = consistency_weight
+        self.trend_baseline = trend_baseline
+        self.consistency_floor = consistency_floor
+        self.consistency_band = consistency_band
 
     def _normal_cdf(self, x: float) -> float:
         return 0.5 * (1.0 + math.erf(x / math.sqrt(2)))
@@ -31,17 +47,24 @@ class NBAAnalyzer:
             return 100.0 / abs(price)
         return None
 
-    def calculate_confidence(self, game_logs: pd.DataFrame, prop_line: float, stat_type: str) -> Dict:
+    def calculate_confidence(self, game_logs: 'GameLog | DataFrame', prop_line: float, stat_type: str,
+                             model: str = None) -> Dict:
         stat_col = self.STAT_COLS[stat_type]
-        recent_stats = game_logs[stat_col].head(self.num_games).values
+        recent_stats = np.asarray(game_logs[stat_col])[:self.num_games]
 
         if len(recent_stats) == 0:
             return self._empty_confidence()
 
         mu = np.mean(recent_stats)
         sigma = np.std(recent_stats)
-
-        if sigma < 1e-6:
+        model = model or self.model
+
+        if model != 'normal':
+            p_over = float(simulate_p_over(
+                np.asarray(recent_stats, dtype=float)[None, :], np.array([len(recent_stats)]),
+                np.array([0]), np.array([prop_line]), model, self.draws, self.seed,
+            )[0])
+        elif sigma < 1e-6:
             if mu > prop_line:
                 p_over = 1.0
             elif mu < prop_line:
@@ -58,8 +81,7 @@ class NBAAnalyzer:
         trend_score = self._calculate_trend(recent_stats)
         consistency_score = self._calculate_consistency(recent_stats)
 
-        trend_adj = (trend_score - 0.85) * 0.27
-        consistency_adj = (consistency_score - 0.5) * 0.08
+        trend_adj, consistency_adj = self._adjustments(trend_score, consistency_score)
 
         confidence = float(np.clip(base_prob + trend_adj + consistency_adj, 0.0, 1.0))
 
@@ -126,9 +148,18 @@ class NBAAnalyzer:
         std_dev = np.std(stats)
         cov = std_dev / average
 
-        consistency = max(0, min(1, 1 - (cov - 0.2) / 0.3))
+        consistency = max(0, min(1, 1 - (cov - self.consistency_floor) / self.consistency_band))
         return consistency
 
+    def _consistency_array(self, cov: np.ndarray, zero_mean: np.ndarray) -> np.ndarray:
+        """_calculate_consistency element-wise, from the coefficient of variation."""
+        return np.where(zero_mean, 0.0, np.clip(1 - (cov - self.consistency_floor) / self.consistency_band, 0, 1))
+
+    def _adjustments(self, trend_score, consistency):
+        """The trend and consistency terms added to the pick-side probability."""
+        return ((trend_score - self.trend_baseline) * self.trend_weight,
+                (consistency - 0.5) * self.consistency_weight)
+
     def _empty_confidence(self) -> Dict:
         return {
             'confidence': 0,
@@ -142,7 +173,8 @@ class NBAAnalyzer:
         }
     
     
-    def analyze_player(self, game_logs: pd.DataFrame, player_name: str, prop_lines: Dict[str, Dict]) -> List[Dict]:
+    def analyze_player(self, game_logs: 'GameLog | DataFrame', player_name: str, prop_lines: Dict[str, Dict],
+                       model: str = None) -> List[Dict]:
         predicts = []
         for stat_type, prop in prop_lines.items():
             if stat_type not in self.STAT_COLS:
@@ -151,7 +183,7 @@ class NBAAnalyzer:
             over_price = prop.get('over_price')
             under_price = prop.get('under_price')
 
-            confidence = self.calculate_confidence(game_logs, line, stat_type)
+            confidence = self.calculate_confidence(game_logs, line, stat_type, model=model)
 
             pick = confidence['pick']
             price = over_price if pick == 'OVER' else under_price
@@ -174,6 +206,424 @@ class NBAAnalyzer:
             predicts.append(prediction)
         return predicts
 
+    # Stat order along the last axis of stat_matrix / calculate_confidence_batch inputs
+    BATCH_STATS = list(STAT_COLS)
+
+    _erf = np.frompyfunc(math.erf, 1, 1)
+
+    def stat_matrix(self, game_logs_list: List['GameLog | DataFrame']):
+        """
+        Stack each player's most recent `num_games` games into a zero-padded
+        players x games x stats matrix (stats in BATCH_STATS order), plus the number
+        of real games per player. Columns a frame doesn't have stay zero.
+        Takes DataFrames or GameLogs (src/records.py), whose stat columns are
+        array('d') buffers numpy reads without copying.
+        """
+        stats = np.zeros((len(game_logs_list), self.num_games, len(self.BATCH_STATS)))
+        counts = np.zeros(len(game_logs_list), dtype=int)
+        for i, game_logs in enumerate(game_logs_list):
+            n = min(len(game_logs), self.num_games)
+            counts[i] = n
+            for j, stat_type in enumerate(self.BATCH_STATS):
+                col = self.STAT_COLS[stat_type]
+                if col in game_logs.columns:
+                    # Slicing the cached column array is far cheaper than head() per player
+                    stats[i, :n, j] = np.asarray(game_logs[col])[:n]
+        return stats, counts
+
+    def _window_stats(self, stats: np.ndarray, counts: np.ndarray) -> Dict:
+        """
+        Line-independent statistics of every (player, stat) window: mu, sigma,
+        last-5 average, trend score/direction and consistency, plus the windows
+        themselves NaN-padded and sorted. Bit-for-bit what calculate_confidence computes.
+        """
+        # games on the contiguous last axis so every reduction sums in the same order as the 1-D call
+        stats = np.ascontiguousarray(np.moveaxis(np.asarray(stats, dtype=float), 1, 2))
+        counts = np.asarray(counts)
+        shape = stats.shape[:2]
+
+        mu, sigma = np.zeros(shape), np.zeros(shape)
+        last_5, prev_5 = np.zeros(shape), np.zeros(shape)
+        padded = np.full(stats.shape, np.nan)
+        # Padded rows differ in length, so reduce each game count separately
+        for n in np.unique(counts[counts > 0]):
+            rows = np.flatnonzero(counts == n)
+            recent = stats[rows][:, :, :n]
+            mu[rows] = recent.mean(axis=-1)
+            sigma[rows] = recent.std(axis=-1)
+            last_5[rows] = recent[:, :, :5].mean(axis=-1)
+            if n >= 6:
+                prev_5[rows] = recent[:, :, 5:10].mean(axis=-1)
+            padded[rows, :, :n] = recent
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend = (last_5 - prev_5) / prev_5
+            trend_score = np.where(trend >= 0.1, 1.0, np.where(trend >= 0, 0.85 + (trend * 1.5),
+                                                               np.maximum(0.7, 0.85 + trend)))
+            short = (counts < 6)[:, None]
+            trend_score = np.where(short | (prev_5 == 0), 0.85, trend_score)
+            trend_dir = np.where(last_5 > prev_5 * 1.05, 1, np.where(last_5 < prev_5 * 0.95, -1, 0))
+            trend_dir = np.where(short, 0, trend_dir)
+
+            consistency = self._consistency_array(sigma / mu, mu == 0)
+
+        # the parts of confidence that don't depend on the line
+        trend_adj, consistency_adj = self._adjustments(trend_score, consistency)
+        return {
+            'n': np.broadcast_to(counts[:, None], shape),
+            'padded': padded,
+            'sorted': np.sort(padded, axis=-1),   # NaN padding sorts last
+            'mu': mu,
+            'sigma': sigma,
+            'last_5': last_5,
+            'trend_score': trend_score,
+            'trend': trend_dir,
+            'consistency': consistency,
+            'trend_adj': trend_adj,
+            'consistency_adj': consistency_adj,
+        }
+
+    def _p_over_array(self, lines: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+        flat = sigma < 1e-6
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (lines - mu) / sigma
+            p_over = 1.0 - 0.5 * (1.0 + self._erf(np.where(flat, 0.0, z) / math.sqrt(2)).astype(float))
+        return np.where(flat, np.where(mu > lines, 1.0, np.where(mu < lines, 0.0, 0.5)), p_over)
+
+    def _simulated_p_over(self, window: Dict, rows: np.ndarray, cols: np.ndarray, lines: np.ndarray,
+                          model: str) -> np.ndarray:
+        """Monte Carlo P(OVER) for each (rows[k], cols[k]) window at lines[k]."""
+        padded = window['padded']
+        return simulate_p_over(
+            padded.reshape(-1, padded.shape[-1]), window['n'].ravel(),
+            rows * padded.shape[1] + cols, lines, model, self.draws, self.seed,
+        )
+
+    @staticmethod
+    def _round_array(values: np.ndarray, ndigits: int) -> np.ndarray:
+        """
+        Python's round (not np.round) element-wise, so values match the per-prop dicts exactly.
+        Scale-and-rint agrees with it everywhere except within a hair of a half, so only
+        those few values go through round() itself.
+        """
+        scale = 10.0 ** ndigits
+        scaled = np.asarray(values, dtype=float) * scale
+        out = np.rint(scaled) / scale
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        if near_half.any():
+            out[near_half] = [round(v, ndigits) for v in np.asarray(values, dtype=float)[near_half].tolist()]
+        return out
+
+    @staticmethod
+    def _payout_array(prices: np.ndarray) -> np.ndarray:
+        """_american_to_payout element-wise; NaN where there's no usable price."""
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(prices >= 100, prices / 100.0,
+                            np.where(prices <= -100, 100.0 / np.abs(prices), np.nan))
+
+    def calculate_confidence_batch(self, stats: np.ndarray, counts: np.ndarray, lines: np.ndarray,
+                                   over_prices: np.ndarray = None, under_prices: np.ndarray = None,
+                                   model: str = None) -> Dict:
+        """
+        calculate_confidence (and analyze_player's EV) for every prop on a slate at once.
+
+        `stats` is players x games x stats from stat_matrix, `counts` the real games per
+        player, `lines`/`*_prices` are players x stats with NaN where there's no prop.
+        Returns players x stats arrays. Values are bit-for-bit what the per-prop path
+        computes; `confidence`/`hit_rate` are already rounded to the same percentages.
+        Simulation models draw the whole slate from one seeded generator, so they match
+        the per-prop path only up to Monte Carlo noise.
+        """
+        window = self._window_stats(stats, counts)
+        lines = np.asarray(lines, dtype=float)
+        n, mu, sigma = window['n'], window['mu'], window['sigma']
+        shape = mu.shape
+
+        model = model or self.model
+        if model == 'normal':
+            p_over = self._p_over_array(lines, mu, sigma)
+        else:
+            # Only simulate cells that actually have a prop
+            p_over = np.full(shape, 0.5)
+            rows, cols = np.nonzero(~np.isnan(lines))
+            p_over[rows, cols] = self._simulated_p_over(window, rows, cols, lines[rows, cols], model)
+        pick_over = p_over >= 0.5
+        base_prob = np.where(pick_over, p_over, 1.0 - p_over)
+        raw_confidence = np.clip(base_prob + window['trend_adj'] + window['consistency_adj'], 0.0, 1.0)
+
+        # NaN padding never compares true, so these count real games only
+        over_hits = (window['padded'] > lines[:, :, None]).sum(axis=-1)
+        under_hits = (window['padded'] < lines[:, :, None]).sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hit_rate = np.where(n > 0, np.where(pick_over, over_hits, under_hits) / n, 0.0)
+
+        empty = n == 0
+        confidence = self._round_array(raw_confidence * 100, 1)
+        confidence[empty] = 0
+        hit_rate = self._round_array(hit_rate * 100, 1)
+        hit_rate[empty] = 0
+
+        pick_over = pick_over & ~empty
+        if over_prices is None:
+            over_prices = np.full(shape, np.nan)
+        if under_prices is None:
+            under_prices = np.full(shape, np.nan)
+        price = np.where(pick_over, np.asarray(over_prices, dtype=float), np.asarray(under_prices, dtype=float))
+        payout = self._payout_array(price)
+        p = confidence / 100.0
+        ev = p * payout - (1 - p)
+
+        return {
+            'n': n,
+            'mu': mu,
+            'sigma': sigma,
+            'p_over': p_over,
+            'pick_over': pick_over,
+            'trend_score': window['trend_score'],
+            'trend': window['trend'],
+            'consistency': window['consistency'],
+            'confidence': confidence,
+            'hit_rate': hit_rate,
+            'last_5_avg': window['last_5'],
+            # np.round is what round() does on a NumPy scalar, so these match the dicts too
+            'average_rounded': np.round(mu, 1),
+            'last_5_avg_rounded': np.round(window['last_5'], 1),
+            'std_dev_rounded': np.round(sigma, 2),
+            'payout': payout,
+            'ev': ev,
+        }
+
+    def analyze_slate(self, players: Dict[str, tuple], model: str = None):
+        """
+        analyze_player for a whole slate in one calculate_confidence_batch pass.
+        `players` maps player name -> (game_logs, prop_lines). Returns
+        ({player_name: predictions}, {player_name: exception}); predictions are
+        identical to analyze_player's, in the same order.
+        """
+        names, logs, errors = [], [], {}
+        for name, (game_logs, prop_lines) in players.items():
+            missing = [s for s in prop_lines if s in self.STAT_COLS and self.STAT_COLS[s] not in game_logs.columns]
+            if missing:
+                errors[name] = KeyError(self.STAT_COLS[missing[0]])
+                continue
+            names.append(name)
+            logs.append(game_logs)
+
+        stats, counts = self.stat_matrix(logs)
+        results = self.analyze_matrix(names, stats, counts, [players[name][1] for name in names], model=model)
+        return results, errors
+
+    def analyze_matrix(self, names: List[str], stats: np.ndarray, counts: np.ndarray,
+                       prop_lines: List[Dict[str, Dict]], model: str = None) -> Dict[str, List[Dict]]:
+        """
+        analyze_slate for callers that already hold the players x games x stats matrix
+        (most recent game first, BATCH_STATS order) instead of DataFrames, e.g. the backtest.
+        """
+        shape = (len(names), len(self.BATCH_STATS))
+        lines, over_prices, under_prices = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        col = {stat_type: j for j, stat_type in enumerate(self.BATCH_STATS)}
+        for i, name in enumerate(names):
+            for stat_type, prop in prop_lines[i].items():
+                if stat_type in col:
+                    j = col[stat_type]
+                    lines[i, j] = prop['line']
+                    over_prices[i, j] = prop.get('over_price') if prop.get('over_price') is not None else np.nan
+                    under_prices[i, j] = prop.get('under_price') if prop.get('under_price') is not None else np.nan
+
+        batch = self.calculate_confidence_batch(stats, counts, lines, over_prices, under_prices, model=model)
+        ev_rounded = self._round_array(batch['ev'], 4)
+        directions = {1: 'up', -1: 'down', 0: 'neutral'}
+
+        results = {}
+        for i, name in enumerate(names):
+            n = counts[i]
+            recent = stats[i, :n, :]
+            predicts = []
+            for stat_type, prop in prop_lines[i].items():
+                if stat_type not in col:
+                    continue
+                j = col[stat_type]
+                if n == 0:
+                    confidence = self._empty_confidence()
+                else:
+                    confidence = {
+                        'confidence': batch['confidence'][i, j].item(),
+                        'hit_rate': batch['hit_rate'][i, j].item(),
+                        'average': batch['average_rounded'][i, j],
+                        'last_5_avg': batch['last_5_avg_rounded'][i, j],
+                        'std_dev': batch['std_dev_rounded'][i, j],
+                        'trend': directions[int(batch['trend'][i, j])],
+                        'pick': 'OVER' if batch['pick_over'][i, j] else 'UNDER',
+                        'recent_games': recent[:, j].tolist()[:10],
+                    }
+                over_price = prop.get('over_price')
+                under_price = prop.get('under_price')
+                price = over_price if confidence['pick'] == 'OVER' else under_price
+                payout = self._american_to_payout(price)
+                predicts.append({
+                    'player_name': name,
+                    'stat_type': stat_type,
+                    'line': prop['line'],
+                    'over_price': over_price,
+                    'under_price': under_price,
+                    'price': price,
+                    'payout': round(payout, 4) if payout is not None else None,
+                    'ev': ev_rounded[i, j].item() if payout is not None else None,
+                    **confidence
+                })
+            results[name] = predicts
+        return results
+
+    def evaluate_ladder(self, window: Dict, rows: np.ndarray, cols: np.ndarray, lines: np.ndarray,
+                        over: np.ndarray, prices: np.ndarray, model: str = None) -> Dict:
+        """
+        Confidence, hit count and EV of individual bookmaker offers. Offer k is a bet on
+        Over (over[k]) or Under at lines[k] and prices[k] on window cell (rows[k], cols[k]),
+        with `window` from _window_stats. The confidence of an offer's side is computed
+        the way calculate_confidence computes it for the picked side, so an offer on
+        the model's pick at the consensus line scores exactly what analyze_player does.
+        """
+        mu, sigma = window['mu'][rows, cols], window['sigma'][rows, cols]
+        n = window['n'][rows, cols]
+
+        model = model or self.model
+        if model == 'normal':
+            p_over = self._p_over_array(lines, mu, sigma)
+        else:
+            p_over = self._simulated_p_over(window, rows, cols, lines, model)
+        p_side = np.where(over, p_over, 1.0 - p_over)
+        raw_confidence = np.clip(
+            p_side + window['trend_adj'][rows, cols] + window['consistency_adj'][rows, cols], 0.0, 1.0
+        )
+
+        # Hit counts are binary searches into each window's sorted games, one search per cell
+        hits = np.zeros(len(lines))
+        order = np.lexsort((cols, rows))
+        cells = np.stack([rows[order], cols[order]], axis=1)
+        bounds = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+        for group in np.split(order, bounds):
+            if not len(group):
+                continue
+            r, c = rows[group[0]], cols[group[0]]
+            games = window['sorted'][r, c, :window['n'][r, c]]
+            above = len(games) - np.searchsorted(games, lines[group], side='right')
+            below = np.searchsorted(games, lines[group], side='left')
+            hits[group] = np.where(over[group], above, below)
+
+        confidence = self._round_array(raw_confidence * 100, 1)
+        confidence[n == 0] = 0
+
+        payout = self._payout_array(prices)
+        p = confidence / 100.0
+        return {
+            'p_over': p_over,
+            'confidence': confidence,
+            'hits': hits,
+            'payout': payout,
+            'ev': p * payout - (1 - p),
+        }
+
+    def analyze_ladder(self, players: Dict[str, tuple], model: str = None):
+        """
+        Evaluate every distinct (line, side, price, bookmaker) offer for each prop
+        instead of one consensus line, and keep the best-EV offer per prop.
+
+        `players` maps player name -> (game_logs, ladder), ladder being
+        {stat_type: [{'line', 'side', 'price', 'bookmaker'}, ...]} from
+        convert_to_ladder_format. Returns ({player_name: predictions}, {player_name: exception});
+        predictions have analyze_player's keys plus 'bookmaker' and 'offers_evaluated'.
+        """
+        names, logs, errors = [], [], {}
+        for name, (game_logs, ladder) in players.items():
+            missing = [s for s in ladder if s in self.STAT_COLS and self.STAT_COLS[s] not in game_logs.columns]
+            if missing:
+                errors[name] = KeyError(self.STAT_COLS[missing[0]])
+                continue
+            names.append(name)
+            logs.append(game_logs)
+
+        stats, counts = self.stat_matrix(logs)
+        window = self._window_stats(stats, counts)
+        col = {stat_type: j for j, stat_type in enumerate(self.BATCH_STATS)}
+
+        offers, rows, cols = [], [], []
+        for i, name in enumerate(names):
+            for stat_type, ladder in players[name][1].items():
+                if stat_type not in col:
+                    continue
+                priced = [offer for offer in ladder if offer.get('price') is not None]
+                offers.extend(priced)
+                rows.extend([i] * len(priced))
+                cols.extend([col[stat_type]] * len(priced))
+
+        results = {name: [] for name in names}
+        if not offers:
+            return results, errors
+
+        rows, cols = np.array(rows), np.array(cols)
+        scored = self.evaluate_ladder(
+            window, rows, cols,
+            np.array([o['line'] for o in offers], dtype=float),
+            np.array([o['side'] == 'Over' for o in offers]),
+            np.array([o['price'] for o in offers], dtype=float),
+            model=model,
+        )
+        ev = np.where(np.isnan(scored['ev']), -np.inf, scored['ev'])
+
+        # Best offer per (player, stat) cell; ties go to the first offer listed
+        cell = rows * len(col) + cols
+        order = np.lexsort((-ev, cell))
+        firsts = order[np.r_[True, cell[order][1:] != cell[order][:-1]]]
+        offers_per_cell = np.bincount(cell, minlength=len(names) * len(col))
+        directions = {1: 'up', -1: 'down', 0: 'neutral'}
+
+        # round() on a NumPy scalar is np.round, so rounding the whole arrays up front matches it
+        average, last_5 = np.round(window['mu'], 1), np.round(window['last_5'], 1)
+        std_dev = np.round(window['sigma'], 2)
+        payout_r = self._round_array(scored['payout'], 4)
+        ev_r = self._round_array(scored['ev'], 4)
+
+        best = {}
+        for k in firsts:
+            if ev[k] == -np.inf:
+                continue
+            best[(rows[k], cols[k])] = k
+
+        for i, name in enumerate(names):
+            n = counts[i]
+            for stat_type in players[name][1]:
+                j = col.get(stat_type)
+                k = best.get((i, j))
+                if k is None:
+                    continue
+                offer = offers[k]
+                same_book = {
+                    o['side']: o['price'] for o in players[name][1][stat_type]
+                    if o['bookmaker'] == offer['bookmaker'] and o['line'] == offer['line']
+                }
+                results[name].append({
+                    'player_name': name,
+                    'stat_type': stat_type,
+                    'line': offer['line'],
+                    'over_price': same_book.get('Over'),
+                    'under_price': same_book.get('Under'),
+                    'price': offer['price'],
+                    'payout': payout_r[k].item(),
+                    'ev': ev_r[k].item(),
+                    'confidence': scored['confidence'][k].item(),
+                    'hit_rate': round(int(scored['hits'][k]) / n * 100, 1) if n else 0,
+                    'average': average[i, j],
+                    'last_5_avg': last_5[i, j],
+                    'std_dev': std_dev[i, j],
+                    'trend': directions[int(window['trend'][i, j])] if n else 'neutral',
+                    'pick': 'OVER' if offer['side'] == 'Over' else 'UNDER',
+                    'recent_games': window['padded'][i, j, :n].tolist()[:10],
+                    'bookmaker': offer['bookmaker'],
+                    'offers_evaluated': int(offers_per_cell[i * len(col) + j]),
+                })
+        return results, errors
+
     def rank_picks(self, predictions: List[Dict], min_ev: float = 0.0, min_confidence: float = 0.0, top_n: int = 5) -> List[Dict]:
         eligible = [
             p for p in predictions
@@ -0,0 +1,384 @@
+"""
+Historical backtest of the analyzer
+Replays a season date by date: for each date the analyzer only sees games played
+before it plus that date's recorded odds snapshot, ranks picks the same way the
+API does, and every prediction is graded against the game actually played.
+
+Game logs are loaded once from the GameLogStore into shared-memory columnar
+arrays; worker processes attach to them by name, so tasks only carry their
+dates and snapshots. Dates are sharded across a process pool.
+
+Odds snapshots are JSONL, one prop per line:
+    {"date": "2025-01-14", "player_id": 3112335, "player_name": "...",
+     "stat_type": "PTS", "line": 24.5, "over_price": -115, "under_price": -105}
+
+Snapshots can also be each event's closing lines from the line-movement history
+(src/line_history.py):  --history cache/line_history.sqlite [--start 2025-01-01]
+
+Run from backend/:  python -m src.backtest --snapshots odds.jsonl [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import NBAAnalyzer
+from src.gamelog_store import DEFAULT_STORE_PATH, GameLogStore
+
+# Slate dates are US Eastern, like the Odds API commence windows
+SLATE_TZ = 'America/New_York'
+
+# Same cut app.generate_all_picks applies before analyzing a player
+MIN_GAMES = 5
+
+# config keys passed through to NBAAnalyzer
+ANALYZER_PARAMS = ('num_games', 'model', 'draws', 'seed', 'trend_weight', 'consistency_weight',
+                   'trend_baseline', 'consistency_floor', 'consistency_band')
+
+
+def day_bounds(date: str) -> tuple:
+    """[start, end) of an Eastern calendar day, as UTC nanoseconds."""
+    start = pd.Timestamp(date).tz_localize(SLATE_TZ)
+    end = (pd.Timestamp(date) + pd.Timedelta(days=1)).tz_localize(SLATE_TZ)
+    return start.value, end.value
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Open a block another process created, without registering it with the resource
+    tracker. Before Python 3.13 attaching registers it, and a tracker other than the
+    creator's then unlinks it (warning of a "leaked" block) when this process exits,
+    while the creator unlinks it again. Only the creator tracks and unlinks it here.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Skip the registration rather than undo it afterwards: forked workers share the
+    # creator's tracker, where an unregister would drop the creator's entry too
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedGameLogs:
+    """
+    Every stored game as columns in one shared-memory block: per-athlete row ranges
+    (oldest game first), game dates as UTC nanoseconds, and a rows x stats float
+    matrix in NBAAnalyzer.BATCH_STATS order. Created once by the parent with
+    from_store(); workers attach() to the same block through spec().
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, athlete_ids: List[int], offsets: List[int], owner: bool):
+        self._shm = shm
+        self._owner = owner
+        rows, cols = offsets[-1], len(NBAAnalyzer.BATCH_STATS)
+        self.dates = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf)
+        self.stats = np.ndarray((rows, cols), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+        self.athlete_ids = list(athlete_ids)
+        self.offsets = list(offsets)
+        self._index = {aid: i for i, aid in enumerate(self.athlete_ids)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SharedGameLogs':
+        """`df` as returned by GameLogStore.load_all (sorted by athlete, then date)."""
+        rows, cols = len(df), len(NBAAnalyzer.BATCH_STATS)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, rows * 8 * (1 + cols)))
+        ids = df['ATHLETE_ID'].to_numpy(dtype=np.int64)
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if rows else np.array([], dtype=np.intp)
+        logs = cls(shm, ids[starts].tolist(), starts.tolist() + [rows], owner=True)
+        if rows:
+            logs.dates[:] = df['GAME_DATE'].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy('datetime64[ns]').view(np.int64)
+            for j, stat_type in enumerate(NBAAnalyzer.BATCH_STATS):
+                logs.stats[:, j] = df[NBAAnalyzer.STAT_COLS[stat_type]].to_numpy(dtype=float)
+        return logs
+
+    @classmethod
+    def from_store(cls, store: GameLogStore, athlete_ids: Optional[Iterable[int]] = None) -> 'SharedGameLogs':
+        return cls.from_frame(store.load_all(athlete_ids))
+
+    def spec(self) -> Dict:
+        """What a worker needs to attach: the block name and the (small) athlete index."""
+        return {'name': self._shm.name, 'athlete_ids': self.athlete_ids, 'offsets': self.offsets}
+
+    @classmethod
+    def attach(cls, spec: Dict) -> 'SharedGameLogs':
+        return cls(attach_shared_memory(spec['name']), spec['athlete_ids'], spec['offsets'], owner=False)
+
+    def _range(self, athlete_id: int) -> tuple:
+        i = self._index.get(int(athlete_id))
+        if i is None:
+            return 0, 0
+        return self.offsets[i], self.offsets[i + 1]
+
+    def window(self, athlete_id: int, before_ns: int, num_games: int) -> np.ndarray:
+        """Up to `num_games` games played before `before_ns`, most recent first (games x stats)."""
+        lo, hi = self._range(athlete_id)
+        cut = lo + int(np.searchsorted(self.dates[lo:hi], before_ns, side='left'))
+        return self.stats[max(lo, cut - num_games):cut][::-1]
+
+    def game_on(self, athlete_id: int, start_ns: int, end_ns: int) -> Optional[np.ndarray]:
+        """The athlete's stat row for a game in [start_ns, end_ns), or None if they didn't play."""
+        lo, hi = self._range(athlete_id)
+        i = lo + int(np.searchsorted(self.dates[lo:hi], start_ns, side='left'))
+        if i < hi and self.dates[i] < end_ns:
+            return self.stats[i]
+        return None
+
+    def close(self):
+        # Drop our views before closing, or the buffer can't be released
+        self.dates = self.stats = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def load_snapshots(path: str) -> Dict[str, Dict[int, Dict]]:
+    """{date: {player_id: {'name': ..., 'props': {stat_type: {'line', 'over_price', 'under_price'}}}}}"""
+    snapshots = defaultdict(dict)
+    with open(path) as f:
+        for line_no, raw in enumerate(f, 1):
+            if not raw.strip():
+                continue
+            try:
+                rec = json.loads(raw)
+                player_id = int(rec['player_id'])
+                entry = snapshots[str(rec['date'])[:10]].setdefault(
+                    player_id, {'name': rec.get('player_name') or str(player_id), 'props': {}}
+                )
+                entry['props'][rec['stat_type']] = {
+                    'line': float(rec['line']),
+                    'over_price': rec.get('over_price'),
+                    'under_price': rec.get('under_price'),
+                }
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping snapshot line {line_no}: {e}")
+    return dict(snapshots)
+
+
+def grade(pick: Dict, actual: Optional[float]) -> tuple:
+    """(result, profit in units staked) for one prediction."""
+    if actual is None:
+        return 'void', 0.0
+    if actual == pick['line']:
+        return 'push', 0.0
+    won = actual > pick['line'] if pick['pick'] == 'OVER' else actual < pick['line']
+    if not won:
+        return 'loss', -1.0
+    return 'win', pick['payout'] if pick.get('payout') is not None else 0.0
+
+
+# -- worker side ---------------------------------------------------------------
+
+_logs: Optional[SharedGameLogs] = None
+_config: Dict = {}
+
+
+def _init_worker(spec: Dict, config: Dict):
+    global _logs, _config
+    _logs = SharedGameLogs.attach(spec)
+    _config = config
+
+
+def date_matrix(logs: SharedGameLogs, date: str, slate: Dict[int, Dict], num_games: int,
+                min_games: int = MIN_GAMES) -> tuple:
+    """
+    (player ids, stats, counts) for the snapshot's players with at least `min_games`
+    games before `date`, in the players x games x stats layout analyze_matrix takes.
+    """
+    start_ns, _ = day_bounds(date)
+    ids, windows = [], []
+    for player_id in slate:
+        # eligibility looks at full history, so it doesn't change with the window size
+        if len(logs.window(player_id, start_ns, min_games)) >= min_games:
+            ids.append(player_id)
+            windows.append(logs.window(player_id, start_ns, num_games))
+
+    stats = np.zeros((len(ids), num_games, len(NBAAnalyzer.BATCH_STATS)))
+    counts = np.array([len(w) for w in windows], dtype=int)
+    for i, window in enumerate(windows):
+        stats[i, :len(window)] = window
+    return ids, stats, counts
+
+
+def run_date(logs: SharedGameLogs, analyzer: NBAAnalyzer, date: str, slate: Dict[int, Dict],
+             config: Dict) -> List[Dict]:
+    """Predict, rank and grade one date's snapshot using only games before that date."""
+    start_ns, end_ns = day_bounds(date)
+    col = {stat_type: j for j, stat_type in enumerate(analyzer.BATCH_STATS)}
+
+    ids, stats, counts = date_matrix(logs, date, slate, analyzer.num_games, config.get('min_games', MIN_GAMES))
+    if not ids:
+        return []
+
+    names = [slate[player_id]['name'] for player_id in ids]
+    results = analyzer.analyze_matrix(names, stats, counts, [slate[player_id]['props'] for player_id in ids])
+
+    predictions = []
+    for player_id, name in zip(ids, names):
+        game = logs.game_on(player_id, start_ns, end_ns)
+        for p in results[name]:
+            actual = float(game[col[p['stat_type']]]) if game is not None else None
+            result, profit = grade(p, actual)
+            predictions.append({**p, 'date': date, 'player_id': player_id, 'actual': actual,
+                                'result': result, 'profit': profit, 'ranked': False})
+
+    ranked = analyzer.rank_picks(predictions, min_ev=config.get('min_ev', 0.0),
+                                 min_confidence=config.get('min_confidence', 0.0), top_n=config.get('top_n', 5))
+    for p in ranked:
+        p['ranked'] = True
+    return predictions
+
+
+def _analyzer(config: Dict) -> NBAAnalyzer:
+    kwargs = {k: config[k] for k in ANALYZER_PARAMS if k in config}
+    return NBAAnalyzer(**kwargs)
+
+
+def _run_shard(shard: List[tuple]) -> List[Dict]:
+    analyzer = _analyzer(_config)
+    out = []
+    for date, slate in shard:
+        out.extend(run_date(_logs, analyzer, date, slate, _config))
+    return out
+
+
+# -- parent side ---------------------------------------------------------------
+
+def shard_dates(dates: List[str], shards: int) -> List[List[str]]:
+    """Round-robin, so each shard gets a spread of early (short history) and late dates."""
+    shards = max(1, min(shards, len(dates)))
+    return [dates[i::shards] for i in range(shards)]
+
+
+def run_backtest(logs: SharedGameLogs, snapshots: Dict[str, Dict[int, Dict]], config: Dict = None,
+                 workers: int = 1) -> List[Dict]:
+    """Graded predictions for every snapshot date, in date order."""
+    config = config or {}
+    dates = sorted(snapshots)
+    if workers <= 1:
+        analyzer = _analyzer(config)
+        out = []
+        for date in dates:
+            out.extend(run_date(logs, analyzer, date, snapshots[date], config))
+        return out
+
+    # A few shards per worker keeps the pool busy when dates vary in size
+    shards = [[(d, snapshots[d]) for d in shard] for shard in shard_dates(dates, workers * 4)]
+    out = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(logs.spec(), config)) as pool:
+        for graded in pool.map(_run_shard, shards):
+            out.extend(graded)
+    out.sort(key=lambda p: p['date'])
+    return out
+
+
+def _summary(predictions: List[Dict]) -> Dict:
+    settled = [p for p in predictions if p['result'] != 'void']
+    decided = [p for p in settled if p['result'] in ('win', 'loss')]
+    staked = [p for p in settled if p.get('payout') is not None]
+    wins = sum(1 for p in decided if p['result'] == 'win')
+    profit = sum(p['profit'] for p in staked)
+
+    probs = np.array([p['confidence'] / 100.0 for p in decided])
+    outcomes = np.array([p['result'] == 'win' for p in decided], dtype=float)
+    clipped = np.clip(probs, 1e-6, 1 - 1e-6)
+    return {
+        'predictions': len(predictions),
+        'graded': len(settled),
+        'voided': len(predictions) - len(settled),
+        'pushes': len(settled) - len(decided),
+        'hit_rate': round(100.0 * wins / len(decided), 2) if decided else None,
+        'profit': round(profit, 2),
+        'roi': round(100.0 * profit / len(staked), 2) if staked else None,
+        'brier': round(float(np.mean((probs - outcomes) ** 2)), 4) if decided else None,
+        'log_loss': round(float(-np.mean(outcomes * np.log(clipped) + (1 - outcomes) * np.log(1 - clipped))), 4)
+        if decided else None,
+    }
+
+
+def calibration(predictions: List[Dict], bins: int = 10) -> List[Dict]:
+    """Stated confidence vs realized hit rate, in equal-width confidence bins."""
+    decided = [p for p in predictions if p['result'] in ('win', 'loss')]
+    table = []
+    for b in range(bins):
+        lo, hi = 100.0 * b / bins, 100.0 * (b + 1) / bins
+        rows = [p for p in decided if lo <= p['confidence'] < hi or (b == bins - 1 and p['confidence'] == hi)]
+        if not rows:
+            continue
+        table.append({
+            'bin': f"{lo:.0f}-{hi:.0f}%",
+            'count': len(rows),
+            'confidence': round(sum(p['confidence'] for p in rows) / len(rows), 1),
+            'hit_rate': round(100.0 * sum(p['result'] == 'win' for p in rows) / len(rows), 1),
+        })
+    return table
+
+
+def report(predictions: List[Dict]) -> Dict:
+    """Headline numbers for every prediction and for the ranked picks alone, plus calibration."""
+    return {
+        'dates': len({p['date'] for p in predictions}),
+        'all': _summary(predictions),
+        'ranked': _summary([p for p in predictions if p['ranked']]),
+        'calibration': calibration(predictions),
+    }
+
+
+def print_report(rep: Dict):
+    print(f"Backtest over {rep['dates']} dates")
+    for label in ('all', 'ranked'):
+        s = rep[label]
+        print(f"  {label:>6}: {s['graded']} graded ({s['voided']} void, {s['pushes']} push)  "
+              f"hit rate {s['hit_rate']}%  ROI {s['roi']}%  profit {s['profit']:+.2f}u  "
+              f"brier {s['brier']}  log-loss {s['log_loss']}")
+    print("  calibration:")
+    for row in rep['calibration']:
+        print(f"    {row['bin']:>8}  n={row['count']:<6} stated {row['confidence']:5.1f}%  hit {row['hit_rate']:5.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshots", help="JSONL odds snapshots")
+    source.add_argument("--history", help="line history store; closing lines of every recorded event")
+    parser.add_argument("--start", help="with --history: first slate date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="with --history: last slate date (YYYY-MM-DD)")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--num-games", type=int, default=10)
+    parser.add_argument("--model", default="normal")
+    parser.add_argument("--min-ev", type=float, default=0.0)
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--top-n", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.history:
+        from src.line_history import LineHistoryStore
+        start = day_bounds(args.start)[0] // 10**9 if args.start else None
+        end = day_bounds(args.end)[1] // 10**9 if args.end else None
+        snapshots = LineHistoryStore(args.history).closing_snapshots(start, end)
+    else:
+        snapshots = load_snapshots(args.snapshots)
+    athlete_ids = {pid for slate in snapshots.values() for pid in slate}
+    logs = SharedGameLogs.from_store(GameLogStore(args.store), athlete_ids)
+    config = {'num_games': args.num_games, 'model': args.model, 'min_ev': args.min_ev,
+              'min_confidence': args.min_confidence, 'top_n': args.top_n}
+    try:
+        predictions = run_backtest(logs, snapshots, config, workers=args.workers)
+    finally:
+        logs.close()
+    print_report(report(predictions))
+
+
+if __name__ == "__main__":
+    main()
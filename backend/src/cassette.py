@@ -0,0 +1,138 @@
+"""
+Record/replay cassettes for outbound HTTP
+Every ESPN and Odds API call goes through the shared session (src/http_session.py),
+so mounting a CassetteAdapter there captures or replays all of NBAFetcher's and
+OddsFetcher's traffic without touching either class.
+
+    HTTP_CASSETTE=cassettes/slate.json HTTP_CASSETTE_MODE=record python app.py
+    HTTP_CASSETTE=cassettes/slate.json HTTP_CASSETTE_MODE=replay python app.py
+
+The same file can also be served over HTTP by standin_server.py --cassette.
+"""
+
+import atexit
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.http_session import PooledAdapter, set_adapter_factory
+
+# Query params that are credentials, never written to disk or used for matching
+SECRET_PARAMS = {'apiKey', 'api_key'}
+
+# Date-window params are left out of matching so a cassette recorded on one day
+# still replays on another; same-path calls then replay in recorded order
+TIME_PARAMS = {'dates', 'commenceTimeFrom', 'commenceTimeTo'}
+
+# Response headers worth keeping; everything else is transport noise
+RECORDED_HEADERS = {
+    'content-type', 'etag', 'last-modified', 'retry-after',
+    'x-requests-remaining', 'x-requests-used', 'x-requests-last',
+}
+
+
+def interaction_key(url: str) -> str:
+    """Host-independent match key: path plus sorted query, minus credentials and date windows."""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query) if k not in SECRET_PARAMS and k not in TIME_PARAMS
+    )
+    return parts.path + ('?' + urlencode(query) if query else '')
+
+
+class Cassette:
+    """An ordered list of recorded interactions, grouped by match key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for entry in json.load(f).get('interactions', []):
+                    self._interactions.setdefault(entry['key'], []).append(entry)
+
+    def __len__(self):
+        return sum(len(v) for v in self._interactions.values())
+
+    def add(self, key: str, status: int, headers: Dict, body: str):
+        with self._lock:
+            self._interactions.setdefault(key, []).append({
+                'key': key,
+                'status': status,
+                'headers': {k: v for k, v in headers.items() if k.lower() in RECORDED_HEADERS},
+                'body': body,
+            })
+
+    def next(self, key: str) -> Optional[Dict]:
+        """Replay recorded responses for `key` in order, repeating the last one once exhausted."""
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def save(self):
+        with self._lock:
+            payload = {'interactions': [e for entries in self._interactions.values() for e in entries]}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.path)
+
+
+class CassetteAdapter(PooledAdapter):
+    """Transport adapter that records real responses or replays them offline."""
+
+    def __init__(self, cassette: Cassette, mode: str = 'replay', **kwargs):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        key = interaction_key(request.url)
+        if self.mode == 'replay':
+            entry = self.cassette.next(key)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"no recorded interaction for {key}")
+            return self._build(request, entry)
+
+        resp = super().send(request, *args, **kwargs)
+        self.cassette.add(key, resp.status_code, resp.headers, resp.text)
+        return resp
+
+    @staticmethod
+    def _build(request, entry: Dict) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.headers = CaseInsensitiveDict(entry.get('headers') or {})
+        resp._content = (entry.get('body') or '').encode()
+        resp.encoding = 'utf-8'
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+
+def install_cassette(path: str, mode: str = 'replay') -> Cassette:
+    """Route the shared session through a cassette. Returns the loaded cassette;
+    in record mode it is written out at interpreter exit (or call save() directly)."""
+    cassette = Cassette(path)
+    if mode == 'record':
+        atexit.register(cassette.save)
+    set_adapter_factory(lambda **kwargs: CassetteAdapter(cassette, mode, **kwargs))
+    return cassette
+
+
+def uninstall_cassette():
+    set_adapter_factory(PooledAdapter)
@@ -0,0 +1,26 @@
+"""
+Loads backend/.env into os.environ
+Its own module so app.py can read its settings before (and without) importing
+the odds fetcher and with it requests.
+"""
+
+import os
+from pathlib import Path
+
+_loaded = False
+
+
+# loading env vars manually
+def load_env_file():
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    env_path = Path(__file__).parent.parent / '.env'
+    if env_path.exists():
+        with open(env_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    os.environ[key.strip()] = value.strip()
@@ -0,0 +1,119 @@
+"""
+Async game-log fetch engine
+Drives NBAFetcher.get_player_stats for a whole slate at once instead of a
+2-worker thread pool with a fixed sleep per player
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
+from requests.exceptions import Timeout
+
+# Concurrency ceiling and per-request deadline (seconds), overridable per deploy.
+# The deadline is the requests timeout of each HTTP call, so it starts once the
+# rate limiter lets the call through and covers connecting and each read.
+DEFAULT_CONCURRENCY = int(os.getenv('GAMELOG_CONCURRENCY', '16'))
+DEFAULT_REQUEST_DEADLINE = float(os.getenv('GAMELOG_REQUEST_DEADLINE', '10'))
+
+
+class GameLogFetchEngine:
+    """
+    Fans gamelog requests out on an asyncio loop. The blocking HTTP calls run on a
+    thread pool sized to the concurrency ceiling, and the fetcher's connection pool
+    is resized to match so every in-flight request holds a keep-alive connection.
+    """
+
+    def __init__(self, fetcher, max_concurrency: int = DEFAULT_CONCURRENCY,
+                 request_deadline: float = DEFAULT_REQUEST_DEADLINE):
+        self.fetcher = fetcher
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.request_deadline = request_deadline
+        self.fetcher.resize_pool(self.max_concurrency)
+        # Kept for the life of the process so warm Lambda invocations reuse the threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix='gamelog'
+        )
+        self.last_run = {}
+
+    async def _run_one(self, sem: asyncio.Semaphore, key, call: Callable):
+        loop = asyncio.get_running_loop()
+        # The slot is held until the worker thread returns: a call can't be abandoned
+        # while its thread keeps running, so queued calls never wait on hidden work.
+        # Calls enforce the deadline themselves through their HTTP timeout.
+        async with sem:
+            try:
+                result = await loop.run_in_executor(self._executor, call)
+                return key, result, None
+            except Timeout as exc:
+                error = TimeoutError(f"request exceeded {self.request_deadline}s deadline")
+                error.__cause__ = exc
+                return key, None, error
+            except Exception as exc:
+                return key, None, exc
+
+    async def run_all(self, calls: Dict[object, Callable],
+                      budget: Optional[float] = None) -> Tuple[Dict, Dict]:
+        """
+        Run every blocking call concurrently. `budget` caps the wall time of the
+        whole batch; calls still pending when it runs out are reported as timeouts.
+        Calls that haven't started are cancelled; ones already on a thread finish
+        within their own HTTP timeout.
+        """
+        sem = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.create_task(self._run_one(sem, key, call))
+            for key, call in calls.items()
+        ]
+
+        results, error_map = {}, {}
+        if not tasks:
+            return results, error_map
+
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        for task in pending:
+            task.cancel()
+
+        for task in done:
+            key, result, exc = task.result()
+            if exc is not None:
+                error_map[key] = exc
+            else:
+                results[key] = result
+
+        for key in calls:
+            if key not in results and key not in error_map:
+                error_map[key] = TimeoutError(f"budget of {budget}s exhausted")
+
+        return results, error_map
+
+    def run(self, calls: Dict[object, Callable],
+            budget: Optional[float] = None) -> Tuple[Dict, Dict]:
+        """Blocking entry point for sync callers (Flask handlers, Lambda)."""
+        start = time.perf_counter()
+        results, error_map = asyncio.run(self.run_all(calls, budget))
+        elapsed = time.perf_counter() - start
+
+        timeouts = sum(1 for exc in error_map.values() if isinstance(exc, TimeoutError))
+        self.last_run = {
+            'requests': len(calls),
+            'fetched': len(results),
+            'errors': len(error_map),
+            'timeouts': timeouts,
+            'concurrency': self.max_concurrency,
+            'elapsed_seconds': round(elapsed, 3),
+        }
+        return results, error_map
+
+    def fetch(self, players: Dict, num_games: Optional[int] = 15,
+              budget: Optional[float] = None) -> Tuple[Dict, Dict]:
+        """Fetch each player's game logs via NBAFetcher.get_player_stats."""
+        calls = {
+            key: partial(self.fetcher.get_player_stats, pid,
+                         num_games=num_games, timeout=self.request_deadline)
+            for key, pid in players.items()
+        }
+        return self.run(calls, budget)
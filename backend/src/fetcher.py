@@ -1,9 +1,20 @@
-import requests
-import pandas as pd
+import os
+import time
+from array import array
 from datetime import datetime, timedelta
+from functools import partial
+from src.http_session import configure_pool, get_session
+from src.names import normalize_name
+from src.rate_limiter import throttled_get
+from src.records import GameLog, parse_date
 
-ESPN_BASE = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba"
-ESPN_WEB_BASE = "https://site.web.api.espn.com/apis/common/v3/sports/basketball/nba"
+# pandas / numpy are imported by the frame-building functions only: with
+# log_format="records" the fetcher returns GameLogs (src/records.py) and never loads them
+
+# Overridable so the backend can be pointed at the local stand-in server (standin_server.py)
+ESPN_BASE = os.getenv("ESPN_BASE_URL", "https://site.api.espn.com/apis/site/v2/sports/basketball/nba")
+ESPN_WEB_BASE = os.getenv("ESPN_WEB_BASE_URL", "https://site.web.api.espn.com/apis/common/v3/sports/basketball/nba")
+ESPN_SEARCH_URL = os.getenv("ESPN_SEARCH_URL", "https://site.api.espn.com/apis/common/v3/search")
 
 HEADERS = {
     "User-Agent": (
@@ -24,20 +35,23 @@ TEAM_ABBR_OVERRIDES = {
 }
 
 
+# ...and back: ESPN team URLs take its own abbreviation, lowercased ("/teams/gs/schedule")
+_ESPN_TEAM_SLUGS = {abbr: espn.lower() for espn, abbr in TEAM_ABBR_OVERRIDES.items()}
+
+
 def _normalize_abbr(abbr: str) -> str:
     return TEAM_ABBR_OVERRIDES.get(abbr, abbr)
 
 
+def _espn_team_slug(abbr: str) -> str:
+    return _ESPN_TEAM_SLUGS.get(abbr, abbr.lower())
+
+
 # Generational suffixes the Odds API and ESPN format inconsistently
 # "Tim Hardaway Jr" vs "Tim Hardaway Jr."
 _NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
 
 
-def normalize_name(name: str) -> str:
-    """Lowercase, strip periods/commas, used for cross-source name comparison."""
-    return (name or "").lower().replace(".", "").replace(",", "").strip()
-
-
 def _to_float(value, default=0.0):
     try:
         return float(value)
@@ -45,15 +59,145 @@ def _to_float(value, default=0.0):
         return default
 
 
-def _split_made(value):
-    if isinstance(value, str) and "-" in value:
-        return _to_float(value.split("-")[0])
-    return _to_float(value)
+def _rows_to_frame(rows: list, num_games: int | None):
+    """Most-recent-first game-log frame from per-game row dicts, one row per GAME_ID."""
+    import pandas as pd
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows).drop_duplicates(subset=["GAME_ID"])
+    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], errors="coerce")
+    df = df.dropna(subset=["GAME_DATE"]).sort_values("GAME_DATE", ascending=False).reset_index(drop=True)
+    return df if num_games is None else df.head(num_games)
+
+
+# Frame stat columns, in order, with the ESPN label each one is read from
+STAT_COLUMNS = [
+    ("MIN", "MIN"), ("PTS", "PTS"), ("REB", "REB"), ("AST", "AST"),
+    ("BLK", "BLK"), ("STL", "STL"), ("FG3M", "3PT"),
+]
+
+
+def _stat_column(stats_rows: list, i: int | None, made: bool = False):
+    """One stat column as float64. Missing cells are 0.0; with made=True a
+    "made-attempted" cell like "3-7" keeps the made count."""
+    import numpy as np
+    if i is None:
+        return np.zeros(len(stats_rows))
+    raw = [s[i] if i < len(s) and s[i] is not None else 0.0 for s in stats_rows]
+    if made:
+        raw = [v.partition("-")[0] if isinstance(v, str) else v for v in raw]
+    try:
+        return np.array(raw, dtype=float)
+    except (TypeError, ValueError):
+        # A malformed cell somewhere; fall back to the per-value parse for this column only
+        return np.array([_to_float(v) for v in raw], dtype=float)
+
+
+def _columnar_frame(game_ids: list, game_dates: list, matchups: list, stats_rows: list,
+                    idx: dict, num_games: int | None):
+    """Same frame as _rows_to_frame for already-deduplicated games, but dates are parsed
+    in one call, rows are sorted and cut to `num_games` first, and only the kept rows'
+    stat cells are converted, column by column."""
+    import numpy as np
+    import pandas as pd
+    if not game_ids:
+        return pd.DataFrame()
+
+    # ESPN dates are ISO 8601; skip format inference unless something didn't parse
+    dates = pd.to_datetime(game_dates, errors="coerce", format="ISO8601")
+    if dates.isna().sum() > sum(d is None for d in game_dates):
+        dates = pd.to_datetime(game_dates, errors="coerce")
+    valid = np.flatnonzero(~dates.isna())
+    # Descending sort with the same tie order as DataFrame.sort_values(ascending=False)
+    keys = dates.asi8[valid][::-1]
+    order = valid[::-1][keys.argsort(kind="quicksort")][::-1]
+    if num_games is not None:
+        order = order[:num_games]
+
+    picked = [stats_rows[i] for i in order]
+    frame = {
+        "GAME_ID": np.array(game_ids, dtype=object)[order],
+        "GAME_DATE": dates[order],
+        "MATCHUP": np.array(matchups, dtype=object)[order],
+    }
+    for column, label in STAT_COLUMNS:
+        frame[column] = _stat_column(picked, idx.get(label), made=label == "3PT")
+    return pd.DataFrame(frame)
+
+
+def _stat_values(stats_rows: list, i: int | None, made: bool = False) -> array:
+    """_stat_column as an array('d'), without numpy."""
+    if i is None:
+        return array('d', bytes(8 * len(stats_rows)))
+    raw = [s[i] if i < len(s) and s[i] is not None else 0.0 for s in stats_rows]
+    if made:
+        raw = [v.partition("-")[0] if isinstance(v, str) else v for v in raw]
+    try:
+        return array('d', map(float, raw))
+    except (TypeError, ValueError):
+        return array('d', [_to_float(v) for v in raw])
+
+
+def _columnar_records(game_ids: list, game_dates: list, matchups: list, stats_rows: list,
+                      idx: dict, num_games: int | None) -> GameLog:
+    """_columnar_frame's games as a GameLog: the same rows, order and values."""
+    dates = [parse_date(d) for d in game_dates]
+    order = sorted((i for i, d in enumerate(dates) if d is not None), key=dates.__getitem__, reverse=True)
+    if num_games is not None:
+        order = order[:num_games]
+    picked = [stats_rows[i] for i in order]
+    return GameLog(
+        [game_ids[i] for i in order],
+        [dates[i] for i in order],
+        [matchups[i] for i in order],
+        {column: _stat_values(picked, idx.get(label), made=label == "3PT") for column, label in STAT_COLUMNS},
+    )
+
+
+# Players with fewer box-score rows than this fall back to their own gamelog call
+# (e.g. recently traded players whose old team's games weren't harvested)
+MIN_BOXSCORE_GAMES = 5
 
 
 class NBAFetcher:
-    def __init__(self):
+    def __init__(self, base_url: str = ESPN_BASE, web_base_url: str = ESPN_WEB_BASE, store=None,
+                 http_cache=None, search_url: str = ESPN_SEARCH_URL, log_format: str = "frame"):
+        if log_format not in ("frame", "records"):
+            raise ValueError(f"unknown log_format {log_format!r}, expected 'frame' or 'records'")
+        # "frame": game logs and schedules as DataFrames; "records": GameLogs and row dicts
+        self.log_format = log_format
         self.resolved_game_date = None
+        self.base_url = base_url
+        self.web_base_url = web_base_url
+        self.search_url = search_url
+        # Process-wide keep-alive session shared with OddsFetcher
+        self.session = get_session()
+        # Optional GameLogStore; when set, slate fetches only hit ESPN for stale players
+        self.store = store
+        # Optional ConditionalCache; when set, ESPN calls revalidate with ETag/Last-Modified
+        self.http_cache = http_cache
+        self._engine = None
+        self._store_stats = {}
+        self._boxscores = {}   # game_id -> parsed box-score rows
+
+    def resize_pool(self, maxsize: int):
+        """Size the per-host connection pool to the number of concurrent requests."""
+        configure_pool(max(1, int(maxsize)))
+
+    @property
+    def fetch_stats(self) -> dict:
+        """Counters from the most recent slate fetch (empty before the first one)."""
+        stats = dict(self._engine.last_run) if self._engine is not None else {}
+        stats.update(self._store_stats)
+        return stats
+
+    def _get_json(self, url: str, params=None, timeout: float = 15):
+        if self.http_cache is not None:
+            return self.http_cache.get_json(self.session, url, params=params, headers=HEADERS, timeout=timeout)
+        resp = throttled_get(self.session, url, params=params, headers=HEADERS, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
 
     def get_today_games(self, max_lookahead_days: int = 7):
         base_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -64,14 +208,11 @@ class NBAFetcher:
             date_url = check_date.strftime('%Y%m%d')
 
             try:
-                resp = requests.get(
-                    f"{ESPN_BASE}/scoreboard",
+                data = self._get_json(
+                    f"{self.base_url}/scoreboard",
                     params={"dates": date_url},
-                    headers=HEADERS,
                     timeout=15,
                 )
-                resp.raise_for_status()
-                data = resp.json()
             except Exception as e:
                 print(f"ESPN scoreboard error for {date_str}: {e}")
                 continue
@@ -99,36 +240,261 @@ class NBAFetcher:
                         "ARENA_NAME": venue,
                     })
 
-                df = pd.DataFrame(rows)
-                if 'GAME_ID' in df.columns:
-                    df = df.drop_duplicates(subset=['GAME_ID'])
+                if self.log_format == "records":
+                    games, seen = [], set()
+                    for row in rows:
+                        if row["GAME_ID"] not in seen:
+                            seen.add(row["GAME_ID"])
+                            games.append(row)
+                else:
+                    import pandas as pd
+                    games = pd.DataFrame(rows)
+                    if 'GAME_ID' in games.columns:
+                        games = games.drop_duplicates(subset=['GAME_ID'])
                 if day_offset == 0:
-                    print(f"Found {len(df)} games today ({date_str})")
+                    print(f"Found {len(games)} games today ({date_str})")
                 else:
-                    print(f"No games today. Found {len(df)} games on {date_str} (+{day_offset} day{'s' if day_offset > 1 else ''})")
+                    print(f"No games today. Found {len(games)} games on {date_str} (+{day_offset} day{'s' if day_offset > 1 else ''})")
                 self.resolved_game_date = date_str
-                return df
+                return games
 
             print(f"No games on {date_str}, checking next day...")
 
         print(f"No games found within the next {max_lookahead_days} days")
         self.resolved_game_date = None
+        if self.log_format == "records":
+            return []
+        import pandas as pd
         return pd.DataFrame()
 
-    def get_player_stats(self, player_id, num_games: int = 15, timeout: int = 15):
-        resp = requests.get(
-            f"{ESPN_WEB_BASE}/athletes/{player_id}/gamelog",
-            headers=HEADERS,
+    def get_player_stats(self, player_id, num_games: int | None = 15, timeout: int = 15):
+        data = self._get_json(
+            f"{self.web_base_url}/athletes/{player_id}/gamelog",
             timeout=timeout,
         )
-        resp.raise_for_status()
-        data = resp.json()
+        return self._parse_gamelog(data, num_games)
+
+    def get_player_stats_many(self, players: dict, num_games: int = 15, budget: float | None = None,
+                              teams: dict | None = None, source: str = "gamelog"):
+        """Fetch game logs for a whole slate at once through the async fetch engine.
+
+        `players` maps any caller key (e.g. player name) to an ESPN athlete id, and
+        `teams` optionally maps the same keys to team abbreviations so the game-log
+        store can tell which players have played since their last refresh.
+        With source="boxscore", logs are pivoted out of each slate team's recent box
+        scores instead of one gamelog call per player. That covers the team's last
+        `num_games` games, so a player who sat some of them out gets fewer rows than
+        the gamelog path's last `num_games` games they played (players under
+        MIN_BOXSCORE_GAMES rows fall back to their gamelog).
+        Returns ({key: game logs}, {key: exception}), the logs being DataFrames or
+        GameLogs per log_format."""
+        if self._engine is None:
+            from src.fetch_engine import GameLogFetchEngine
+            self._engine = GameLogFetchEngine(self)
+        if source == "boxscore" and teams:
+            return self._get_player_stats_from_boxscores(players, num_games, budget, teams)
+        if self.store is None:
+            return self._engine.fetch(players, num_games=num_games, budget=budget)
+        return self._get_player_stats_incremental(players, num_games, budget, teams or {})
+
+    def _get_player_stats_incremental(self, players: dict, num_games: int, budget, teams: dict):
+        team_last_games = {}
+        if teams:
+            try:
+                team_last_games = self.get_team_last_completed_games()
+            except Exception as e:
+                print(f"ESPN recent scoreboard error, refreshing every player: {e}")
+
+        freshness = self.store.freshness(players.values())
+        stale = {
+            key: pid for key, pid in players.items()
+            if not self.store.is_fresh(freshness.get(int(pid)), team_last_games.get(teams.get(key)))
+        }
+
+        # Pull full seasons for stale players so the store keeps every game, not just the window
+        fetched, error_map = self._engine.fetch(stale, num_games=None, budget=budget)
+        new_games = sum(self.store.merge(stale[key], logs) for key, logs in fetched.items())
+
+        logs_map = {}
+        for key, pid in players.items():
+            if key in error_map:
+                if int(pid) not in freshness:
+                    continue
+                # Fall back to what's on disk rather than dropping the player entirely
+                print(f"Using stored game logs for {key} after fetch error: {error_map.pop(key)}")
+            if self.log_format == "records":
+                logs_map[key] = self.store.load_records(pid, num_games)
+            else:
+                logs_map[key] = self.store.load(pid, num_games)
+
+        self._store_stats = {
+            'store_fresh': len(players) - len(stale),
+            'store_refetched': len(stale),
+            'store_new_games': new_games,
+        }
+        return logs_map, error_map
+
+    def _get_player_stats_from_boxscores(self, players: dict, num_games: int, budget, teams: dict):
+        # One budget for the whole slate: each stage gets what the earlier ones left
+        deadline = time.monotonic() + budget if budget is not None else None
+        remaining = lambda: max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+        slate_teams = sorted({t for t in teams.values() if t})
+        schedules, schedule_errors = self._engine.run(
+            {abbr: partial(self.get_team_recent_game_ids, abbr, num_games, timeout=self._engine.request_deadline)
+             for abbr in slate_teams},
+            budget=remaining(),
+        )
+        for abbr, exc in schedule_errors.items():
+            print(f"ESPN schedule error for {abbr}: {exc}")
+        # Opponents on the same slate share games, so dedupe before fetching
+        game_ids = sorted({gid for ids in schedules.values() for gid in ids})
+        boxscores = self.get_boxscores(game_ids, budget=remaining())
+
+        rows_by_athlete = {}
+        for rows in boxscores.values():
+            for row in rows:
+                rows_by_athlete.setdefault(row["athlete_id"], []).append(row)
+
+        logs_map, fallback = {}, {}
+        for key, pid in players.items():
+            rows = rows_by_athlete.get(int(pid), [])
+            if len(rows) < MIN_BOXSCORE_GAMES:
+                fallback[key] = pid
+                continue
+            if self.log_format == "records":
+                logs_map[key] = GameLog.from_rows(rows, num_games)
+            else:
+                logs_map[key] = _rows_to_frame(
+                    [{k: v for k, v in row.items() if k != "athlete_id"} for row in rows], num_games
+                )
+
+        error_map = {}
+        if fallback:
+            if self.store is None:
+                extra, error_map = self._engine.fetch(fallback, num_games=num_games, budget=remaining())
+            else:
+                extra, error_map = self._get_player_stats_incremental(fallback, num_games, remaining(), teams)
+            logs_map.update(extra)
+
+        self._store_stats = {
+            'boxscore_teams': len(schedules),
+            # Teams whose schedule didn't load; their players all went to the fallback
+            'boxscore_schedule_errors': sorted(schedule_errors),
+            'boxscore_games': len(game_ids),
+            'boxscore_players': len(players) - len(fallback),
+            'boxscore_fallback': len(fallback),
+        }
+        return logs_map, error_map
+
+    def get_team_recent_game_ids(self, team_abbr: str, last_n: int = 15, timeout: int = 15) -> list:
+        """ESPN event ids of a team's last `last_n` completed games, most recent first.
+        `team_abbr` is the normalized abbreviation (GSW, NOP, ...)."""
+        data = self._get_json(f"{self.base_url}/teams/{_espn_team_slug(team_abbr)}/schedule", timeout=timeout)
+        completed = []
+        for ev in data.get("events") or []:
+            competitions = ev.get("competitions") or [{}]
+            status = (competitions[0].get("status") or {}).get("type") or {}
+            if status.get("completed") and ev.get("id"):
+                completed.append((ev.get("date") or "", str(ev["id"])))
+        completed.sort(reverse=True)
+        return [gid for _, gid in completed[:last_n]]
+
+    def get_boxscores(self, game_ids: list, budget: float | None = None) -> dict:
+        """Return {game_id: [per-athlete row dicts]} for completed games.
+
+        Completed box scores never change, so they're cached by game id in memory and,
+        when a store is attached, on disk."""
+        missing = [gid for gid in game_ids if gid not in self._boxscores]
+        if missing and self.store is not None:
+            self._boxscores.update(self.store.load_boxscores(missing))
+            missing = [gid for gid in missing if gid not in self._boxscores]
+
+        if missing:
+            fetched, errors = self._engine.run(
+                {gid: partial(self.get_boxscore, gid, timeout=self._engine.request_deadline) for gid in missing},
+                budget=budget,
+            )
+            for gid, exc in errors.items():
+                print(f"ESPN box score error for {gid}: {exc}")
+            for gid, rows in fetched.items():
+                self._boxscores[gid] = rows
+                if self.store is not None:
+                    self.store.save_boxscore(gid, rows)
+
+        return {gid: self._boxscores[gid] for gid in game_ids if gid in self._boxscores}
+
+    def get_boxscore(self, game_id: str, timeout: int = 15) -> list:
+        data = self._get_json(f"{self.base_url}/summary", params={"event": game_id}, timeout=timeout)
+        return self._parse_boxscore(data, game_id)
+
+    def _parse_boxscore(self, data: dict, game_id: str) -> list:
+        competitions = (data.get("header") or {}).get("competitions") or [{}]
+        game_date = competitions[0].get("date")
+        team_names = {
+            str((c.get("team") or {}).get("id")): (c.get("team") or {}).get("displayName") or ""
+            for c in competitions[0].get("competitors") or []
+        }
 
+        rows = []
+        for team_block in (data.get("boxscore") or {}).get("players") or []:
+            team_id = str((team_block.get("team") or {}).get("id"))
+            opponent = next((name for tid, name in team_names.items() if tid != team_id), "")
+            for group in team_block.get("statistics") or []:
+                idx = {label: i for i, label in enumerate(group.get("labels") or [])}
+                athlete_ids, stats_rows = [], []
+                for entry in group.get("athletes") or []:
+                    stats = entry.get("stats") or []
+                    if entry.get("didNotPlay") or not stats:
+                        continue
+                    try:
+                        athlete_ids.append(int((entry.get("athlete") or {}).get("id")))
+                    except (TypeError, ValueError):
+                        continue
+                    stats_rows.append(stats)
+                # Same column parse as the gamelog path
+                columns = [(column, _stat_values(stats_rows, idx.get(label), made=label == "3PT"))
+                           for column, label in STAT_COLUMNS]
+                for i, athlete_id in enumerate(athlete_ids):
+                    row = {"athlete_id": athlete_id, "GAME_ID": str(game_id), "GAME_DATE": game_date, "MATCHUP": opponent}
+                    row.update((column, values[i]) for column, values in columns)
+                    rows.append(row)
+        return rows
+
+    def get_team_last_completed_games(self, lookback_days: int = 7) -> dict:
+        """Return {team_abbr: tip-off time of its most recent completed game} from one
+        ranged scoreboard call over the last `lookback_days` days."""
+        end = datetime.now()
+        start = end - timedelta(days=lookback_days)
+        data = self._get_json(
+            f"{self.base_url}/scoreboard",
+            params={"dates": f"{start:%Y%m%d}-{end:%Y%m%d}", "limit": 500},
+            timeout=15,
+        )
+
+        last_games = {}
+        for ev in data.get("events") or []:
+            status = (ev.get("status") or {}).get("type") or {}
+            if not status.get("completed"):
+                continue
+            tip = parse_date(ev.get("date"))
+            if tip is None:
+                continue
+            competitions = ev.get("competitions") or [{}]
+            for c in competitions[0].get("competitors") or []:
+                abbr = _normalize_abbr((c.get("team") or {}).get("abbreviation") or "")
+                if abbr and (abbr not in last_games or tip > last_games[abbr]):
+                    last_games[abbr] = tip
+        return last_games
+
+    def _parse_gamelog(self, data: dict, num_games: int | None):
         labels = data.get("labels") or []
         idx = {label: i for i, label in enumerate(labels)}
         events_meta = data.get("events") or {}
 
-        rows = []
+        # Resolve rows first, converting nothing; first occurrence of an event id wins
+        seen = set()
+        game_ids, game_dates, matchups, stats_rows = [], [], [], []
         for season_type in data.get("seasonTypes") or []:
             name = (season_type.get("displayName") or "").lower()
             # Only include real games — skip preseason/all-star
@@ -141,27 +507,17 @@ class NBAFetcher:
                     if not stats:
                         continue
                     eid = str(ev.get("eventId") or "")
+                    if eid in seen:
+                        continue
+                    seen.add(eid)
                     meta = events_meta.get(eid) or {}
-                    rows.append({
-                        "GAME_ID": eid,
-                        "GAME_DATE": meta.get("gameDate"),
-                        "MATCHUP": (meta.get("opponent") or {}).get("displayName") or "",
-                        "MIN": _to_float(stats[idx["MIN"]]) if "MIN" in idx and idx["MIN"] < len(stats) else 0.0,
-                        "PTS": _to_float(stats[idx["PTS"]]) if "PTS" in idx and idx["PTS"] < len(stats) else 0.0,
-                        "REB": _to_float(stats[idx["REB"]]) if "REB" in idx and idx["REB"] < len(stats) else 0.0,
-                        "AST": _to_float(stats[idx["AST"]]) if "AST" in idx and idx["AST"] < len(stats) else 0.0,
-                        "BLK": _to_float(stats[idx["BLK"]]) if "BLK" in idx and idx["BLK"] < len(stats) else 0.0,
-                        "STL": _to_float(stats[idx["STL"]]) if "STL" in idx and idx["STL"] < len(stats) else 0.0,
-                        "FG3M": _split_made(stats[idx["3PT"]]) if "3PT" in idx and idx["3PT"] < len(stats) else 0.0,
-                    })
+                    game_ids.append(eid)
+                    game_dates.append(meta.get("gameDate"))
+                    matchups.append((meta.get("opponent") or {}).get("displayName") or "")
+                    stats_rows.append(stats)
 
-        if not rows:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(rows).drop_duplicates(subset=["GAME_ID"])
-        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], errors="coerce")
-        df = df.dropna(subset=["GAME_DATE"]).sort_values("GAME_DATE", ascending=False).reset_index(drop=True)
-        return df.head(num_games)
+        build = _columnar_records if self.log_format == "records" else _columnar_frame
+        return build(game_ids, game_dates, matchups, stats_rows, idx, num_games)
 
     def get_active_players_with_stats(self, timeout: int = 30):
         """Return list of {id, name, team, jersey, position, pts, reb, ast} for players
@@ -170,14 +526,11 @@ class NBAFetcher:
         
         season_year = now.year + 1 if now.month >= 9 else now.year
 
-        resp = requests.get(
-            f"{ESPN_WEB_BASE}/statistics/byathlete",
+        data = self._get_json(
+            f"{self.web_base_url}/statistics/byathlete",
             params={"limit": 1000, "season": season_year},
-            headers=HEADERS,
             timeout=timeout,
         )
-        resp.raise_for_status()
-        data = resp.json()
 
         # Build {category_name: {stat_name: index}} lookups using the semantic `names` array
         cat_index = {}
@@ -242,14 +595,12 @@ class NBAFetcher:
                     return p["id"]
 
         try:
-            resp = requests.get(
-                "https://site.api.espn.com/apis/common/v3/search",
+            data = self._get_json(
+                self.search_url,
                 params={"query": name, "limit": 5, "type": "player"},
-                headers=HEADERS,
                 timeout=8,
             )
-            resp.raise_for_status()
-            items = resp.json().get("items") or []
+            items = data.get("items") or []
             for item in items:
                 if item.get("league") == "nba" and normalize_name(item.get("displayName") or "") == target:
                     return int(item["id"])
@@ -0,0 +1,180 @@
+"""
+Incremental on-disk game-log store
+SQLite table of every game row fetched from ESPN, keyed by (athlete id, GAME_ID).
+A picks refresh only re-downloads players whose team has completed a game since
+their logs were last fetched; everyone else is served straight from disk.
+Harvested box scores are kept alongside, keyed by game id.
+Logs load as DataFrames (load, load_all) or, without pandas, as GameLogs
+(load_records, see src/records.py).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from src.records import GameLog, parse_date
+
+DEFAULT_STORE_PATH = os.getenv(
+    'GAMELOG_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'gamelogs.sqlite'),
+)
+
+# Columns in the same order get_player_stats returns them
+COLUMNS = ['GAME_ID', 'GAME_DATE', 'MATCHUP', 'MIN', 'PTS', 'REB', 'AST', 'BLK', 'STL', 'FG3M']
+
+# A game is only reliably in ESPN's gamelog a few hours after tip-off
+GAME_SETTLE_HOURS = 4
+
+
+class GameLogStore:
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS games (
+                    athlete_id INTEGER NOT NULL,
+                    game_id TEXT NOT NULL,
+                    game_date TEXT NOT NULL,
+                    matchup TEXT,
+                    min REAL, pts REAL, reb REAL, ast REAL, blk REAL, stl REAL, fg3m REAL,
+                    PRIMARY KEY (athlete_id, game_id)
+                );
+                CREATE INDEX IF NOT EXISTS games_by_date ON games (athlete_id, game_date DESC);
+                CREATE TABLE IF NOT EXISTS athletes (
+                    athlete_id INTEGER PRIMARY KEY,
+                    last_game_date TEXT,
+                    fetched_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS boxscores (
+                    game_id TEXT PRIMARY KEY,
+                    rows TEXT NOT NULL
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def freshness(self, athlete_ids: Iterable[int]) -> Dict[int, tuple]:
+        """Return {athlete_id: (last_game_date, fetched_at)} for athletes already stored."""
+        ids = [int(a) for a in athlete_ids]
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT athlete_id, last_game_date, fetched_at FROM athletes "
+                f"WHERE athlete_id IN ({placeholders})",
+                ids,
+            ).fetchall()
+        return {aid: (parse_date(last), parse_date(fetched)) for aid, last, fetched in rows}
+
+    def is_fresh(self, entry: Optional[tuple], team_last_game) -> bool:
+        """
+        An athlete is fresh if the store already has their team's last completed game,
+        or was refreshed after that game settled (covers DNPs). Unknown team → stale.
+        """
+        if entry is None or team_last_game is None:
+            return False
+        last_game_date, fetched_at = entry
+        team_last_game = parse_date(team_last_game)
+        if last_game_date is not None and last_game_date >= team_last_game:
+            return True
+        return fetched_at is not None and fetched_at >= team_last_game + timedelta(hours=GAME_SETTLE_HOURS)
+
+    def merge(self, athlete_id: int, game_logs) -> int:
+        """Upsert an athlete's fetched rows (a DataFrame or GameLog). Returns the number of games not seen before."""
+        athlete_id = int(athlete_id)
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        if game_logs is not None and len(game_logs):
+            if isinstance(game_logs, GameLog):
+                records = game_logs.itertuples()
+            else:
+                records = game_logs[COLUMNS].itertuples(index=False, name=None)
+            for game_id, game_date, matchup, *stats in records:
+                rows.append((athlete_id, str(game_id), parse_date(game_date).isoformat(), matchup, *stats))
+
+        with self._lock, self._connect() as conn:
+            before = conn.execute(
+                "SELECT COUNT(*) FROM games WHERE athlete_id = ?", (athlete_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            after, last = conn.execute(
+                "SELECT COUNT(*), MAX(game_date) FROM games WHERE athlete_id = ?", (athlete_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO athletes VALUES (?, ?, ?)", (athlete_id, last, now)
+            )
+        return after - before
+
+    def _load_rows(self, athlete_id: int, num_games: Optional[int]) -> list:
+        query = (
+            "SELECT game_id, game_date, matchup, min, pts, reb, ast, blk, stl, fg3m "
+            "FROM games WHERE athlete_id = ? ORDER BY game_date DESC"
+        )
+        params = [int(athlete_id)]
+        if num_games is not None:
+            query += " LIMIT ?"
+            params.append(int(num_games))
+        with self._connect() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def load(self, athlete_id: int, num_games: Optional[int] = None):
+        """Most recent games first, in the same frame shape get_player_stats returns."""
+        import pandas as pd
+        rows = self._load_rows(athlete_id, num_games)
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], utc=True)
+        return df
+
+    def load_records(self, athlete_id: int, num_games: Optional[int] = None) -> GameLog:
+        """load() as a GameLog, without pandas."""
+        rows = self._load_rows(athlete_id, num_games)
+        return GameLog.from_rows((dict(zip(COLUMNS, row)) for row in rows), num_games)
+
+    def load_all(self, athlete_ids: Optional[Iterable[int]] = None):
+        """Every stored game (or just `athlete_ids`'), oldest first per athlete, with an ATHLETE_ID column."""
+        import pandas as pd
+        query = (
+            "SELECT athlete_id, game_id, game_date, matchup, min, pts, reb, ast, blk, stl, fg3m FROM games"
+        )
+        params = []
+        if athlete_ids is not None:
+            params = [int(a) for a in athlete_ids]
+            if not params:
+                return pd.DataFrame(columns=['ATHLETE_ID'] + COLUMNS)
+            query += f" WHERE athlete_id IN ({','.join('?' * len(params))})"
+        query += " ORDER BY athlete_id, game_date"
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        df = pd.DataFrame(rows, columns=['ATHLETE_ID'] + COLUMNS)
+        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], utc=True)
+        return df
+
+    def load_boxscores(self, game_ids: Iterable[str]) -> Dict[str, list]:
+        """Parsed box-score rows for any of `game_ids` already harvested."""
+        ids = [str(g) for g in game_ids]
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT game_id, rows FROM boxscores WHERE game_id IN ({placeholders})", ids
+            ).fetchall()
+        return {game_id: json.loads(payload) for game_id, payload in rows}
+
+    def save_boxscore(self, game_id: str, rows: list):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO boxscores VALUES (?, ?)", (str(game_id), json.dumps(rows))
+            )
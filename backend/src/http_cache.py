@@ -0,0 +1,198 @@
+"""
+Conditional-request HTTP cache for ESPN endpoints
+Stores each response body with its ETag / Last-Modified validators on disk and
+revalidates with If-None-Match / If-Modified-Since. A 304 is served from disk,
+so unchanged payloads (notably the ~1000-athlete byathlete list) cost a round
+trip but no body transfer or re-download.
+
+The directory is capped at HTTP_CACHE_MAX_BYTES: past it, the least recently used
+entries are deleted. Each write or 304 stamps the entry with an increasing use
+number, saved in an index file beside the entries so the order survives restarts
+(file mtimes can tie within a timestamp tick). On Lambda /tmp is 512MB and shared
+with the game-log store.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.rate_limiter import throttled_get
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'HTTP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'http'),
+)
+DEFAULT_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Entry file name -> use number; not a .json file, so it's never taken for an entry
+INDEX_FILE = 'lru-index'
+
+
+class ConditionalCache:
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        # path -> bytes on disk, least recently used first
+        self._sizes = OrderedDict()
+        # path -> use number, in the same order
+        self._used = {}
+        self._last_use = 0
+        self._bytes = 0
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Pick up entries left by earlier processes, oldest use first, and trim to the
+        cap. Entries missing from the index (written before it existed, or by another
+        process since it was saved) fall back to their mtime.
+        """
+        try:
+            with open(self._index_path) as f:
+                used = json.load(f)
+        except (FileNotFoundError, ValueError):
+            used = {}
+        entries = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith('.json'):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((used.get(e.name, st.st_mtime_ns), e.path, st.st_size))
+        with self._lock:
+            for use, path, size in sorted(entries):
+                self._sizes[path] = size
+                self._used[path] = use
+                self._bytes += size
+                self._last_use = max(self._last_use, use)
+            self._evict()
+            self._save_index()
+
+    def _use(self, path: str):
+        # Caller holds the lock. Nanosecond clock, forced strictly increasing so two
+        # uses never tie, and comparable with the mtimes used for unindexed entries
+        self._last_use = max(time.time_ns(), self._last_use + 1)
+        self._used[path] = self._last_use
+        self._sizes.move_to_end(path)
+
+    def _save_index(self):
+        # Caller holds the lock; write-then-rename like the entries
+        tmp = f"{self._index_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({os.path.basename(p): self._used[p] for p in self._sizes}, f)
+            os.replace(tmp, self._index_path)
+        except OSError as e:
+            print(f"Failed to save HTTP cache index: {e}")
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._bytes > self.max_bytes and self._sizes:
+            path, size = self._sizes.popitem(last=False)
+            self._used.pop(path, None)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _touch(self, path: str):
+        with self._lock:
+            if path in self._sizes:
+                self._use(path)
+                self._save_index()
+
+    def _path(self, url: str, params: Optional[Dict]) -> str:
+        key = url + '?' + '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, path: str, entry: Dict):
+        # Write-then-rename so concurrent readers never see a half-written entry
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes += size - self._sizes.pop(path, 0)
+            self._sizes[path] = size
+            self._use(path)
+            self._evict()
+            self._save_index()
+
+    def get_json(self, session, url: str, params: Optional[Dict] = None,
+                 headers: Optional[Dict] = None, timeout: float = 15):
+        path = self._path(url, params)
+        entry = self._read(path)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        resp = throttled_get(session, url, params=params, headers=request_headers, timeout=timeout)
+
+        if resp.status_code == 304 and entry:
+            with self._lock:
+                self.hits += 1
+                # The body bytes the 304 didn't transfer (entries from before 'size' was stored: re-encode)
+                self.bytes_saved += entry.get('size') or len(entry['body'].encode())
+            self._touch(path)
+            return json.loads(entry['body'])
+
+        resp.raise_for_status()
+        body = resp.text
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+
+        with self._lock:
+            if etag or last_modified:
+                self.misses += 1
+            else:
+                self.uncacheable += 1
+        if etag or last_modified:
+            try:
+                self._write(path, {'etag': etag, 'last_modified': last_modified, 'body': body,
+                                   'size': len(resp.content)})
+            except OSError as e:
+                print(f"Failed to write HTTP cache entry for {url}: {e}")
+        return json.loads(body)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            revalidated = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'uncacheable': self.uncacheable,
+                'hit_ratio': round(self.hits / revalidated, 3) if revalidated else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self._sizes),
+                'bytes_on_disk': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
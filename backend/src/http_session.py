@@ -0,0 +1,151 @@
+"""
+Shared pooled HTTP session
+One keep-alive requests.Session for every outbound ESPN and Odds API call. It lives
+at module level, so warm Lambda invocations reuse the open connections instead of
+paying a fresh TCP+TLS handshake per request.
+"""
+
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_lock = threading.Lock()
+_counters = {'requests': 0, 'new_connections': 0}
+
+
+def _count(key: str):
+    with _lock:
+        _counters[key] += 1
+
+
+class _CountingHTTPPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count('new_connections')
+        return super()._new_conn()
+
+
+class _CountingHTTPSPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count('new_connections')
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools report every new connection they open. An adapter
+    replaced on the session is retired rather than closed: it closes once the
+    requests already sent through it have finished.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._state_lock = threading.Lock()
+        self.in_flight = 0
+        self.retired = False
+        self.closed = False
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPPool,
+            'https': _CountingHTTPSPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        _count('requests')
+        with self._state_lock:
+            self.in_flight += 1
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            with self._state_lock:
+                self.in_flight -= 1
+                idle = self.retired and not self.in_flight
+            if idle:
+                self.close()
+
+    def retire(self):
+        """Close now if idle, else when the last in-flight request returns."""
+        with self._state_lock:
+            self.retired = True
+            idle = not self.in_flight
+        if idle:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+_session = None
+_pool_maxsize = 0
+# Builds the adapter mounted on the shared session; swapped out for record/replay (src/cassette.py)
+_adapter_factory = PooledAdapter
+
+
+def _install(session: requests.Session):
+    """Mount a fresh adapter on both schemes; returns the one it replaced. Caller holds _lock."""
+    previous = session.adapters.get('https://')
+    adapter = _adapter_factory(pool_connections=4, pool_maxsize=_pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return previous
+
+
+def _mount(session: requests.Session, factory=None):
+    """Swap in a fresh adapter (built by `factory` from now on, if given) under the lock."""
+    global _adapter_factory
+    with _lock:
+        if factory is not None:
+            _adapter_factory = factory
+        previous = _install(session)
+    if isinstance(previous, PooledAdapter):
+        # Other threads may still be mid-request on it
+        previous.retire()
+
+
+def configure_pool(maxsize: int):
+    """Grow the per-host pool to at least `maxsize` connections (never shrinks)."""
+    global _pool_maxsize
+    session = get_session()
+    with _lock:
+        if maxsize <= _pool_maxsize:
+            return
+        _pool_maxsize = int(maxsize)
+    _mount(session)
+
+
+def set_adapter_factory(factory):
+    """Remount the shared session with adapters built by `factory(**pool_kwargs)`."""
+    _mount(get_session(), factory)
+
+
+def get_session() -> requests.Session:
+    global _session, _pool_maxsize
+    if _session is None:
+        with _lock:
+            if _session is None:
+                # Published only once its adapter is mounted, so no caller ever sends
+                # through requests' default (uncounted, unsized) adapter
+                session = requests.Session()
+                _pool_maxsize = max(_pool_maxsize, 10)
+                _install(session)
+                _session = session
+    return _session
+
+
+def session_stats() -> Dict:
+    with _lock:
+        total = _counters['requests']
+        new = _counters['new_connections']
+        reused = max(0, total - new)
+        return {
+            'requests': total,
+            'new_connections': new,
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / total, 3) if total else 0.0,
+            'pool_maxsize': _pool_maxsize,
+        }
@@ -0,0 +1,376 @@
+"""
+Append-only line-movement history of Odds API snapshots
+Every get_all_player_props result can be appended; only what changed is stored.
+An offer is one (event, player, stat, bookmaker, side) and its state is
+(line, price). An append writes a row for each offer whose state differs from the
+last one recorded, plus a withdrawal row (no line) for offers of the snapshot's
+events that are no longer listed. A quiet market costs nothing but the snapshot
+log entry.
+
+Layout (SQLite, like the game-log store): events, players and offers are
+dictionary tables, so change rows are four small integers:
+changes(offer, ts, half_points, price), clustered by (offer, ts). Lines are kept
+in half points, so typical x.5 lines are stored as integers. Range queries by
+player or event walk that clustered key, and time-only queries use the ts index.
+Results are streamed from the cursor, never loaded whole.
+
+history() yields the changes behind line-movement charts. snapshot_at() rebuilds
+a get_all_player_props-shaped snapshot for any past moment. closing_snapshots()
+gives each event's last pre-tip lines in the backtest's snapshot format.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from src.records import parse_date
+
+DEFAULT_HISTORY_PATH = os.getenv(
+    'LINE_HISTORY_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'line_history.sqlite'),
+)
+
+# Slate dates are US Eastern, like the Odds API commence windows
+SLATE_TZ = 'America/New_York'
+
+EVENT_FIELDS = ('home_team', 'away_team', 'commence_time')
+
+
+def _epoch(value) -> Optional[int]:
+    """Epoch seconds from epoch numbers, or anything records.parse_date reads; raises on anything else."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"Not a timestamp: {value!r}")
+    return int(parsed.timestamp())
+
+
+class LineHistoryStore:
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._players: Dict[str, tuple] = {}   # name -> (player_key, player_id)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    event_key INTEGER PRIMARY KEY,
+                    event_id TEXT NOT NULL UNIQUE,
+                    home_team TEXT, away_team TEXT, commence_time TEXT,
+                    commence_ts INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS events_by_commence ON events (commence_ts);
+                CREATE TABLE IF NOT EXISTS players (
+                    player_key INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE,
+                    player_id INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS offers (
+                    offer_key INTEGER PRIMARY KEY,
+                    event_key INTEGER NOT NULL,
+                    player_key INTEGER NOT NULL,
+                    stat_type TEXT NOT NULL,
+                    bookmaker TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    last_half_points NUMERIC,
+                    last_price NUMERIC,
+                    UNIQUE (event_key, player_key, stat_type, bookmaker, side)
+                );
+                CREATE INDEX IF NOT EXISTS offers_by_player ON offers (player_key);
+                CREATE TABLE IF NOT EXISTS changes (
+                    offer_key INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    half_points NUMERIC,
+                    price NUMERIC,
+                    PRIMARY KEY (offer_key, ts)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS changes_by_ts ON changes (ts);
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    ts INTEGER PRIMARY KEY,
+                    events INTEGER NOT NULL,
+                    offers INTEGER NOT NULL,
+                    changes INTEGER NOT NULL
+                );
+            """)
+        self._load_players()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _load_players(self):
+        with self._connect() as conn:
+            self._players = {name: (key, player_id) for name, key, player_id in
+                             conn.execute("SELECT name, player_key, player_id FROM players")}
+
+    def _player_key(self, conn, name: str, player_id: Optional[int]) -> int:
+        known = self._players.get(name)
+        if known is None:
+            key = conn.execute("INSERT INTO players (name, player_id) VALUES (?, ?)", (name, player_id)).lastrowid
+            self._players[name] = (key, player_id)
+            return key
+        key, known_id = known
+        if player_id is not None and player_id != known_id:
+            conn.execute("UPDATE players SET player_id = ? WHERE player_key = ?", (player_id, key))
+            self._players[name] = (key, player_id)
+        return key
+
+    def append(self, raw_odds: Dict[str, Dict], ts=None, player_ids: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Record one get_all_player_props snapshot taken at `ts` (default now). Only
+        events present in it can have offers withdrawn. `player_ids` optionally maps
+        player names to ESPN ids, which closing_snapshots() needs.
+        """
+        ts = _epoch(ts) if ts is not None else int(time.time())
+        player_ids = player_ids or {}
+        with self._lock:
+            try:
+                return self._append(raw_odds, ts, player_ids)
+            except Exception:
+                # the transaction rolled back, so drop player keys it may have cached
+                self._load_players()
+                raise
+
+    def _append(self, raw_odds: Dict[str, Dict], ts: int, player_ids: Dict[str, int]) -> Dict:
+        with self._connect() as conn:
+            event_keys = {}
+            for data in raw_odds.values():
+                event_id = str(data.get('event_id'))
+                if event_id in event_keys:
+                    continue
+                meta = [data.get(f) for f in EVENT_FIELDS]
+                commence = meta[2]
+                try:
+                    commence_ts = _epoch(commence) if commence and commence != 'N/A' else None
+                except ValueError:
+                    commence_ts = None
+                conn.execute(
+                    """
+                    INSERT INTO events (event_id, home_team, away_team, commence_time, commence_ts)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (event_id) DO UPDATE SET home_team = excluded.home_team,
+                        away_team = excluded.away_team, commence_time = excluded.commence_time,
+                        commence_ts = excluded.commence_ts
+                    """,
+                    (event_id, *meta, commence_ts),
+                )
+                event_keys[event_id] = conn.execute(
+                    "SELECT event_key FROM events WHERE event_id = ?", (event_id,)
+                ).fetchone()[0]
+
+            # Current state of every offer on these events
+            existing = {}
+            if event_keys:
+                placeholders = ','.join('?' * len(event_keys))
+                for row in conn.execute(
+                    f"SELECT event_key, player_key, stat_type, bookmaker, side, offer_key, last_half_points, last_price "
+                    f"FROM offers WHERE event_key IN ({placeholders})",
+                    list(event_keys.values()),
+                ):
+                    existing[row[:5]] = (row[5], row[6], row[7])
+
+            # The snapshot's state per offer; a repeated offer keeps its last listing
+            state = {}
+            for name, data in raw_odds.items():
+                player_key = self._player_key(conn, name, player_ids.get(name))
+                event_key = event_keys[str(data.get('event_id'))]
+                for stat_type, offers in (data.get('props') or {}).items():
+                    for o in offers:
+                        if o.get('line') is None:
+                            continue
+                        ident = (event_key, player_key, stat_type, o.get('bookmaker') or 'unknown', o.get('name') or '')
+                        state[ident] = (float(o['line']) * 2, o.get('price'))
+
+            rows = []
+            seen = set()
+            for ident, (half_points, price) in state.items():
+                current = existing.get(ident)
+                if current is None:
+                    offer_key = conn.execute(
+                        "INSERT INTO offers (event_key, player_key, stat_type, bookmaker, side) VALUES (?, ?, ?, ?, ?)",
+                        ident,
+                    ).lastrowid
+                elif (current[1], current[2]) == (half_points, price):
+                    seen.add(current[0])
+                    continue
+                else:
+                    offer_key = current[0]
+                seen.add(offer_key)
+                rows.append((offer_key, ts, half_points, price))
+            for ident, (offer_key, half_points, _) in existing.items():
+                if offer_key not in seen and half_points is not None:
+                    rows.append((offer_key, ts, None, None))
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO changes (offer_key, ts, half_points, price) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.executemany(
+                "UPDATE offers SET last_half_points = ?, last_price = ? WHERE offer_key = ?",
+                [(half_points, price, offer_key) for offer_key, _, half_points, price in rows],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (ts, events, offers, changes) VALUES (?, ?, ?, ?)",
+                (ts, len(event_keys), len(state), len(rows)),
+            )
+        return {'ts': ts, 'events': len(event_keys), 'offers': len(state), 'changes': len(rows)}
+
+    @staticmethod
+    def _filters(player: Optional[str], event_id: Optional[str], stat_type: Optional[str],
+                 bookmaker: Optional[str]) -> tuple:
+        clauses, params = [], []
+        for column, value in (('p.name', player), ('e.event_id', event_id),
+                              ('o.stat_type', stat_type), ('o.bookmaker', bookmaker)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        return clauses, params
+
+    def _stream(self, sql: str, params: list, batch: int) -> Iterator[tuple]:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def history(self, player: Optional[str] = None, event_id: Optional[str] = None, stat_type: Optional[str] = None,
+                bookmaker: Optional[str] = None, start=None, end=None, batch: int = 1000) -> Iterator[Dict]:
+        """
+        Line and price changes, oldest first, for offers matching the filters, with
+        `start` <= ts < `end`. Each offer's state at `start` comes first (at the time
+        it was set), so a chart starts from the right line. A withdrawn offer has
+        line None.
+        """
+        clauses, params = self._filters(player, event_id, stat_type, bookmaker)
+        start, end = _epoch(start), _epoch(end)
+        base = """
+            SELECT c.ts, e.event_id, p.name, o.stat_type, o.bookmaker, o.side, c.half_points, c.price, o.offer_key
+            FROM offers o
+            JOIN events e ON e.event_key = o.event_key
+            JOIN players p ON p.player_key = o.player_key
+            JOIN changes c ON c.offer_key = o.offer_key
+        """
+        parts, all_params = [], []
+        if start is not None:
+            parts.append(base + " WHERE " + " AND ".join(clauses + [
+                "c.ts = (SELECT MAX(ts) FROM changes WHERE offer_key = o.offer_key AND ts < ?)"
+            ]))
+            all_params += params + [start]
+        window = list(clauses)
+        window_params = list(params)
+        if start is not None:
+            window.append("c.ts >= ?")
+            window_params.append(start)
+        if end is not None:
+            window.append("c.ts < ?")
+            window_params.append(end)
+        parts.append(base + (" WHERE " + " AND ".join(window) if window else ""))
+        all_params += window_params
+        sql = " UNION ALL ".join(parts) + " ORDER BY 1, 9"
+
+        for ts, eid, name, stat, book, side, half_points, price, _ in self._stream(sql, all_params, batch):
+            yield {
+                'ts': ts,
+                'time': datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+                'event_id': eid,
+                'player_name': name,
+                'stat_type': stat,
+                'bookmaker': book,
+                'side': side,
+                'line': half_points / 2 if half_points is not None else None,
+                'price': price,
+            }
+
+    def snapshot_at(self, ts, event_id: Optional[str] = None, player: Optional[str] = None,
+                    batch: int = 1000) -> Dict[str, Dict]:
+        """The offers listed at `ts`, shaped like OddsFetcher.get_all_player_props."""
+        clauses, params = self._filters(player, event_id, None, None)
+        sql = f"""
+            SELECT e.event_id, e.home_team, e.away_team, e.commence_time, p.name, o.stat_type, o.bookmaker,
+                   o.side, c.half_points, c.price
+            FROM offers o
+            JOIN events e ON e.event_key = o.event_key
+            JOIN players p ON p.player_key = o.player_key
+            JOIN changes c ON c.offer_key = o.offer_key
+            WHERE {' AND '.join(clauses + ['c.ts = (SELECT MAX(ts) FROM changes WHERE offer_key = o.offer_key AND ts <= ?)'])}
+            ORDER BY o.offer_key
+        """
+        snapshot = {}
+        for eid, home, away, commence, name, stat, book, side, half_points, price in \
+                self._stream(sql, params + [_epoch(ts)], batch):
+            if half_points is None:
+                continue
+            entry = snapshot.setdefault(name, {
+                'event_id': eid, 'home_team': home, 'away_team': away, 'commence_time': commence, 'props': {},
+            })
+            entry['props'].setdefault(stat, []).append(
+                {'line': half_points / 2, 'bookmaker': book, 'price': price, 'name': side}
+            )
+        return snapshot
+
+    def closing_snapshots(self, start=None, end=None) -> Dict[str, Dict[int, Dict]]:
+        """
+        Each event's lines as of its commence time, for events starting in
+        [start, end), in src.backtest.load_snapshots' format. Players without a
+        recorded ESPN id are left out.
+        """
+        from src.odds_fetcher import convert_to_simple_format
+
+        clauses, params = ["commence_ts IS NOT NULL"], []
+        if start is not None:
+            clauses.append("commence_ts >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            clauses.append("commence_ts < ?")
+            params.append(_epoch(end))
+        with self._connect() as conn:
+            events = conn.execute(
+                f"SELECT event_id, commence_ts FROM events WHERE {' AND '.join(clauses)} ORDER BY commence_ts",
+                params,
+            ).fetchall()
+
+        snapshots = defaultdict(dict)
+        tz = ZoneInfo(SLATE_TZ)
+        for event_id, commence_ts in events:
+            date = datetime.fromtimestamp(commence_ts, tz).date().isoformat()
+            # Lines recorded strictly before tip-off
+            closing = convert_to_simple_format(self.snapshot_at(commence_ts - 1, event_id=event_id))
+            for name, props in closing.items():
+                player_id = self._players.get(name, (None, None))[1]
+                if player_id is None or not props:
+                    continue
+                snapshots[date][int(player_id)] = {'name': name, 'props': props}
+        return dict(snapshots)
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            snapshots, offers_seen, changes_written = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(offers), 0), COALESCE(SUM(changes), 0) FROM snapshots"
+            ).fetchone()
+            events, = conn.execute("SELECT COUNT(*) FROM events").fetchone()
+            offers, = conn.execute("SELECT COUNT(*) FROM offers").fetchone()
+            first, last = conn.execute("SELECT MIN(ts), MAX(ts) FROM snapshots").fetchone()
+        return {
+            'snapshots': snapshots,
+            'events': events,
+            'offers': offers,
+            'offer_listings_seen': offers_seen,
+            'changes_stored': changes_written,
+            'dedup_ratio': round(offers_seen / changes_written, 1) if changes_written else None,
+            'first_snapshot': datetime.fromtimestamp(first, timezone.utc).isoformat() if first else None,
+            'last_snapshot': datetime.fromtimestamp(last, timezone.utc).isoformat() if last else None,
+            'bytes': sum(os.path.getsize(p) for p in (self.path, self.path + '-wal') if os.path.exists(p)),
+        }
@@ -0,0 +1,10 @@
+"""
+Player name matching across sources
+Kept apart from src/fetcher.py so the read path (picks index, player pages) can
+match names without importing pandas.
+"""
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip periods/commas, used for cross-source name comparison."""
+    return (name or "").lower().replace(".", "").replace(",", "").strip()
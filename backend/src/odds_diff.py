@@ -0,0 +1,101 @@
+"""
+Diffs between two Odds API snapshots, for incremental picks refreshes
+A prop is one (player, stat_type) market; its signature is every offer the
+snapshot holds for it as (side, line, price, bookmaker), in order. Predictions
+for a prop depend only on the player's game logs and that signature, so a prop
+whose signature didn't change keeps its previous prediction and only the moved,
+new props go back through the analyzer. A player whose event details changed is
+recomputed whole.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+EVENT_FIELDS = ('event_id', 'home_team', 'away_team', 'commence_time')
+
+
+def prop_signatures(raw_odds: Dict[str, Dict]) -> Dict[str, Dict[str, tuple]]:
+    """{player: {stat_type: ((side, line, price, bookmaker), ...)}} for a get_all_player_props result."""
+    return {
+        player: {
+            stat_type: tuple((o.get('name'), o.get('line'), o.get('price'), o.get('bookmaker')) for o in offers)
+            for stat_type, offers in (data.get('props') or {}).items()
+        }
+        for player, data in raw_odds.items()
+    }
+
+
+class OddsDiff:
+    """Props added, removed, changed and unchanged between `previous` and `current` raw odds."""
+
+    def __init__(self, previous: Optional[Dict[str, Dict]], current: Dict[str, Dict]):
+        previous = previous or {}
+        before, after = prop_signatures(previous), prop_signatures(current)
+        self.added: Set[tuple] = set()
+        self.removed: Set[tuple] = set()
+        self.changed: Set[tuple] = set()
+        self.unchanged: Set[tuple] = set()
+        # players whose every prop is recomputed: new to the slate or their event moved
+        self.new_players: Set[str] = set()
+
+        for player, props in after.items():
+            old = before.get(player)
+            if old is None or any(previous[player].get(f) != current[player].get(f) for f in EVENT_FIELDS):
+                self.new_players.add(player)
+                self.added.update((player, stat) for stat in props)
+                if old is not None:
+                    self.removed.update((player, stat) for stat in old if stat not in props)
+                continue
+            for stat, signature in props.items():
+                if stat not in old:
+                    self.added.add((player, stat))
+                elif old[stat] != signature:
+                    self.changed.add((player, stat))
+                else:
+                    self.unchanged.add((player, stat))
+            self.removed.update((player, stat) for stat in old if stat not in props)
+        for player, props in before.items():
+            if player not in after:
+                self.removed.update((player, stat) for stat in props)
+
+        self._dirty = defaultdict(set)
+        for player, stat in self.added | self.changed:
+            self._dirty[player].add(stat)
+
+    def dirty(self, player: str) -> Optional[Set[str]]:
+        """Stats of `player` to recompute; None means all of them."""
+        if player in self.new_players:
+            return None
+        return self._dirty.get(player, set())
+
+    def stats(self) -> Dict:
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'removed': len(self.removed),
+            'unchanged': len(self.unchanged),
+        }
+
+
+def group_predictions(predictions: List[Dict]) -> Dict[tuple, List[Dict]]:
+    """Predictions keyed by (player_name, stat_type), in their original order."""
+    grouped = defaultdict(list)
+    for p in predictions or []:
+        grouped[(p['player_name'], p['stat_type'])].append(p)
+    return grouped
+
+
+def merge_predictions(player: str, stat_order, recomputed: List[Dict], previous: Dict[tuple, List[Dict]],
+                      dirty: Optional[Set[str]]) -> List[Dict]:
+    """
+    `player`'s predictions in the order a full rebuild would produce them (the
+    order of `stat_order`): recomputed ones for dirty stats, previous ones for the rest.
+    """
+    fresh = group_predictions(recomputed)
+    merged = []
+    for stat in stat_order:
+        if dirty is None or stat in dirty:
+            merged.extend(fresh.get((player, stat), ()))
+        else:
+            merged.extend(previous.get((player, stat), ()))
+    return merged
@@ -6,24 +6,28 @@ Optimized for premium subscription with access to all bookmakers
 import requests
 from typing import Dict, List, Optional, Any
 import os
-from pathlib import Path
 import time
+from concurrent.futures import ThreadPoolExecutor
 from zoneinfo import ZoneInfo
 from datetime import datetime, timedelta, timezone
-
-# loading env vars manually
-def load_env_file():
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+from src.env import load_env_file
+from src.http_session import get_session
+from src.odds_quota import MAX_REFRESH_SECONDS, QuotaTracker, RefreshScheduler
+from src.rate_limiter import throttled_get
+from src.records import parse_date
 
 load_env_file()
 
+# Max event-odds requests in flight at once; the per-host rate limiter still applies
+ODDS_CONCURRENCY = int(os.getenv('ODDS_CONCURRENCY', '4'))
+
+DEFAULT_MARKETS = [
+    'player_points',
+    'player_assists',
+    'player_rebounds',
+    'player_threes'
+]
+
 
 class OddsFetcher:
     
@@ -36,9 +40,17 @@ class OddsFetcher:
         'player_blocks': 'BLK'
     }
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         self.api_key = api_key or os.getenv('ODDS_API_KEY')
-        self.base_url = "https://api.the-odds-api.com/v4"
+        self.base_url = base_url or os.getenv('ODDS_API_BASE_URL', "https://api.the-odds-api.com/v4")
+        self.session = get_session()
+        self.last_fetch_stats = {}
+        self.quota = QuotaTracker()
+        self.scheduler = RefreshScheduler(self.quota)
+        # (event_id, market set) -> {'fetched_at', 'props'}; lets a refresh re-price only due events.
+        # Only successful fetches are stored, and events leave once they tip off
+        self._event_cache = {}
+        self._last_events = []
         
     def get_nba_events(self, today_only: bool = True, max_lookahead_days: int = 7) -> List[Dict]:
         if not self.api_key:
@@ -53,7 +65,8 @@ class OddsFetcher:
                 "dateFormat": "iso",
             }
             try:
-                response = requests.get(url, params=params, timeout=10)
+                response = throttled_get(self.session, url, params=params, timeout=10)
+                self.quota.record(response.headers, 'events')
                 response.raise_for_status()
                 events = response.json()
                 print(f"Found {len(events)} upcoming NBA games")
@@ -80,7 +93,8 @@ class OddsFetcher:
             }
 
             try:
-                response = requests.get(url, params=params, timeout=10)
+                response = throttled_get(self.session, url, params=params, timeout=10)
+                self.quota.record(response.headers, 'events')
                 response.raise_for_status()
                 events = response.json()
 
@@ -101,8 +115,8 @@ class OddsFetcher:
         print(f"No games found within the next {max_lookahead_days} days")
         return []
     
-    def get_event_odds(self, event_id: str, markets: List[str]) -> Dict:
-        
+    def get_event_odds(self, event_id: str, markets: List[str]) -> Optional[Dict]:
+        """The event's odds payload, or None when the request failed."""
         if not self.api_key:
             raise ValueError("API key not set")
         url = f"{self.base_url}/sports/basketball_nba/events/{event_id}/odds"
@@ -115,12 +129,13 @@ class OddsFetcher:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = throttled_get(self.session, url, params=params, timeout=10)
+            self.quota.record(response.headers, 'event_odds', markets)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching odds for event {event_id}: {e}")
-            return {}
+            return None
     
     def parse_event_props(self, event_data: Dict, event_info: Dict, markets: List[str]) -> Dict[str, Dict]:
         
@@ -179,15 +194,12 @@ class OddsFetcher:
         
         return player_props
     
-    def get_all_player_props(self, markets: Optional[List[str]] = None) -> Dict[str, Dict]:
+    def get_all_player_props(self, markets: Optional[List[str]] = None,
+                             max_workers: Optional[int] = None,
+                             use_schedule: bool = True) -> Dict[str, Dict]:
         
         if markets is None:
-            markets = [
-                'player_points',
-                'player_assists',
-                'player_rebounds',
-                'player_threes'
-            ]
+            markets = DEFAULT_MARKETS
         
         # Get today's events only
         events = self.get_nba_events(today_only=True)
@@ -195,50 +207,119 @@ class OddsFetcher:
             print("No events found for today")
             return {}
         
-        all_props = {}
-        
-        # Fetch odds for each event
-        for i, event in enumerate(events, 1):
-            event_id = event.get('id')
-            home_team = event.get('home_team', 'Unknown')
-            away_team = event.get('away_team', 'Unknown')
-            commence_time = event.get('commence_time', '')
-            
-            print(f"\n[{i}/{len(events)}] Fetching props for {away_team} @ {home_team}...")
-            
-            if not event_id:
+        start = time.perf_counter()
+        event_infos = []
+        for event in events:
+            if not event.get('id'):
                 continue
-            
-            event_info = {
-                'event_id': event_id,
-                'home_team': home_team,
-                'away_team': away_team,
-                'commence_time': commence_time
+            event_infos.append({
+                'event_id': event.get('id'),
+                'home_team': event.get('home_team', 'Unknown'),
+                'away_team': event.get('away_team', 'Unknown'),
+                'commence_time': event.get('commence_time', '')
+            })
+
+        markets_key = ','.join(sorted(markets))
+        self._last_events = event_infos
+        upcoming = self._evict_events(event_infos)
+        if use_schedule:
+            last_fetched = {
+                eid: entry['fetched_at'] for (eid, mkey), entry in self._event_cache.items()
+                if mkey == markets_key
             }
-            
-            event_data = self.get_event_odds(event_id, markets)
-            
+            due = self.scheduler.due_events(event_infos, markets, last_fetched)
+        else:
+            due = [e for e in event_infos if e['event_id'] in upcoming]
+
+        def _fetch(event_info):
+            event_data = self.get_event_odds(event_info['event_id'], markets)
+            if event_data is None:
+                return None
             # Parse the props with event context
-            event_props = self.parse_event_props(event_data, event_info, markets)
-            
-            print(f"  Found props for {len(event_props)} players")
-            
-            # Merge into all_props (players should only be in one game)
-            for player_name, player_data in event_props.items():
-                if player_name in all_props:
-                    print(f"  {player_name} appears in multiple games, merging props")
-                    for stat_type, lines in player_data['props'].items():
-                        if stat_type not in all_props[player_name]['props']:
-                            all_props[player_name]['props'][stat_type] = []
-                        all_props[player_name]['props'][stat_type].extend(lines)
-                else:
-                    all_props[player_name] = player_data
-            
-            # Rate limiting: small delay between requests
-            if i < len(events):
-                time.sleep(0.5)
-        
+            return self.parse_event_props(event_data, event_info, markets)
+
+        workers = max(1, min(max_workers or ODDS_CONCURRENCY, len(due) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so the merge below is identical to a serial walk
+            results = list(pool.map(_fetch, due))
+
+        fetched_at = datetime.now(timezone.utc)
+        failed = 0
+        for event_info, event_props in zip(due, results):
+            if event_props is None:
+                # Keep serving the last good props; the event stays due, so the next refresh retries it
+                failed += 1
+                continue
+            self._event_cache[(event_info['event_id'], markets_key)] = {
+                'fetched_at': fetched_at,
+                'props': event_props,
+            }
+
+        all_props = {}
+        for i, event_info in enumerate(event_infos, 1):
+            if event_info['event_id'] not in upcoming:
+                print(f"\n[{i}/{len(event_infos)}] Skipping {event_info['away_team']} @ {event_info['home_team']} (tipped off)")
+                continue
+            entry = self._event_cache.get((event_info['event_id'], markets_key))
+            if entry is None:
+                print(f"\n[{i}/{len(event_infos)}] Skipping {event_info['away_team']} @ {event_info['home_team']} (not priced)")
+                continue
+            event_props = entry['props']
+            print(f"\n[{i}/{len(event_infos)}] Props for {event_info['away_team']} @ {event_info['home_team']}: "
+                  f"{len(event_props)} players")
+            # Cached entries are shared across refreshes, so merge copies of their line lists
+            self._merge_event_props(all_props, {
+                name: {**data, 'props': {stat: list(lines) for stat, lines in data['props'].items()}}
+                for name, data in event_props.items()
+            })
+
+        elapsed = time.perf_counter() - start
+        self.last_fetch_stats = {
+            'events': len(event_infos),
+            'events_fetched': len(due),
+            'events_failed': failed,
+            'workers': workers,
+            'players': len(all_props),
+            'elapsed_seconds': round(elapsed, 3),
+        }
+        print(f"Odds phase: fetched {len(due)}/{len(event_infos)} events ({failed} failed) "
+              f"with {workers} workers in {elapsed:.2f}s")
         return all_props
+
+    def _evict_events(self, event_infos: List[Dict]) -> set:
+        """
+        Drop cached props of events that have tipped off or are no longer listed
+        (earlier slates), and return the ids of the listed events still to come.
+        """
+        now = datetime.now(timezone.utc)
+        upcoming = set()
+        for event_info in event_infos:
+            tip = parse_date(event_info['commence_time'])
+            if tip is None or tip > now:
+                upcoming.add(event_info['event_id'])
+        for key in [key for key in self._event_cache if key[0] not in upcoming]:
+            del self._event_cache[key]
+        return upcoming
+
+    def next_refresh_seconds(self, markets: Optional[List[str]] = None) -> int:
+        """Seconds until the most urgent upcoming event from the last fetch is due again."""
+        return self.scheduler.next_refresh_seconds(self._last_events, markets or DEFAULT_MARKETS)
+
+    def quota_stats(self) -> Dict:
+        return {**self.quota.stats(), 'scheduler': self.scheduler.stats()}
+
+    @staticmethod
+    def _merge_event_props(all_props: Dict[str, Dict], event_props: Dict[str, Dict]):
+        # Merge into all_props (players should only be in one game)
+        for player_name, player_data in event_props.items():
+            if player_name in all_props:
+                print(f"  {player_name} appears in multiple games, merging props")
+                for stat_type, lines in player_data['props'].items():
+                    if stat_type not in all_props[player_name]['props']:
+                        all_props[player_name]['props'][stat_type] = []
+                    all_props[player_name]['props'][stat_type].extend(lines)
+            else:
+                all_props[player_name] = player_data
     
     def get_best_lines(self, player_props: Dict[str, Dict]) -> Dict[str, Dict]:
         
@@ -277,6 +358,14 @@ class MockOddsFetcher:
     Mock odds fetcher for testing without API key
     Returns estimated lines based on 2024-25 season averages
     """
+
+    last_fetch_stats = {}
+
+    def next_refresh_seconds(self, markets: Optional[List[str]] = None) -> int:
+        return MAX_REFRESH_SECONDS
+
+    def quota_stats(self) -> Optional[Dict]:
+        return None
     
     def get_all_player_props(self) -> Dict[str, Dict]:
         """Returns mock data in the same format as real API with event context"""
@@ -412,6 +501,32 @@ def convert_to_simple_format(player_props: Dict[str, Dict]) -> Dict[str, Dict[st
     return simple_props
 
 
+
+def convert_to_ladder_format(player_props: Dict[str, Dict]) -> Dict[str, Dict[str, List[Dict]]]:
+    """Every distinct bookmaker offer per prop, instead of convert_to_simple_format's single
+    consensus line: {player: {stat_type: [{'line', 'side', 'price', 'bookmaker'}, ...]}}."""
+
+    ladders = {}
+
+    for player_name, player_data in player_props.items():
+        ladders[player_name] = {}
+
+        for stat_type, lines in player_data.get('props', {}).items():
+            seen = set()
+            offers = []
+            for l in lines:
+                if l['name'] not in ('Over', 'Under') or l['price'] is None:
+                    continue
+                key = (l['line'], l['name'], l['price'], l['bookmaker'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                offers.append({'line': l['line'], 'side': l['name'], 'price': l['price'], 'bookmaker': l['bookmaker']})
+            if offers:
+                ladders[player_name][stat_type] = offers
+
+    return ladders
+
 if __name__ == "__main__":    
     fetcher = get_odds_fetcher(use_real_api=True)
     props = fetcher.get_all_player_props()
@@ -0,0 +1,186 @@
+"""
+Odds API quota accounting and quota-aware refresh scheduling
+The Odds API reports usage on every response (x-requests-remaining / -used / -last).
+QuotaTracker records those per call and per market set; RefreshScheduler uses them
+to decide which events are worth re-pricing now, refreshing more often close to
+tip-off and never spending on games that have already started.
+"""
+
+import os
+import threading
+from calendar import monthrange
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from src.records import parse_date
+
+# (hours before tip-off, refresh interval in seconds); lines move most near tip
+REFRESH_TIERS = [(1, 900), (3, 1800), (6, 3600), (12, 10800)]
+MIN_REFRESH_SECONDS = 900
+MAX_REFRESH_SECONDS = 21600
+
+# Fixed daily budget in credits; unset = spread what's left evenly over the rest of the month
+DAILY_BUDGET = os.getenv('ODDS_DAILY_BUDGET')
+
+
+def _header_int(headers, name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class QuotaTracker:
+
+    def __init__(self, daily_budget: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.daily_budget = daily_budget if daily_budget is not None else (
+            int(DAILY_BUDGET) if DAILY_BUDGET else None
+        )
+        self.remaining = None
+        self.used = None
+        self.calls = 0
+        self.spent_today = 0
+        self._day = None
+        self.cost_by_kind = {}      # 'events' / 'event_odds' -> total credits
+        self.cost_by_markets = {}   # 'player_assists,player_points' -> {'calls', 'credits'}
+
+    def record(self, headers, kind: str, markets: Optional[Iterable[str]] = None):
+        """Record one Odds API response's usage headers."""
+        remaining = _header_int(headers, 'x-requests-remaining')
+        used = _header_int(headers, 'x-requests-used')
+        cost = _header_int(headers, 'x-requests-last')
+        with self._lock:
+            today = datetime.now(timezone.utc).date()
+            if self._day != today:
+                self._day, self.spent_today = today, 0
+            if cost is None and used is not None and self.used is not None:
+                cost = max(0, used - self.used)
+            cost = cost or 0
+            if remaining is not None:
+                self.remaining = remaining
+            if used is not None:
+                self.used = used
+            self.calls += 1
+            self.spent_today += cost
+            self.cost_by_kind[kind] = self.cost_by_kind.get(kind, 0) + cost
+            if markets is not None:
+                key = ','.join(sorted(markets))
+                entry = self.cost_by_markets.setdefault(key, {'calls': 0, 'credits': 0})
+                entry['calls'] += 1
+                entry['credits'] += cost
+
+    def estimated_cost(self, markets: Iterable[str]) -> float:
+        """Average observed credits for one event-odds call with this market set.
+        Before any observation, fall back to the API's pricing of 1 credit per market per region."""
+        markets = list(markets)
+        with self._lock:
+            entry = self.cost_by_markets.get(','.join(sorted(markets)))
+        if entry and entry['calls']:
+            return entry['credits'] / entry['calls']
+        return float(len(markets))
+
+    def budget_left_today(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Credits the scheduler may still spend today, or None if quota is unknown."""
+        with self._lock:
+            if self.daily_budget is not None:
+                return max(0.0, self.daily_budget - self.spent_today)
+            if self.remaining is None:
+                return None
+            now = now or datetime.now(timezone.utc)
+            days_left = monthrange(now.year, now.month)[1] - now.day + 1
+            # Today's share of what's left, counting today's spend back in so the share is stable
+            return max(0.0, (self.remaining + self.spent_today) / days_left - self.spent_today)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'remaining': self.remaining,
+                'used': self.used,
+                'calls': self.calls,
+                'spent_today': self.spent_today,
+                'daily_budget': self.daily_budget,
+                'cost_by_kind': dict(self.cost_by_kind),
+                'cost_by_markets': {k: dict(v) for k, v in self.cost_by_markets.items()},
+            }
+
+
+class RefreshScheduler:
+
+    def __init__(self, tracker: QuotaTracker):
+        self.tracker = tracker
+        self.pressure = 1.0
+
+    @staticmethod
+    def base_interval(hours_to_tip: float) -> int:
+        for hours, interval in REFRESH_TIERS:
+            if hours_to_tip <= hours:
+                return interval
+        return MAX_REFRESH_SECONDS
+
+    def intervals(self, events: List[Dict], markets: List[str],
+                  now: Optional[datetime] = None) -> Dict[str, Optional[float]]:
+        """
+        Refresh interval in seconds per event id (None = tipped off or budget spent).
+        If refreshing every upcoming event at its base interval until tip-off would
+        overspend today's budget, all intervals are stretched by the same factor.
+        """
+        now = now or datetime.now(timezone.utc)
+        cost = self.tracker.estimated_cost(markets)
+        base, projected = {}, 0.0
+        for ev in events:
+            tip = parse_date(ev.get('commence_time'))
+            if tip is None:
+                base[ev['event_id']] = MAX_REFRESH_SECONDS
+                continue
+            hours_to_tip = (tip - now).total_seconds() / 3600
+            if hours_to_tip <= 0:
+                base[ev['event_id']] = None
+                continue
+            interval = self.base_interval(hours_to_tip)
+            base[ev['event_id']] = interval
+            projected += cost * max(1.0, hours_to_tip * 3600 / interval)
+
+        budget = self.tracker.budget_left_today(now)
+        if budget is None or projected <= 0:
+            self.pressure = 1.0
+        elif budget <= 0:
+            self.pressure = float('inf')
+        else:
+            self.pressure = max(1.0, projected / budget)
+
+        return {
+            eid: None if interval is None or self.pressure == float('inf')
+            else min(MAX_REFRESH_SECONDS, interval * self.pressure)
+            for eid, interval in base.items()
+        }
+
+    def due_events(self, events: List[Dict], markets: List[str], last_fetched: Dict[str, datetime],
+                   now: Optional[datetime] = None) -> List[Dict]:
+        """Events whose odds should be re-fetched now."""
+        now = now or datetime.now(timezone.utc)
+        intervals = self.intervals(events, markets, now)
+        due = []
+        for ev in events:
+            interval = intervals.get(ev['event_id'])
+            if interval is None:
+                continue
+            fetched = last_fetched.get(ev['event_id'])
+            if fetched is None or (now - fetched).total_seconds() >= interval:
+                due.append(ev)
+        return due
+
+    def next_refresh_seconds(self, events: List[Dict], markets: List[str],
+                             now: Optional[datetime] = None) -> int:
+        """How long the picks built from these events stay fresh."""
+        live = [i for i in self.intervals(events, markets, now).values() if i is not None]
+        if not live:
+            return MAX_REFRESH_SECONDS
+        return int(max(MIN_REFRESH_SECONDS, min(MAX_REFRESH_SECONDS, min(live))))
+
+    def stats(self) -> Dict:
+        return {
+            'budget_left_today': self.tracker.budget_left_today(),
+            'pressure': None if self.pressure == float('inf') else round(self.pressure, 2),
+            'paused': self.pressure == float('inf'),
+        }
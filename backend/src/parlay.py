@@ -0,0 +1,216 @@
+"""
+Same-game parlay builder
+Combines the day's predictions into 2-4 leg parlays within one event and returns
+the top-k by expected value.
+
+Legs in the same game aren't independent (a big scoring night lifts points and
+assists together; two teammates share shots), so the joint hit probability is
+the product of the legs' model probabilities corrected by how often the legs
+historically hit together. For each pair of candidates that lift is
+P(all hit) / product of P(each hits), measured over the games in the cached logs
+where every leg's player played, shrunk toward 1 when there are few such games.
+
+The search is depth-first branch and bound. Candidates are ordered by their best
+possible contribution, and a branch is cut once even the best remaining legs
+couldn't lift its EV above the current k-th best parlay. It stops at the time
+budget and returns the best parlays found so far.
+"""
+
+import heapq
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Lifts are kept within [1 / MAX_LIFT, MAX_LIFT]; this is also what makes the EV bound valid
+MAX_LIFT = 1.5
+
+# Pseudo-games of "no correlation" the observed lift is shrunk with
+LIFT_PRIOR_GAMES = 10
+
+# Fewer common games than this and the legs are treated as independent
+MIN_COMMON_GAMES = 5
+
+
+def _decimal(payout: float) -> float:
+    return 1.0 + payout
+
+
+def _american(decimal: float) -> int:
+    if decimal >= 2.0:
+        return int(round((decimal - 1.0) * 100))
+    return int(round(-100.0 / (decimal - 1.0)))
+
+
+class _Leg:
+    __slots__ = ('pred', 'p', 'decimal', 'gain', 'played', 'hits')
+
+    def __init__(self, pred: Dict, played: int, hits: int):
+        self.pred = pred
+        self.p = pred['confidence'] / 100.0
+        self.decimal = _decimal(pred['payout'])
+        # Most a leg can multiply a parlay's expected return by
+        self.gain = min(1.0, self.p * MAX_LIFT) * self.decimal
+        self.played = played
+        self.hits = hits
+
+
+def _bitsets(pred: Dict, game_logs: Optional['GameLog | DataFrame'], game_index: Dict[str, int]) -> tuple:
+    """(played, hit) bitsets over the event's history, bit i = game_index'th game."""
+    if game_logs is None or not len(game_logs) or pred['stat_type'] not in game_logs:
+        return 0, 0
+    played = hits = 0
+    over = pred['pick'] == 'OVER'
+    for game_id, value in zip(map(str, game_logs['GAME_ID']), game_logs[pred['stat_type']]):
+        bit = 1 << game_index.setdefault(game_id, len(game_index))
+        played |= bit
+        if (value > pred['line']) if over else (value < pred['line']):
+            hits |= bit
+    return played, hits
+
+
+def conditional_lift(played: int, hits: int, leg: _Leg) -> float:
+    """
+    Shrunk lift of adding `leg` to legs that all hit in `hits` (and all played in
+    `played`): P(all hit) / (P(rest hit) * P(leg hits)) over their common games.
+    """
+    common = played & leg.played
+    n = common.bit_count()
+    if n < MIN_COMMON_GAMES:
+        return 1.0
+    rest = (hits & common).bit_count()
+    alone = (leg.hits & common).bit_count()
+    both = (hits & leg.hits & common).bit_count()
+    if not rest or not alone:
+        return 1.0
+    observed = n * both / (rest * alone)
+    lift = 1.0 + (observed - 1.0) * n / (n + LIFT_PRIOR_GAMES)
+    return min(MAX_LIFT, max(1.0 / MAX_LIFT, lift))
+
+
+def build_parlays(predictions: List[Dict], game_logs: Dict[str, 'GameLog | DataFrame'], top_k: int = 10,
+                  min_legs: int = 2, max_legs: int = 4, budget: float = 2.0, min_leg_confidence: float = 0.0,
+                  event_id: Optional[str] = None) -> tuple:
+    """
+    Top-k same-game parlays by EV from `predictions` (generate_all_picks output) and
+    each player's cached game logs. Returns (parlays, stats); stats['complete'] is
+    False when the time budget ran out before the search finished. Raises ValueError
+    unless top_k >= 1 and 1 <= min_legs <= max_legs.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    if not 1 <= min_legs <= max_legs:
+        raise ValueError(f"need 1 <= min_legs <= max_legs, got min_legs={min_legs}, max_legs={max_legs}")
+
+    started = time.perf_counter()
+    deadline = started + budget
+    stats = {'events': 0, 'candidates': 0, 'nodes': 0, 'pruned': 0, 'complete': True}
+
+    by_event = defaultdict(list)
+    for p in predictions:
+        if (p.get('payout') is None or p.get('pick') not in ('OVER', 'UNDER')
+                or p.get('event_id') in (None, 'N/A') or p.get('confidence', 0) < min_leg_confidence):
+            continue
+        if event_id is not None and str(p['event_id']) != str(event_id):
+            continue
+        by_event[p['event_id']].append(p)
+
+    events = []
+    for eid, preds in by_event.items():
+        game_index = {}
+        legs = []
+        seen = set()
+        for p in preds:
+            key = (p['player_name'], p['stat_type'])
+            if key in seen:
+                continue
+            seen.add(key)
+            legs.append(_Leg(p, *_bitsets(p, game_logs.get(p['player_name']), game_index)))
+        if len(legs) < min_legs:
+            continue
+        # Best contributions first: good parlays are found early and the bound prunes more
+        legs.sort(key=lambda leg: -leg.gain)
+        events.append((eid, legs))
+        stats['candidates'] += len(legs)
+    # Most promising events first: the best a smallest parlay there could return
+    events.sort(key=lambda e: -math.prod(leg.gain for leg in e[1][:min_legs]))
+    stats['events'] = len(events)
+
+    best = []   # min-heap of (ev, tiebreak, parlay)
+    counter = 0
+
+    def floor():
+        return best[0][0] if len(best) >= top_k else float('-inf')
+
+    def bound(ret: float, start: int, legs: List[_Leg], slots: int) -> float:
+        # Remaining legs are sorted by gain, so the best extension uses the next ones that help
+        for leg in legs[start:start + slots]:
+            if leg.gain <= 1.0:
+                break
+            ret *= leg.gain
+        return ret - 1.0
+
+    for eid, legs in events:
+        # stack entries: (next index, chosen, joint p, decimal odds, played, hits)
+        stack = [(i + 1, [i], leg.p, leg.decimal, leg.played, leg.hits) for i, leg in reversed(list(enumerate(legs)))]
+        while stack:
+            stats['nodes'] += 1
+            if stats['nodes'] % 256 == 0 and time.perf_counter() > deadline:
+                stats['complete'] = False
+                break
+            start, chosen, p, decimal, played, hits = stack.pop()
+
+            if len(chosen) >= min_legs:
+                ev = p * decimal - 1.0
+                if ev > floor():
+                    counter += 1
+                    entry = (ev, counter, (eid, list(chosen), p, decimal))
+                    if len(best) < top_k:
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heapreplace(best, entry)
+
+            slots = max_legs - len(chosen)
+            if not slots or start >= len(legs):
+                continue
+            if bound(p * decimal, start, legs, slots) <= floor():
+                stats['pruned'] += 1
+                continue
+
+            children = []
+            for j in range(start, len(legs)):
+                leg = legs[j]
+                if bound(p * decimal, j, legs, slots) <= floor():
+                    # later legs have smaller gains, so none of them can do better
+                    stats['pruned'] += 1
+                    break
+                q = min(1.0, leg.p * conditional_lift(played, hits, leg))
+                children.append((j + 1, chosen + [j], p * q, decimal * leg.decimal,
+                                 played & leg.played, hits & leg.hits))
+            stack.extend(reversed(children))
+        if not stats['complete']:
+            break
+
+    event_legs = dict(events)
+    parlays = []
+    for ev, _, (eid, chosen, p, decimal) in sorted(best, reverse=True):
+        legs = [event_legs[eid][i] for i in chosen]
+        independent = 1.0
+        for leg in legs:
+            independent *= leg.p
+        first = legs[0].pred
+        parlays.append({
+            'event_id': eid,
+            'home_team': first.get('home_team'),
+            'away_team': first.get('away_team'),
+            'commence_time': first.get('commence_time'),
+            'legs': [{k: leg.pred.get(k) for k in ('player_name', 'stat_type', 'pick', 'line', 'price', 'confidence')}
+                     for leg in legs],
+            'probability': round(p, 4),
+            'independent_probability': round(independent, 4),
+            'decimal_odds': round(decimal, 3),
+            'american_odds': _american(decimal),
+            'ev': round(ev, 4),
+        })
+    stats['elapsed'] = round(time.perf_counter() - started, 3)
+    return parlays, stats
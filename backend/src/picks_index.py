@@ -0,0 +1,79 @@
+"""
+Query indexes over the picks cache
+Built once per picks rebuild so the read endpoints don't rescan every prediction:
+EV-sorted lists per (stat_type, pick), per stat_type, per pick and per event, and
+a normalized-name lookup for player pages. top() returns exactly what filtering
+the full list and calling NBAAnalyzer.rank_picks would.
+"""
+
+import heapq
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, List, Optional
+
+from src.names import normalize_name
+
+
+def _by_ev(entries: List[tuple]) -> List[tuple]:
+    # (-ev, position, prediction): best EV first, ties in original order like rank_picks' stable sort
+    return sorted(entries, key=lambda e: (e[0], e[1]))
+
+
+class PicksIndex:
+
+    def __init__(self, predictions: List[Dict]):
+        self.predictions = predictions
+        ranked = [(-p['ev'], i, p) for i, p in enumerate(predictions) if p.get('ev') is not None]
+
+        leaves = defaultdict(list)
+        by_event = defaultdict(list)
+        self.by_player = defaultdict(list)
+        for p in predictions:
+            self.by_player[normalize_name(p['player_name'])].append(p)
+        for entry in ranked:
+            p = entry[2]
+            leaves[(p['stat_type'], p['pick'])].append(entry)
+            by_event[p.get('event_id')].append(entry)
+
+        self.by_stat_pick = {key: _by_ev(entries) for key, entries in leaves.items()}
+        by_stat, by_pick = defaultdict(list), defaultdict(list)
+        for (stat_type, pick), entries in self.by_stat_pick.items():
+            by_stat[stat_type].append(entries)
+            by_pick[pick].append(entries)
+        # single-dimension lists are merged from the already sorted leaves
+        self.by_stat = {k: list(heapq.merge(*lists)) for k, lists in by_stat.items()}
+        self.by_pick = {k: list(heapq.merge(*lists)) for k, lists in by_pick.items()}
+        self.by_event = {k: _by_ev(entries) for k, entries in by_event.items()}
+        self.all = list(heapq.merge(*self.by_stat_pick.values()))
+
+    def _candidates(self, stat_type: Optional[str], pick: Optional[str]) -> List[tuple]:
+        if stat_type and pick:
+            return self.by_stat_pick.get((stat_type, pick), [])
+        if stat_type:
+            return self.by_stat.get(stat_type, [])
+        if pick:
+            return self.by_pick.get(pick, [])
+        return self.all
+
+    def top(self, stat_type: Optional[str] = None, pick: Optional[str] = None, min_ev: float = 0.0,
+            min_confidence: float = 0.0, top_n: int = 5) -> List[Dict]:
+        """Best `top_n` by EV, stopping at the first pick below `min_ev`."""
+        if top_n < 0:
+            # rank_picks slices, so a negative limit means "all but the last n"
+            return self.top(stat_type, pick, min_ev, min_confidence, len(self.predictions))[:top_n]
+
+        def eligible():
+            for neg_ev, _, p in self._candidates(stat_type, pick):
+                if -neg_ev < min_ev:
+                    return
+                if p.get('confidence', 0) >= min_confidence:
+                    yield p
+        return list(islice(eligible(), top_n))
+
+    def player(self, player_name: str) -> List[Dict]:
+        """All of a player's predictions, in cache order."""
+        return self.by_player.get(normalize_name(player_name), [])
+
+    def event(self, event_id) -> List[Dict]:
+        """An event's predictions with an EV, best first."""
+        return [p for _, _, p in self.by_event.get(event_id, [])]
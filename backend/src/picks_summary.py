@@ -0,0 +1,104 @@
+"""
+Aggregates behind /api/stats/summary
+Computed in one pass when the picks cache is rebuilt, so the endpoint just reads
+them. Every dimension in SUMMARY_DIMENSIONS gets the same rollup (count, average
+confidence and EV, confidence buckets, EV histogram); adding a dimension is one
+entry here and needs nothing at request time.
+"""
+
+from bisect import bisect_right
+from typing import Dict, List
+
+# name -> (key function, fields copied from the group's first prediction)
+SUMMARY_DIMENSIONS = {
+    'stat_type': (lambda p: p['stat_type'], ()),
+    'pick': (lambda p: p['pick'], ()),
+    'event': (lambda p: p.get('event_id', 'N/A'), ('home_team', 'away_team', 'commence_time')),
+    'team': (lambda p: p.get('team') or 'N/A', ()),
+}
+
+HIGH_CONFIDENCE = 75
+MEDIUM_CONFIDENCE = 65
+
+# EV histogram bin edges; values at an edge fall in the bin above it
+EV_EDGES = [-0.2, -0.1, -0.05, 0.0, 0.05, 0.1, 0.2, 0.3]
+EV_LABELS = (
+    [f"< {EV_EDGES[0]:+.2f}"]
+    + [f"{lo:+.2f} to {hi:+.2f}" for lo, hi in zip(EV_EDGES, EV_EDGES[1:])]
+    + [f">= {EV_EDGES[-1]:+.2f}"]
+)
+
+
+class _Rollup:
+    __slots__ = ('count', 'confidence', 'high', 'medium', 'ev_count', 'ev', 'positive_ev', 'best_ev', 'histogram', 'meta')
+
+    def __init__(self, meta: Dict = None):
+        self.count = 0
+        self.confidence = 0.0
+        self.high = self.medium = 0
+        self.ev_count = self.positive_ev = 0
+        self.ev = 0.0
+        self.best_ev = None
+        self.histogram = [0] * len(EV_LABELS)
+        self.meta = meta or {}
+
+    def add(self, p: Dict):
+        confidence = p['confidence']
+        self.count += 1
+        self.confidence += confidence
+        if confidence >= HIGH_CONFIDENCE:
+            self.high += 1
+        elif confidence >= MEDIUM_CONFIDENCE:
+            self.medium += 1
+        ev = p.get('ev')
+        if ev is not None:
+            self.ev_count += 1
+            self.ev += ev
+            self.positive_ev += ev > 0
+            self.best_ev = ev if self.best_ev is None else max(self.best_ev, ev)
+            self.histogram[bisect_right(EV_EDGES, ev)] += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.meta,
+            'count': self.count,
+            'average_confidence': round(self.confidence / self.count, 1) if self.count else 0,
+            'high_confidence_picks': self.high,
+            'medium_confidence_picks': self.medium,
+            'with_ev': self.ev_count,
+            'positive_ev_picks': self.positive_ev,
+            'average_ev': round(self.ev / self.ev_count, 4) if self.ev_count else None,
+            'best_ev': self.best_ev,
+            'ev_histogram': dict(zip(EV_LABELS, self.histogram)),
+        }
+
+
+def summarize(predictions: List[Dict], players_analyzed: int = 0) -> Dict:
+    """The summary payload for /api/stats/summary, in a single pass over `predictions`."""
+    overall = _Rollup()
+    groups = {name: {} for name in SUMMARY_DIMENSIONS}
+    for p in predictions:
+        overall.add(p)
+        for name, (key_fn, meta_fields) in SUMMARY_DIMENSIONS.items():
+            key = key_fn(p)
+            rollup = groups[name].get(key)
+            if rollup is None:
+                rollup = groups[name][key] = _Rollup({f: p.get(f, 'N/A') for f in meta_fields})
+            rollup.add(p)
+
+    total = overall.to_dict()
+    summary = {
+        'total_picks': total['count'],
+        'players_analyzed': players_analyzed,
+        'average_confidence': total['average_confidence'],
+        'high_confidence_picks': total['high_confidence_picks'],
+        'medium_confidence_picks': total['medium_confidence_picks'],
+        'stat_breakdown': {k: r.count for k, r in groups['stat_type'].items()},
+        'pick_breakdown': {k: r.count for k, r in groups['pick'].items()},
+        'positive_ev_picks': total['positive_ev_picks'],
+        'average_ev': total['average_ev'],
+        'ev_histogram': total['ev_histogram'],
+    }
+    for name, rollups in groups.items():
+        summary[f'by_{name}'] = {str(k): r.to_dict() for k, r in rollups.items()}
+    return summary
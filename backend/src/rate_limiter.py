@@ -0,0 +1,152 @@
+"""
+Adaptive per-host token-bucket rate limiter
+Shared by NBAFetcher and OddsFetcher in place of fixed sleeps between calls.
+Each upstream host gets its own bucket: the refill rate ramps up additively while
+calls succeed and halves on 429/5xx, so throughput follows what the host allows.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# (start rate, min rate, max rate) in requests/second, plus burst size
+HOST_LIMITS = {
+    'site.api.espn.com': (10.0, 1.0, 40.0, 10),
+    'site.web.api.espn.com': (10.0, 1.0, 40.0, 16),
+    'api.the-odds-api.com': (4.0, 0.5, 10.0, 4),
+}
+DEFAULT_LIMITS = (10.0, 1.0, 40.0, 10)
+
+# Retry-After is honoured but capped so a bad header cannot stall a refresh
+MAX_RETRY_AFTER = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation."""
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, burst: int,
+                 increase: float = 0.5, decrease: float = 0.5, cooldown: float = 1.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        # Concurrent requests that all hit the same 429 burst count as one congestion
+        # event, so the rate is cut at most once per cooldown window
+        self.cooldown = cooldown
+        self._last_decrease = float('-inf')
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the seconds spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Take the token now (possibly going into debt) and sleep off the debt outside the lock
+            self._tokens -= 1.0
+            wait = max(0.0, -self._tokens / self.rate)
+            wait = max(wait, self._blocked_until - now)
+            self.requests += 1
+            self.waited_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self._blocked_until = max(
+                    self._blocked_until, now + min(retry_after, MAX_RETRY_AFTER)
+                )
+
+    def stats(self) -> Dict:
+        return {
+            'rate_per_second': round(self.rate, 2),
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'waited_seconds': round(self.waited_seconds, 2),
+        }
+
+
+class HostRateLimiter:
+    """Registry of one TokenBucket per upstream host."""
+
+    def __init__(self, limits: Optional[Dict] = None):
+        self.limits = limits if limits is not None else HOST_LIMITS
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname or ''
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, min_rate, max_rate, burst = self.limits.get(host, DEFAULT_LIMITS)
+                bucket = TokenBucket(rate, min_rate, max_rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {host: bucket.stats() for host, bucket in self._buckets.items()}
+
+
+_shared_limiter = HostRateLimiter()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    return _shared_limiter
+
+
+def _retry_after(resp) -> Optional[float]:
+    value = resp.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _is_throttle(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def throttled_get(session, url: str, retries: int = 2, limiter: Optional[HostRateLimiter] = None, **kwargs):
+    """
+    GET through the host's token bucket. 429/5xx responses shrink the bucket's rate
+    and are retried up to `retries` times; the last response is returned as-is so
+    callers keep their own raise_for_status handling.
+    """
+    bucket = (limiter or _shared_limiter).bucket_for(url)
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            resp = session.get(url, **kwargs)
+        except Exception:
+            # Timeouts and resets are the upstream struggling too
+            bucket.on_throttle()
+            raise
+        if _is_throttle(resp.status_code):
+            bucket.on_throttle(_retry_after(resp))
+            if attempt < retries:
+                continue
+        else:
+            bucket.on_success()
+        return resp
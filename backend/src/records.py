@@ -0,0 +1,164 @@
+"""
+Pandas-free game logs and schedules
+A GameLog is one player's games, most recent first, stored column by column in
+__slots__: ids, dates and matchups as lists and each stat as an array('d') of
+float64. It answers the part of the DataFrame interface the picks pipeline uses
+(len(), `column in logs`, logs[column] and .columns), so NBAAnalyzer, the parlay
+builder and app.py take either. NBAFetcher(log_format='records') and
+GameLogStore.load_records() return GameLogs; to_frame() / GameLog.from_frame()
+convert to and from pandas when a caller wants a DataFrame.
+
+Schedules are plain row dicts in records mode: the DataFrame was only ever built
+to be turned back into them.
+"""
+
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Same columns, in the same order, as the game-log frames
+COLUMNS = ('GAME_ID', 'GAME_DATE', 'MATCHUP', 'MIN', 'PTS', 'REB', 'AST', 'BLK', 'STL', 'FG3M')
+STAT_COLUMNS = COLUMNS[3:]
+
+
+def parse_date(value) -> Optional[datetime]:
+    """
+    UTC datetime for an ISO 8601 string, datetime or pandas Timestamp (naive
+    values are taken as UTC); None for anything that doesn't parse, like
+    pd.to_datetime(errors='coerce').
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    elif hasattr(value, 'to_pydatetime'):
+        if value != value:   # NaT
+            return None
+        value = value.to_pydatetime()
+    elif not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class GameLog:
+    __slots__ = ('game_ids', 'game_dates', 'matchups', 'stats')
+
+    columns = COLUMNS
+
+    def __init__(self, game_ids: List[str], game_dates: List[datetime], matchups: List[str],
+                 stats: Dict[str, array]):
+        self.game_ids = game_ids
+        self.game_dates = game_dates
+        self.matchups = matchups
+        # column -> array('d'), one value per game
+        self.stats = stats
+
+    @classmethod
+    def empty(cls) -> 'GameLog':
+        return cls([], [], [], {c: array('d') for c in STAT_COLUMNS})
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], num_games: Optional[int] = None) -> 'GameLog':
+        """
+        From per-game row dicts with COLUMNS keys: first row per GAME_ID kept, rows
+        with unparseable dates dropped, most recent first, cut to `num_games`.
+        """
+        seen, kept = set(), []
+        for row in rows:
+            if row['GAME_ID'] in seen:
+                continue
+            seen.add(row['GAME_ID'])
+            date = parse_date(row['GAME_DATE'])
+            if date is not None:
+                kept.append((date, row))
+        kept.sort(key=lambda r: r[0], reverse=True)
+        kept = kept[:num_games] if num_games is not None else kept
+        return cls(
+            [r['GAME_ID'] for _, r in kept],
+            [d for d, _ in kept],
+            [r['MATCHUP'] for _, r in kept],
+            {c: array('d', [r[c] for _, r in kept]) for c in STAT_COLUMNS},
+        )
+
+    @classmethod
+    def from_frame(cls, df) -> 'GameLog':
+        if df is None or not len(df):
+            return cls.empty()
+        return cls(
+            [str(g) for g in df['GAME_ID']],
+            [parse_date(d) for d in df['GAME_DATE']],
+            list(df['MATCHUP']),
+            {c: array('d', df[c].to_numpy(dtype=float)) for c in STAT_COLUMNS},
+        )
+
+    def to_frame(self):
+        """The same logs as a DataFrame (the shape NBAFetcher(log_format='frame') returns)."""
+        import numpy as np
+        import pandas as pd
+        if not self.game_ids:
+            return pd.DataFrame()
+        frame = {
+            'GAME_ID': self.game_ids,
+            'GAME_DATE': pd.to_datetime(self.game_dates, utc=True),
+            'MATCHUP': self.matchups,
+        }
+        for c in STAT_COLUMNS:
+            frame[c] = np.array(self.stats[c], dtype=float)
+        return pd.DataFrame(frame)
+
+    def to_json(self) -> Dict:
+        return {
+            'game_ids': self.game_ids,
+            'game_dates': [d.isoformat() for d in self.game_dates],
+            'matchups': self.matchups,
+            'stats': {c: list(v) for c, v in self.stats.items()},
+        }
+
+    @classmethod
+    def from_json(cls, payload: Dict) -> 'GameLog':
+        return cls(
+            payload['game_ids'],
+            [datetime.fromisoformat(d) for d in payload['game_dates']],
+            payload['matchups'],
+            {c: array('d', v) for c, v in payload['stats'].items()},
+        )
+
+    def head(self, n: int) -> 'GameLog':
+        return GameLog(self.game_ids[:n], self.game_dates[:n], self.matchups[:n],
+                       {c: v[:n] for c, v in self.stats.items()})
+
+    def itertuples(self) -> Iterator[tuple]:
+        """One (GAME_ID, GAME_DATE, MATCHUP, MIN, ..., FG3M) tuple per game."""
+        return zip(self.game_ids, self.game_dates, self.matchups, *(self.stats[c] for c in STAT_COLUMNS))
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+    def __contains__(self, column) -> bool:
+        return column in COLUMNS
+
+    def __getitem__(self, column):
+        if column == 'GAME_ID':
+            return self.game_ids
+        if column == 'GAME_DATE':
+            return self.game_dates
+        if column == 'MATCHUP':
+            return self.matchups
+        return self.stats[column]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameLog):
+            return NotImplemented
+        return (self.game_ids == other.game_ids and self.game_dates == other.game_dates
+                and self.matchups == other.matchups and self.stats == other.stats)
+
+    def __repr__(self) -> str:
+        return f"GameLog({len(self)} games)"
+
+
+def as_rows(table) -> List[Dict]:
+    """Row dicts of a DataFrame, or `table` itself when it already is a list of them."""
+    return table if isinstance(table, list) else table.to_dict('records')
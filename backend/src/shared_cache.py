@@ -0,0 +1,357 @@
+"""
+Shared cache backends for the picks, games and players caches
+Every entry is published whole under a key with a version that goes up on each
+publish, so readers either see the previous entry or the new one, never a mix,
+and can cheaply ask "is there anything newer than the version I hold?".
+
+  memory  one process (the default; values are kept by reference, no copies)
+  sqlite  every process on the host, or every host sharing the file (WAL mode)
+  kv      any HTTP key-value / object store with ETag conditional requests:
+          GET answers 304 to a matching If-None-Match, PUT honours If-Match and
+          If-None-Match: * and answers 412 on a mismatch. standin_server.py
+          serves this protocol under /kv/ for local runs and tests.
+
+With a shared backend one instance can build and publish picks while every other
+instance only reads them. Values are JSON (DataFrames and GameLogs included, see encode()),
+compressed with zlib; keys are namespaced by SCHEMA_VERSION so a deploy that
+changes the payload layout never reads entries written by the old one.
+
+pandas, numpy and requests are only imported once something needs them, so a
+reader serving cached picks never loads the analytics stack.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.records import GameLog
+
+# Bump when the layout of a published value changes
+SCHEMA_VERSION = 3
+
+DEFAULT_SQLITE_PATH = os.getenv(
+    'CACHE_SQLITE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'shared_cache.sqlite'),
+)
+
+# Compare-and-swap attempts before a KV publish gives up to a concurrent publisher
+KV_PUBLISH_ATTEMPTS = 5
+
+
+class CacheEntry:
+    __slots__ = ('key', 'version', 'published_at', 'ttl', 'value')
+
+    def __init__(self, key: str, version: int, published_at: float, ttl: float, value: Any):
+        self.key = key
+        self.version = version
+        self.published_at = published_at
+        self.ttl = ttl
+        self.value = value
+
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.published_at)
+
+    def age(self) -> float:
+        return time.time() - self.published_at
+
+
+class CacheConflict(Exception):
+    """A KV publish kept losing the compare-and-swap to other publishers."""
+
+
+class LazyFrame:
+    """
+    A DataFrame as decoded from the cache: kept as its JSON payload until frame()
+    is first called, so decoding picks doesn't import pandas for the game logs.
+    """
+    __slots__ = ('payload', '_frame')
+
+    def __init__(self, payload: Dict):
+        self.payload = payload
+        self._frame = None
+
+    def frame(self):
+        if self._frame is None:
+            import pandas as pd
+            df = pd.DataFrame(self.payload['data'], columns=self.payload['columns'])
+            for c in self.payload['dates']:
+                df[c] = pd.to_datetime(df[c])
+            self._frame = df
+        return self._frame
+
+
+def materialize(frames: Optional[Dict]) -> Optional[Dict]:
+    """`frames` (e.g. game logs by player) with every LazyFrame turned into its DataFrame."""
+    if frames is None:
+        return None
+    return {k: v.frame() if isinstance(v, LazyFrame) else v for k, v in frames.items()}
+
+
+def _json_default(obj):
+    if isinstance(obj, LazyFrame):
+        return {'__frame__': obj.payload}
+    if isinstance(obj, GameLog):
+        return {'__gamelog__': obj.to_json()}
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    # Anything else json can't encode is a pandas / numpy value, so both are loaded already
+    import numpy as np
+    import pandas as pd
+    if isinstance(obj, pd.DataFrame):
+        dates = [c for c in obj.columns if pd.api.types.is_datetime64_any_dtype(obj[c])]
+        frame = obj.copy()
+        for c in dates:
+            frame[c] = frame[c].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        return {'__frame__': {'columns': list(frame.columns), 'data': frame.values.tolist(), 'dates': dates}}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _json_object(obj):
+    if len(obj) == 1:
+        if '__frame__' in obj:
+            return LazyFrame(obj['__frame__'])
+        if '__gamelog__' in obj:
+            return GameLog.from_json(obj['__gamelog__'])
+    return obj
+
+
+def encode(value: Any) -> bytes:
+    """zlib-compressed JSON; DataFrames round-trip (as LazyFrame) with their datetime columns, GameLogs as GameLogs."""
+    return zlib.compress(json.dumps(value, default=_json_default, separators=(',', ':')).encode(), 6)
+
+
+def decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob), object_hook=_json_object)
+
+
+class _Backend(ABC):
+    name = 'base'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.hits = 0
+        self.not_modified = 0
+        self.publishes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"v{SCHEMA_VERSION}/{key}"
+
+    def _count(self, **counts):
+        with self._lock:
+            for k, v in counts.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    @abstractmethod
+    def get(self, key: str, since: Optional[int] = None) -> Optional[CacheEntry]:
+        """The entry under `key`, or None when there is none or it is still version `since`."""
+
+    @abstractmethod
+    def publish(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        """Atomically replace the entry under `key`; returns it with its new version."""
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': self.name,
+                'reads': self.reads,
+                'hits': self.hits,
+                'not_modified': self.not_modified,
+                'publishes': self.publishes,
+                'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+            }
+
+
+class InProcessCache(_Backend):
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self._entries: Dict[str, CacheEntry] = {}
+
+    def get(self, key: str, since: Optional[int] = None) -> Optional[CacheEntry]:
+        with self._lock:
+            self.reads += 1
+            entry = self._entries.get(self._key(key))
+            if entry is None:
+                return None
+            if entry.version == since:
+                self.not_modified += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def publish(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        with self._lock:
+            previous = self._entries.get(self._key(key))
+            entry = CacheEntry(key, (previous.version if previous else 0) + 1, time.time(), ttl, value)
+            self._entries[self._key(key)] = entry
+            self.publishes += 1
+            return entry
+
+
+class SQLiteCache(_Backend):
+    name = 'sqlite'
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            # WAL: readers in other processes aren't blocked while a publish commits
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    published_at REAL NOT NULL,
+                    ttl REAL NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str, since: Optional[int] = None) -> Optional[CacheEntry]:
+        self._count(reads=1)
+        conn = self._connect()
+        try:
+            # Checking the version first keeps "nothing new" polls from reading the payload
+            row = conn.execute("SELECT version FROM entries WHERE key = ?", (self._key(key),)).fetchone()
+            if row is None:
+                return None
+            if row[0] == since:
+                self._count(not_modified=1)
+                return None
+            row = conn.execute(
+                "SELECT version, published_at, ttl, payload FROM entries WHERE key = ?", (self._key(key),)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        version, published_at, ttl, payload = row
+        self._count(hits=1, bytes_read=len(payload))
+        return CacheEntry(key, version, published_at, ttl, decode(payload))
+
+    def publish(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        payload = encode(value)
+        published_at = time.time()
+        conn = self._connect()
+        try:
+            # Read back in the same transaction rather than with RETURNING (SQLite 3.35+)
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO entries (key, version, published_at, ttl, payload) VALUES (?, 1, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET version = version + 1, published_at = excluded.published_at,
+                        ttl = excluded.ttl, payload = excluded.payload
+                    """,
+                    (self._key(key), published_at, ttl, payload),
+                )
+                (version,) = conn.execute(
+                    "SELECT version FROM entries WHERE key = ?", (self._key(key),)
+                ).fetchone()
+        finally:
+            conn.close()
+        self._count(publishes=1, bytes_written=len(payload))
+        return CacheEntry(key, version, published_at, ttl, value)
+
+
+class KVCache(_Backend):
+    """
+    Entries live at {url}/{key} as one blob holding the version, publish time, TTL
+    and value. Publishing reads the current ETag and writes with If-Match (or
+    If-None-Match: * for a new key), retrying when another publisher got in first.
+    """
+    name = 'kv'
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 10):
+        super().__init__()
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        import requests
+        # Its own session: cache traffic must not end up in an HTTP cassette recording
+        self._session = requests.Session()
+        if token:
+            self._session.headers['Authorization'] = f"Bearer {token}"
+        self._etags: Dict[str, tuple] = {}   # key -> (etag, version) last read or written
+
+    def _url(self, key: str) -> str:
+        return f"{self.url}/{self._key(key)}"
+
+    def _read(self, key: str, etag: Optional[str] = None):
+        headers = {'If-None-Match': etag} if etag else {}
+        resp = self._session.get(self._url(key), headers=headers, timeout=self.timeout)
+        if resp.status_code in (304, 404):
+            return resp.status_code, None, None
+        resp.raise_for_status()
+        self._count(bytes_read=len(resp.content))
+        return resp.status_code, resp.headers.get('ETag'), decode(resp.content)
+
+    def get(self, key: str, since: Optional[int] = None) -> Optional[CacheEntry]:
+        self._count(reads=1)
+        known = self._etags.get(key)
+        # Revalidate with the ETag of the version the caller already holds
+        etag = known[0] if known and since is not None and known[1] == since else None
+        status, new_etag, blob = self._read(key, etag)
+        if status == 304:
+            self._count(not_modified=1)
+            return None
+        if blob is None:
+            return None
+        self._etags[key] = (new_etag, blob['version'])
+        if blob['version'] == since:
+            self._count(not_modified=1)
+            return None
+        self._count(hits=1)
+        return CacheEntry(key, blob['version'], blob['published_at'], blob['ttl'], blob['value'])
+
+    def publish(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        for attempt in range(KV_PUBLISH_ATTEMPTS):
+            if attempt:
+                time.sleep(random.uniform(0, 0.02 * attempt))
+            status, etag, current = self._read(key)
+            version = (current['version'] if current else 0) + 1
+            published_at = time.time()
+            payload = encode({'version': version, 'published_at': published_at, 'ttl': ttl, 'value': value})
+            headers = {'If-Match': etag} if current else {'If-None-Match': '*'}
+            resp = self._session.put(self._url(key), data=payload, headers=headers, timeout=self.timeout)
+            if resp.status_code == 412:
+                continue
+            resp.raise_for_status()
+            self._etags[key] = (resp.headers.get('ETag'), version)
+            self._count(publishes=1, bytes_written=len(payload))
+            return CacheEntry(key, version, published_at, ttl, value)
+        raise CacheConflict(f"gave up publishing {key} after {KV_PUBLISH_ATTEMPTS} conflicting writes")
+
+
+def get_shared_cache(backend: Optional[str] = None) -> _Backend:
+    """Backend selected by CACHE_BACKEND: memory (default), sqlite (CACHE_SQLITE_PATH) or kv (CACHE_KV_URL)."""
+    backend = (backend or os.getenv('CACHE_BACKEND', 'memory')).lower()
+    if backend == 'memory':
+        return InProcessCache()
+    if backend == 'sqlite':
+        return SQLiteCache()
+    if backend == 'kv':
+        url = os.getenv('CACHE_KV_URL')
+        if not url:
+            raise ValueError("CACHE_BACKEND=kv needs CACHE_KV_URL")
+        return KVCache(url, token=os.getenv('CACHE_KV_TOKEN'))
+    raise ValueError(f"unknown CACHE_BACKEND {backend!r} (memory, sqlite or kv)")
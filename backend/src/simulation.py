@@ -0,0 +1,82 @@
+"""
+Monte Carlo outcome simulation for prop lines
+Alternative to the analyzer's normal approximation, which fits poorly for
+low-count stats like BLK, STL and FG3M. Each (player, stat) window gets its own
+outcome distribution, and P(OVER) is the share of simulated games over the line.
+
+    bootstrap  resample the player's own recent games
+    negbin     negative binomial fit by moments (Poisson when not over-dispersed)
+
+Draws for the whole slate come from one seeded generator and are processed in
+chunks of cells, so memory stays bounded and a given slate always simulates the same way.
+"""
+
+import os
+
+import numpy as np
+
+MODELS = ('normal', 'bootstrap', 'negbin')
+
+DEFAULT_DRAWS = int(os.getenv('SIM_DRAWS', '10000'))
+DEFAULT_SEED = int(os.getenv('SIM_SEED', '20240'))
+
+# Upper bound on simulated values held at once (~32MB of float64)
+CHUNK_ELEMENTS = 4_000_000
+
+
+def simulate_draws(windows: np.ndarray, counts: np.ndarray, model: str, draws: int,
+                   rng: np.random.Generator) -> np.ndarray:
+    """
+    `draws` simulated outcomes per window. `windows` is cells x games, NaN-padded
+    past each cell's `counts` real games. Returns cells x draws.
+    """
+    counts = np.asarray(counts)
+    cells = len(counts)
+    if model == 'bootstrap':
+        # Uniform index into each cell's own games
+        idx = (rng.random((cells, draws)) * np.maximum(counts, 1)[:, None]).astype(np.intp)
+        return np.take_along_axis(np.nan_to_num(windows), idx, axis=1)
+
+    if model == 'negbin':
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(counts > 0, np.nansum(windows, axis=1) / counts, 0.0)
+            var = np.where(counts > 1, np.nansum((windows - mean[:, None]) ** 2, axis=1) / (counts - 1), 0.0)
+        dispersed = var > mean + 1e-9
+        # Gamma-Poisson mixture: rate ~ Gamma(r, mean / r) with r = mean^2 / (var - mean)
+        shape = np.where(dispersed, mean ** 2 / np.where(dispersed, var - mean, 1.0), 1.0)
+        scale = np.where(dispersed, mean / np.where(shape > 0, shape, 1.0), 0.0)
+        rate = np.where(dispersed[:, None],
+                        rng.gamma(np.maximum(shape, 1e-9)[:, None], np.maximum(scale, 0.0)[:, None], (cells, draws)),
+                        mean[:, None])
+        return rng.poisson(np.maximum(rate, 0.0)).astype(float)
+
+    raise ValueError(f"unknown simulation model: {model}")
+
+
+def simulate_p_over(windows: np.ndarray, counts: np.ndarray, cells: np.ndarray, lines: np.ndarray,
+                    model: str, draws: int = DEFAULT_DRAWS, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    P(OVER) for a batch of line queries. `windows` is W x games (NaN-padded) with
+    `counts` real games each; query k asks about window cells[k] at lines[k], and
+    several queries may share a window. Pushes count half, so P(OVER) + P(UNDER) = 1.
+    """
+    cells = np.asarray(cells)
+    lines = np.asarray(lines, dtype=float)
+    p_over = np.full(len(lines), 0.5)
+    if not len(lines):
+        return p_over
+
+    rng = np.random.default_rng(seed)
+    unique, inverse = np.unique(cells, return_inverse=True)
+    per_chunk = max(1, CHUNK_ELEMENTS // max(1, draws))
+    for start in range(0, len(unique), per_chunk):
+        chunk = unique[start:start + per_chunk]
+        simulated = simulate_draws(windows[chunk], np.asarray(counts)[chunk], model, draws, rng)
+        queries = np.flatnonzero((inverse >= start) & (inverse < start + len(chunk)))
+        # Queries share their cell's draws; gather them in slices so memory stays bounded
+        for q in range(0, len(queries), per_chunk):
+            batch = queries[q:q + per_chunk]
+            sims = simulated[inverse[batch] - start]
+            line = lines[batch][:, None]
+            p_over[batch] = (sims > line).mean(axis=1) + 0.5 * (sims == line).mean(axis=1)
+    return p_over
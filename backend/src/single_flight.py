@@ -0,0 +1,77 @@
+"""
+Single-flight call coalescing
+Concurrent callers asking for the same key share one execution: the first caller
+runs the function, everyone arriving while it runs waits and gets the same result
+(or the same exception). Used so simultaneous cache misses trigger one picks build
+instead of one odds fetch and game-log fetch per request thread.
+"""
+
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_waiters = 0
+
+    def do(self, key: Hashable, fn: Callable):
+        """Run fn() for `key`, or wait for the run already in flight. Returns (result, shared)."""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'max_waiters': self.max_waiters,
+                'in_flight': [str(key) for key in self._calls],
+            }
@@ -0,0 +1,307 @@
+"""
+Hyperparameter sweep for NBAAnalyzer's confidence weights and window size
+Scores a grid (or random sample) of parameter sets against the same recorded
+odds snapshots and game logs the backtest uses, and ranks them by log-loss and ROI.
+
+Everything that depends only on the window is computed once per window size:
+P(OVER), trend score and the coefficient of variation for every historical prop.
+A parameter set is then a few array operations over those features rather than a
+fresh pass over the game logs. Both stages are spread across a process pool.
+
+Run from backend/:  python -m src.sweep --snapshots odds.jsonl [--random 500] [--workers 4]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src import backtest
+from src.analyzer import NBAAnalyzer
+from src.backtest import MIN_GAMES, SharedGameLogs, date_matrix, day_bounds, load_snapshots
+from src.gamelog_store import DEFAULT_STORE_PATH, GameLogStore
+
+DEFAULT_GRID = {
+    'num_games': [5, 8, 10, 12, 15],
+    'trend_weight': [0.0, 0.14, 0.27, 0.4],
+    'consistency_weight': [0.0, 0.04, 0.08, 0.16],
+    'trend_baseline': [0.8, 0.85, 0.9],
+    'consistency_floor': [0.1, 0.2, 0.3],
+    'consistency_band': [0.2, 0.3, 0.5],
+}
+
+# (low, high) for random search; num_games is drawn from the grid's window sizes
+RANDOM_RANGES = {
+    'trend_weight': (0.0, 0.5),
+    'consistency_weight': (0.0, 0.2),
+    'trend_baseline': (0.75, 0.95),
+    'consistency_floor': (0.05, 0.4),
+    'consistency_band': (0.1, 0.6),
+}
+
+# Rows of the per-window feature matrix
+FEATURES = ('date', 'line', 'over_price', 'under_price', 'actual', 'p_over', 'trend_score', 'cov', 'zero_mean')
+
+
+def grid(space: Dict[str, list] = None) -> List[Dict]:
+    space = {**DEFAULT_GRID, **(space or {})}
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search(n: int, seed: int = 0, windows: List[int] = None) -> List[Dict]:
+    rng = random.Random(seed)
+    windows = windows or DEFAULT_GRID['num_games']
+    return [
+        {'num_games': rng.choice(windows), **{k: round(rng.uniform(lo, hi), 4) for k, (lo, hi) in RANDOM_RANGES.items()}}
+        for _ in range(n)
+    ]
+
+
+# -- stage 1: per-window features ---------------------------------------------
+
+def window_features(logs: SharedGameLogs, dates: List[str], snapshots: Dict, num_games: int,
+                    model: str = 'normal', min_games: int = MIN_GAMES) -> np.ndarray:
+    """
+    FEATURES x props for `dates`, one column per prop in the order the backtest
+    grades them. Only p_over, trend_score and cov depend on `num_games`.
+    """
+    analyzer = NBAAnalyzer(num_games=num_games, model=model)
+    col = {stat_type: j for j, stat_type in enumerate(analyzer.BATCH_STATS)}
+    out = []
+    for date in dates:
+        slate = snapshots[date]
+        ids, stats, counts = date_matrix(logs, date, slate, num_games, min_games)
+        if not ids:
+            continue
+        start_ns, end_ns = day_bounds(date)
+        shape = (len(ids), len(analyzer.BATCH_STATS))
+        lines = np.full(shape, np.nan)
+        cells = []
+        for i, player_id in enumerate(ids):
+            for stat_type, prop in slate[player_id]['props'].items():
+                if stat_type in col:
+                    lines[i, col[stat_type]] = prop['line']
+                    cells.append((i, col[stat_type], prop))
+
+        # Same p_over the batch path computes for this slate
+        window = analyzer._window_stats(stats, counts)
+        if model == 'normal':
+            p_over = analyzer._p_over_array(lines, window['mu'], window['sigma'])
+        else:
+            p_over = np.full(shape, 0.5)
+            rows, cols = np.nonzero(~np.isnan(lines))
+            p_over[rows, cols] = analyzer._simulated_p_over(window, rows, cols, lines[rows, cols], model)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = window['sigma'] / window['mu']
+
+        games = [logs.game_on(player_id, start_ns, end_ns) for player_id in ids]
+        date_ns = float(start_ns)
+        for i, j, prop in cells:
+            game = games[i]
+            out.append((
+                date_ns, prop['line'],
+                np.nan if prop.get('over_price') is None else prop['over_price'],
+                np.nan if prop.get('under_price') is None else prop['under_price'],
+                np.nan if game is None else game[j],
+                p_over[i, j], window['trend_score'][i, j], cov[i, j], float(window['mu'][i, j] == 0),
+            ))
+    return np.array(out, dtype=float).T.reshape(len(FEATURES), -1)
+
+
+def _features_shard(task: tuple) -> tuple:
+    num_games, dates, snapshots = task
+    return num_games, window_features(backtest._logs, dates, snapshots, num_games,
+                                      backtest._config.get('model', 'normal'), backtest._config.get('min_games', MIN_GAMES))
+
+
+def precompute(logs: SharedGameLogs, snapshots: Dict, windows: List[int], model: str = 'normal',
+               min_games: int = MIN_GAMES, workers: int = 1) -> Dict[int, np.ndarray]:
+    """{num_games: FEATURES x props}; columns line up across window sizes."""
+    dates = sorted(snapshots)
+    if workers <= 1:
+        return {g: window_features(logs, dates, snapshots, g, model, min_games) for g in windows}
+
+    # Shards are contiguous date runs so each window's columns concatenate back in date order
+    size = -(-len(dates) // max(1, workers * 2))
+    shards = [dates[i:i + size] for i in range(0, len(dates), size)]
+    tasks = [(g, shard, {d: snapshots[d] for d in shard}) for g in windows for shard in shards]
+    parts = {g: [] for g in windows}
+    config = {'model': model, 'min_games': min_games}
+    with ProcessPoolExecutor(max_workers=workers, initializer=backtest._init_worker,
+                             initargs=(logs.spec(), config)) as pool:
+        for g, features in pool.map(_features_shard, tasks):
+            parts[g].append(features)
+    return {g: np.concatenate(parts[g], axis=1) for g in windows}
+
+
+# -- stage 2: score parameter sets ---------------------------------------------
+
+def _summary(confidence, result, profit, staked) -> Dict:
+    decided = (result == 1) | (result == -1)
+    wins = int((result[decided] == 1).sum())
+    probs = confidence[decided] / 100.0
+    outcomes = (result[decided] == 1).astype(float)
+    clipped = np.clip(probs, 1e-6, 1 - 1e-6)
+    settled = result != 0
+    total = float(profit[settled & staked].sum())
+    n_staked = int((settled & staked).sum())
+    any_decided = bool(decided.any())
+    return {
+        'graded': int(settled.sum()),
+        'hit_rate': round(100.0 * wins / decided.sum(), 2) if any_decided else None,
+        'profit': round(total, 2),
+        'roi': round(100.0 * total / n_staked, 2) if n_staked else None,
+        'brier': round(float(np.mean((probs - outcomes) ** 2)), 4) if any_decided else None,
+        'log_loss': round(float(-np.mean(outcomes * np.log(clipped) + (1 - outcomes) * np.log(1 - clipped))), 4)
+        if any_decided else None,
+    }
+
+
+def score(features: np.ndarray, params: Dict, min_ev: float = 0.0, min_confidence: float = 0.0,
+          top_n: int = 5) -> Dict:
+    """
+    backtest.report's headline numbers for one parameter set, from precomputed features.
+    Matches a full backtest run with the same parameters.
+    """
+    f = dict(zip(FEATURES, features))
+    analyzer = NBAAnalyzer(**params)
+
+    pick_over = f['p_over'] >= 0.5
+    base_prob = np.where(pick_over, f['p_over'], 1.0 - f['p_over'])
+    consistency = analyzer._consistency_array(f['cov'], f['zero_mean'] > 0)
+    trend_adj, consistency_adj = analyzer._adjustments(f['trend_score'], consistency)
+    confidence = analyzer._round_array(np.clip(base_prob + trend_adj + consistency_adj, 0.0, 1.0) * 100, 1)
+
+    raw_payout = analyzer._payout_array(np.where(pick_over, f['over_price'], f['under_price']))
+    payout = analyzer._round_array(raw_payout, 4)
+    p = confidence / 100.0
+    ev = analyzer._round_array(p * raw_payout - (1 - p), 4)
+
+    # 1 win, -1 loss, 2 push, 0 void
+    actual, line = f['actual'], f['line']
+    won = np.where(pick_over, actual > line, actual < line)
+    result = np.where(np.isnan(actual), 0, np.where(actual == line, 2, np.where(won, 1, -1)))
+    staked = ~np.isnan(payout)
+    profit = np.where(result == 1, np.nan_to_num(payout), np.where(result == -1, -1.0, 0.0))
+
+    # rank_picks per date: top_n by EV, ties in grading order
+    eligible = np.flatnonzero(staked & (ev >= min_ev) & (confidence >= min_confidence))
+    order = eligible[np.lexsort((-ev[eligible], f['date'][eligible]))]
+    dates = f['date'][order]
+    first = np.r_[True, dates[1:] != dates[:-1]] if len(order) else np.array([], dtype=bool)
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0)) if len(order) else order
+    ranked = order[np.arange(len(order)) - group_start < top_n]
+
+    all_ = _summary(confidence, result, profit, staked)
+    picks = _summary(confidence[ranked], result[ranked], profit[ranked], staked[ranked])
+    return {
+        **params,
+        'log_loss': all_['log_loss'],
+        'brier': all_['brier'],
+        'hit_rate': all_['hit_rate'],
+        'picks': picks['graded'],
+        'pick_hit_rate': picks['hit_rate'],
+        'roi': picks['roi'],
+        'profit': picks['profit'],
+    }
+
+
+_features: Dict[int, np.ndarray] = {}
+_shm = None
+
+
+def _init_scorer(spec: Dict):
+    global _features, _shm
+    _shm = backtest.attach_shared_memory(spec['name'])
+    block = np.ndarray(spec['shape'], dtype=np.float64, buffer=_shm.buf)
+    _features = {g: block[k] for k, g in enumerate(spec['windows'])}
+
+
+def _score_chunk(task: tuple) -> List[Dict]:
+    combos, options = task
+    return [score(_features[c['num_games']], c, **options) for c in combos]
+
+
+def run_sweep(features: Dict[int, np.ndarray], combos: List[Dict], workers: int = 1, min_ev: float = 0.0,
+              min_confidence: float = 0.0, top_n: int = 5) -> pd.DataFrame:
+    """One row per parameter set, best log-loss first, with each set's ROI rank alongside."""
+    options = {'min_ev': min_ev, 'min_confidence': min_confidence, 'top_n': top_n}
+    if workers <= 1:
+        rows = [score(features[c['num_games']], c, **options) for c in combos]
+    else:
+        # Features go into one shared block; tasks only carry parameter sets
+        windows = sorted(features)
+        stacked = np.stack([features[g] for g in windows])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, stacked.nbytes))
+        try:
+            np.ndarray(stacked.shape, dtype=np.float64, buffer=shm.buf)[:] = stacked
+            spec = {'name': shm.name, 'shape': stacked.shape, 'windows': windows}
+            size = -(-len(combos) // (workers * 4))
+            chunks = [(combos[i:i + size], options) for i in range(0, len(combos), size)]
+            rows = []
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_scorer, initargs=(spec,)) as pool:
+                for part in pool.map(_score_chunk, chunks):
+                    rows.extend(part)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table['roi_rank'] = table['roi'].rank(ascending=False, method='min', na_option='bottom').astype(int)
+    return table.sort_values(['log_loss', 'roi'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshots", required=True, help="JSONL odds snapshots")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--grid", default=None, help='JSON overrides for DEFAULT_GRID, e.g. {"num_games": [8, 10]}')
+    parser.add_argument("--random", type=int, default=0, help="sample N parameter sets instead of the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default="normal")
+    parser.add_argument("--min-ev", type=float, default=0.0)
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--sort", default="log_loss", choices=["log_loss", "roi"])
+    parser.add_argument("--show", type=int, default=20)
+    parser.add_argument("--out", default=None, help="write the full table as CSV")
+    args = parser.parse_args()
+
+    space = json.loads(args.grid) if args.grid else None
+    if args.random:
+        combos = random_search(args.random, args.seed, (space or {}).get('num_games'))
+    else:
+        combos = grid(space)
+    windows = sorted({c['num_games'] for c in combos})
+
+    snapshots = load_snapshots(args.snapshots)
+    athlete_ids = {pid for slate in snapshots.values() for pid in slate}
+    logs = SharedGameLogs.from_store(GameLogStore(args.store), athlete_ids)
+    try:
+        features = precompute(logs, snapshots, windows, args.model, workers=args.workers)
+    finally:
+        logs.close()
+
+    table = run_sweep(features, combos, args.workers, args.min_ev, args.min_confidence, args.top_n)
+    if args.sort == 'roi':
+        table = table.sort_values(['roi', 'log_loss'], ascending=[False, True], kind='stable').reset_index(drop=True)
+    print(f"{len(combos)} parameter sets over {next(iter(features.values())).shape[1]} props")
+    print(table.head(args.show).to_string())
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+Local stand-in for the ESPN and Odds API endpoints the backend calls
+Serves a deterministic synthetic league (or a recorded cassette) so the picks
+pipeline can be run, benchmarked and regression-tested without a network.
+Latency, jitter and error injection are configurable.
+
+    python standin_server.py --port 8765 --latency 0.15 --error-rate 0.02
+
+then start the backend with the environment variables it prints.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.cassette import Cassette, interaction_key
+
+TEAMS = [
+    ("ATL", "Atlanta Hawks"), ("BOS", "Boston Celtics"), ("BKN", "Brooklyn Nets"),
+    ("CHA", "Charlotte Hornets"), ("CHI", "Chicago Bulls"), ("CLE", "Cleveland Cavaliers"),
+    ("DAL", "Dallas Mavericks"), ("DEN", "Denver Nuggets"), ("DET", "Detroit Pistons"),
+    ("GSW", "Golden State Warriors"), ("HOU", "Houston Rockets"), ("IND", "Indiana Pacers"),
+    ("LAC", "LA Clippers"), ("LAL", "Los Angeles Lakers"), ("MEM", "Memphis Grizzlies"),
+    ("MIA", "Miami Heat"), ("MIL", "Milwaukee Bucks"), ("MIN", "Minnesota Timberwolves"),
+    ("NOP", "New Orleans Pelicans"), ("NYK", "New York Knicks"), ("OKC", "Oklahoma City Thunder"),
+    ("ORL", "Orlando Magic"), ("PHI", "Philadelphia 76ers"), ("PHX", "Phoenix Suns"),
+    ("POR", "Portland Trail Blazers"), ("SAC", "Sacramento Kings"), ("SAS", "San Antonio Spurs"),
+    ("TOR", "Toronto Raptors"), ("UTA", "Utah Jazz"), ("WAS", "Washington Wizards"),
+]
+
+# ESPN's own abbreviations where they differ from the NBA's; its payloads use these
+# and its team URLs take them lowercased ("/teams/gs/schedule") or the team id
+ESPN_ABBR = {"GSW": "GS", "NOP": "NO", "NYK": "NY", "SAS": "SA", "UTA": "UTAH"}
+
+
+def espn_abbr(t: int) -> str:
+    abbr = TEAMS[t][0]
+    return ESPN_ABBR.get(abbr, abbr)
+
+
+GAMELOG_LABELS = ["MIN", "FG", "FG%", "3PT", "3P%", "FT", "FT%", "REB", "AST", "BLK", "STL", "PF", "TO", "PTS"]
+BOXSCORE_LABELS = ["MIN", "FG", "3PT", "FT", "OREB", "DREB", "REB", "AST", "STL", "BLK", "TO", "PF", "+/-", "PTS"]
+
+MARKET_STATS = {
+    'player_points': 'PTS',
+    'player_assists': 'AST',
+    'player_rebounds': 'REB',
+    'player_threes': 'FG3M',
+    'player_steals': 'STL',
+    'player_blocks': 'BLK',
+}
+BOOKMAKERS = ['draftkings', 'fanduel', 'betmgm']
+
+
+class SyntheticLeague:
+    """
+    Deterministic league: 15 fixed pairings that meet every other day, `history`
+    completed games per team, and tonight's slate of the first `games` pairings.
+    Gamelog, box-score and odds payloads are all derived from the same per-game
+    stat lines, so every ingestion path sees identical numbers.
+    """
+
+    def __init__(self, games: int = 10, players_per_team: int = 10, history: int = 40,
+                 seed: int = 7, now: datetime | None = None):
+        self.games = min(games, len(TEAMS) // 2)
+        self.players_per_team = players_per_team
+        self.history = history
+        self.seed = seed
+        self.now = now or datetime.now(timezone.utc)
+        self.today = self.now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        self.players = {}   # athlete_id -> {id, name, team_idx, means}
+        for t, (abbr, full) in enumerate(TEAMS):
+            nickname = full.split()[-1]
+            for j in range(players_per_team):
+                aid = 5000 + t * 50 + j
+                rng = random.Random(seed * 1_000_003 + aid)
+                self.players[aid] = {
+                    'id': aid,
+                    'name': f"{nickname} Player {j + 1}",
+                    'team_idx': t,
+                    'means': {
+                        'PTS': rng.uniform(6, 30), 'REB': rng.uniform(2, 12), 'AST': rng.uniform(1, 9),
+                        'BLK': rng.uniform(0.1, 2), 'STL': rng.uniform(0.3, 2), 'FG3M': rng.uniform(0, 4),
+                    },
+                }
+
+    # -- schedule -------------------------------------------------------------
+
+    def _pair(self, team_idx: int) -> int:
+        return team_idx // 2
+
+    def past_game_id(self, g: int, pair: int) -> str:
+        return str(700000 + g * 100 + pair)
+
+    def past_game_date(self, g: int) -> datetime:
+        return self.today - timedelta(days=1 + 2 * g, hours=-0.5)
+
+    def slate_event_id(self, pair: int) -> str:
+        return str(800000 + pair)
+
+    def slate_tip(self, pair: int) -> datetime:
+        return self.now + timedelta(hours=3, minutes=10 * pair)
+
+    def roster(self, team_idx: int) -> list:
+        base = 5000 + team_idx * 50
+        return [self.players[base + j] for j in range(self.players_per_team)]
+
+    # -- stat lines -----------------------------------------------------------
+
+    def stat_line(self, aid: int, g: int) -> dict:
+        rng = random.Random(self.seed * 7_919 + aid * 1_009 + g)
+        means = self.players[aid]['means']
+        line = {}
+        for stat, mean in means.items():
+            sd = max(0.8, mean * 0.35)
+            line[stat] = max(0, int(round(rng.gauss(mean, sd))))
+        line['MIN'] = max(10, int(round(rng.gauss(30, 5))))
+        return line
+
+    # -- ESPN payloads --------------------------------------------------------
+
+    def _event(self, event_id: str, date: datetime, home: int, away: int, completed: bool) -> dict:
+        def side(t, home_away):
+            return {'homeAway': home_away,
+                    'team': {'id': str(t + 1), 'abbreviation': espn_abbr(t), 'displayName': TEAMS[t][1]}}
+        return {
+            'id': event_id,
+            'date': date.strftime('%Y-%m-%dT%H:%MZ'),
+            'status': {'type': {'completed': completed, 'id': '3' if completed else '1',
+                                'shortDetail': 'Final' if completed else '7:00 PM ET'}},
+            'competitions': [{
+                'date': date.strftime('%Y-%m-%dT%H:%MZ'),
+                'status': {'type': {'completed': completed}},
+                'venue': {'fullName': f"{TEAMS[home][1]} Arena"},
+                'competitors': [side(home, 'home'), side(away, 'away')],
+            }],
+        }
+
+    def scoreboard(self, dates: str | None) -> dict:
+        if dates and '-' in dates:
+            start, end = (datetime.strptime(d, '%Y%m%d').replace(tzinfo=timezone.utc) for d in dates.split('-'))
+            end += timedelta(days=1)
+        else:
+            start = datetime.strptime(dates, '%Y%m%d').replace(tzinfo=timezone.utc) if dates else self.today
+            end = start + timedelta(days=1)
+
+        events = []
+        if start <= self.today < end:
+            events += [self._event(self.slate_event_id(p), self.slate_tip(p), 2 * p, 2 * p + 1, False)
+                       for p in range(self.games)]
+        for g in range(self.history):
+            date = self.past_game_date(g)
+            if start <= date < end:
+                events += [self._event(self.past_game_id(g, p), date, 2 * p, 2 * p + 1, True)
+                           for p in range(len(TEAMS) // 2)]
+        return {'events': events}
+
+    def team_schedule(self, team: str) -> dict:
+        t = next((i for i in range(len(TEAMS)) if team in (espn_abbr(i).lower(), str(i + 1))), None)
+        if t is None:
+            return {'events': []}
+        pair = self._pair(t)
+        return {'events': [
+            self._event(self.past_game_id(g, pair), self.past_game_date(g), 2 * pair, 2 * pair + 1, True)
+            for g in range(self.history)
+        ]}
+
+    def _parse_game(self, event_id: str):
+        n = int(event_id) - 700000
+        return n // 100, n % 100
+
+    def summary(self, event_id: str) -> dict:
+        g, pair = self._parse_game(event_id)
+        home, away = 2 * pair, 2 * pair + 1
+        date = self.past_game_date(g).strftime('%Y-%m-%dT%H:%MZ')
+
+        def block(t):
+            athletes = []
+            for p in self.roster(t):
+                s = self.stat_line(p['id'], g)
+                athletes.append({'athlete': {'id': str(p['id']), 'displayName': p['name']}, 'stats': [
+                    str(s['MIN']), "5-10", f"{s['FG3M']}-{s['FG3M'] + 2}", "2-2", "1",
+                    str(max(0, s['REB'] - 1)), str(s['REB']), str(s['AST']), str(s['STL']), str(s['BLK']),
+                    "1", "2", "+1", str(s['PTS']),
+                ]})
+            return {'team': {'id': str(t + 1), 'abbreviation': espn_abbr(t)},
+                    'statistics': [{'labels': BOXSCORE_LABELS, 'athletes': athletes}]}
+
+        return {
+            'header': {'id': event_id, 'competitions': [{'date': date, 'competitors': [
+                {'team': {'id': str(home + 1), 'displayName': TEAMS[home][1]}},
+                {'team': {'id': str(away + 1), 'displayName': TEAMS[away][1]}},
+            ]}]},
+            'boxscore': {'players': [block(home), block(away)]},
+        }
+
+    def gamelog(self, aid: int) -> dict:
+        player = self.players.get(aid)
+        if player is None:
+            return {'labels': GAMELOG_LABELS, 'events': {}, 'seasonTypes': []}
+        t = player['team_idx']
+        pair = self._pair(t)
+        opponent = TEAMS[2 * pair + 1 - (t - 2 * pair)][1]
+        meta, rows = {}, []
+        for g in range(self.history):
+            eid = self.past_game_id(g, pair)
+            s = self.stat_line(aid, g)
+            meta[eid] = {'gameDate': self.past_game_date(g).strftime('%Y-%m-%dT%H:%MZ'),
+                         'opponent': {'displayName': opponent}}
+            rows.append({'eventId': eid, 'stats': [
+                str(s['MIN']), "5-10", "50.0", f"{s['FG3M']}-{s['FG3M'] + 2}", "40.0", "2-2", "100.0",
+                str(s['REB']), str(s['AST']), str(s['BLK']), str(s['STL']), "2", "1", str(s['PTS']),
+            ]})
+        return {
+            'labels': GAMELOG_LABELS,
+            'events': meta,
+            'seasonTypes': [{'displayName': f"{self.today.year - 1}-{str(self.today.year)[2:]} Regular Season",
+                             'categories': [{'events': rows}]}],
+        }
+
+    def byathlete(self) -> dict:
+        athletes = []
+        for p in self.players.values():
+            m = p['means']
+            athletes.append({
+                'athlete': {'id': str(p['id']), 'displayName': p['name'], 'jersey': str(p['id'] % 100),
+                            'teams': [{'abbreviation': espn_abbr(p['team_idx'])}],
+                            'position': {'abbreviation': 'G'}},
+                'categories': [
+                    {'name': 'offensive', 'values': [round(m['PTS'], 1), round(m['AST'], 1)]},
+                    {'name': 'general', 'values': [round(m['REB'], 1)]},
+                ],
+            })
+        return {
+            'categories': [{'name': 'offensive', 'names': ['avgPoints', 'avgAssists']},
+                           {'name': 'general', 'names': ['avgRebounds']}],
+            'athletes': athletes,
+        }
+
+    def search(self, query: str) -> dict:
+        q = (query or '').lower()
+        return {'items': [{'id': str(p['id']), 'displayName': p['name'], 'league': 'nba'}
+                          for p in self.players.values() if p['name'].lower() == q]}
+
+    # -- Odds API payloads ----------------------------------------------------
+
+    def odds_events(self) -> list:
+        return [{
+            'id': self.slate_event_id(p),
+            'home_team': TEAMS[2 * p][1],
+            'away_team': TEAMS[2 * p + 1][1],
+            'commence_time': self.slate_tip(p).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        } for p in range(self.games)]
+
+    def event_odds(self, event_id: str, markets: list) -> dict:
+        pair = int(event_id) - 800000
+        bookmakers = []
+        for b, book in enumerate(BOOKMAKERS):
+            book_markets = []
+            for market in markets:
+                stat = MARKET_STATS.get(market)
+                if not stat:
+                    continue
+                outcomes = []
+                for t in (2 * pair, 2 * pair + 1):
+                    for p in self.roster(t):
+                        rng = random.Random(self.seed + p['id'] * 31 + b * 7 + len(market))
+                        line = max(0.5, round(p['means'][stat] + rng.uniform(-1.5, 1.5)) - 0.5)
+                        over = rng.choice([-125, -115, -110, -105, 100, 110])
+                        under = -110 if over > -110 else rng.choice([-105, 100, 105])
+                        outcomes.append({'name': 'Over', 'description': p['name'], 'point': line, 'price': over})
+                        outcomes.append({'name': 'Under', 'description': p['name'], 'point': line, 'price': under})
+                book_markets.append({'key': market, 'outcomes': outcomes})
+            bookmakers.append({'key': book, 'markets': book_markets})
+        return {'id': event_id, 'bookmakers': bookmakers}
+
+
+class StandInServer:
+    """
+    Threaded HTTP server answering ESPN and Odds API paths by suffix, so any base
+    URL prefix works. Responses come from `cassette` when it has the request, else
+    from `league`. Supports ETag revalidation and Odds API quota headers.
+
+    Paths under /kv/ are a small conditional key-value store (GET with
+    If-None-Match, PUT with If-Match / If-None-Match: *) for the kv backend of
+    src/shared_cache.py. They skip latency and fault injection.
+    """
+
+    def __init__(self, league: SyntheticLeague | None = None, cassette: str | None = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, seed: int = 0, host: str = '127.0.0.1', port: int = 0,
+                 quota: int = 20000):
+        self.league = league if league is not None else (None if cassette else SyntheticLeague())
+        self.cassette = Cassette(cassette) if cassette else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.quota_remaining = quota
+        self.quota_used = 0
+        self.requests = {}
+        self.kv = {}   # key -> (etag, body)
+        self._kv_versions = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self) -> dict:
+        """Environment variables that point the backend at this server."""
+        return {
+            'ESPN_BASE_URL': f"{self.url}/espn/site",
+            'ESPN_WEB_BASE_URL': f"{self.url}/espn/web",
+            'ESPN_SEARCH_URL': f"{self.url}/espn/search",
+            'ODDS_API_BASE_URL': f"{self.url}/odds/v4",
+            'ODDS_API_KEY': 'standin',
+            'USE_REAL_ODDS': 'true',
+        }
+
+    @property
+    def kv_url(self) -> str:
+        """CACHE_KV_URL for the shared cache's kv backend."""
+        return f"{self.url}/kv"
+
+    def _kv_put(self, key: str, body: bytes, if_match: str | None, if_none_match: str | None):
+        """Store `body` unless the preconditions fail; returns (status, etag)."""
+        with self._lock:
+            current = self.kv.get(key)
+            if if_none_match == '*' and current is not None:
+                return 412, None
+            if if_match is not None and (current is None or current[0] != if_match):
+                return 412, None
+            self._kv_versions += 1
+            etag = f'"{self._kv_versions}"'
+            self.kv[key] = (etag, body)
+            return (200 if current else 201), etag
+
+    # -- request handling -----------------------------------------------------
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _route(self, path: str, query: dict):
+        """Return (route name, payload, odds cost) or (route, None, 0) when unknown."""
+        q = {k: v[0] for k, v in query.items()}
+        parts = path.rstrip('/').split('/')
+        league = self.league
+        if league is None:
+            return 'unknown', None, 0
+        if path.endswith('/scoreboard'):
+            return 'scoreboard', league.scoreboard(q.get('dates')), 0
+        if path.endswith('/schedule') and 'teams' in parts:
+            return 'schedule', league.team_schedule(parts[parts.index('teams') + 1]), 0
+        if path.endswith('/summary'):
+            return 'summary', league.summary(q.get('event', '0')), 0
+        if path.endswith('/statistics/byathlete'):
+            return 'byathlete', league.byathlete(), 0
+        if path.endswith('/gamelog') and 'athletes' in parts:
+            return 'gamelog', league.gamelog(int(parts[parts.index('athletes') + 1])), 0
+        if path.endswith('/search'):
+            return 'search', league.search(q.get('query')), 0
+        if path.endswith('/sports/basketball_nba/events'):
+            return 'events', league.odds_events(), 0
+        if path.endswith('/odds') and 'events' in parts:
+            markets = [m for m in q.get('markets', '').split(',') if m]
+            return 'event_odds', league.event_odds(parts[parts.index('events') + 1], markets), len(markets)
+        return 'unknown', None, 0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients keep connections alive like they do against ESPN
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes = b"", headers: dict | None = None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _kv_key(self):
+                path = urlsplit(self.path).path
+                return path[len('/kv/'):] if path.startswith('/kv/') else None
+
+            def do_PUT(self):
+                key = self._kv_key()
+                if key is None:
+                    return self._send(405)
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, etag = server._kv_put(key, body, self.headers.get('If-Match'),
+                                              self.headers.get('If-None-Match'))
+                server._count('kv_put' if etag else 'kv_conflict')
+                self._send(status, headers={'ETag': etag} if etag else None)
+
+            def do_GET(self):
+                key = self._kv_key()
+                if key is not None:
+                    with server._lock:
+                        current = server.kv.get(key)
+                    if current is None:
+                        server._count('kv_miss')
+                        return self._send(404)
+                    etag, body = current
+                    if self.headers.get('If-None-Match') == etag:
+                        server._count('kv_not_modified')
+                        return self._send(304, headers={'ETag': etag})
+                    server._count('kv_get')
+                    return self._send(200, body, {'ETag': etag, 'Content-Type': 'application/octet-stream'})
+
+                delay = server.latency + (server._roll() * server.jitter if server.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                roll = server._roll()
+                if roll < server.throttle_rate:
+                    server._count('throttled')
+                    return self._send(429, headers={"Retry-After": "1"})
+                if roll < server.throttle_rate + server.error_rate:
+                    server._count('errors')
+                    return self._send(500)
+
+                parts = urlsplit(self.path)
+                recorded = server.cassette.next(interaction_key(self.path)) if server.cassette else None
+                if recorded is not None:
+                    server._count('cassette')
+                    headers = dict(recorded.get('headers') or {})
+                    return self._send(recorded['status'], (recorded.get('body') or '').encode(), headers)
+
+                route, payload, cost = server._route(parts.path, parse_qs(parts.query))
+                server._count(route)
+                if payload is None:
+                    return self._send(404, b'{"error": "not found"}', {"Content-Type": "application/json"})
+
+                body = json.dumps(payload).encode()
+                headers = {"Content-Type": "application/json"}
+                if parts.path.startswith('/odds') or route in ('events', 'event_odds'):
+                    with server._lock:
+                        server.quota_used += cost
+                        server.quota_remaining -= cost
+                        headers.update({
+                            "x-requests-remaining": str(server.quota_remaining),
+                            "x-requests-used": str(server.quota_used),
+                            "x-requests-last": str(cost),
+                        })
+                else:
+                    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._send(304, headers={"ETag": etag})
+                self._send(200, body, headers)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in ESPN / Odds API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=10, help="games on tonight's synthetic slate")
+    parser.add_argument("--players-per-team", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cassette", help="serve recorded interactions from this cassette first")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    args = parser.parse_args()
+
+    league = SyntheticLeague(games=args.games, players_per_team=args.players_per_team, seed=args.seed)
+    server = StandInServer(league=league, cassette=args.cassette, latency=args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, seed=args.seed,
+                           host=args.host, port=args.port)
+    print(f"Stand-in server listening on {server.url}")
+    print("Point the backend at it with:")
+    for k, v in server.env().items():
+        print(f"  export {k}={v}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
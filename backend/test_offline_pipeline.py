@@ -0,0 +1,1033 @@
+"""
+Offline checks of the fetch pipeline against the local stand-in server
+(standin_server.py), so they run without network access or an Odds API key.
+"""
+
+import copy
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzer import NBAAnalyzer
+from src.backtest import SLATE_TZ, SharedGameLogs, day_bounds, report, run_backtest
+from src.cassette import install_cassette, uninstall_cassette
+from src.fetch_engine import GameLogFetchEngine
+from src.fetcher import NBAFetcher
+from src.gamelog_store import GameLogStore
+from src.parlay import _bitsets, _Leg, build_parlays, conditional_lift
+from src.picks_index import PicksIndex
+from src.picks_summary import summarize
+from src import rate_limiter
+from src.rate_limiter import MAX_RETRY_AFTER, HostRateLimiter, TokenBucket, throttled_get
+from src.records import GameLog
+from src.shared_cache import InProcessCache, KVCache, SQLiteCache, decode, encode, materialize
+from src.single_flight import SingleFlight
+from src.sweep import precompute, run_sweep
+from src.http_cache import ConditionalCache
+from src.line_history import LineHistoryStore
+from src.odds_diff import OddsDiff, group_predictions, merge_predictions
+from src.odds_fetcher import OddsFetcher, convert_to_ladder_format, convert_to_simple_format
+from src.odds_quota import MAX_REFRESH_SECONDS, QuotaTracker, RefreshScheduler
+from standin_server import StandInServer, SyntheticLeague
+
+
+@pytest.fixture
+def server():
+    with StandInServer(SyntheticLeague(games=2, players_per_team=6, history=20)) as srv:
+        yield srv
+
+
+@pytest.fixture
+def app(monkeypatch):
+    import app as app_module
+    # Each test gets an empty picks cache, its own shared cache and no built services
+    monkeypatch.setattr(app_module, 'picks_cache', dict(app_module.picks_cache, data=None, timestamp=None))
+    monkeypatch.setattr(app_module, 'picks_refresh', dict(app_module.picks_refresh, lock=threading.Lock(),
+                                                          thread=None, count=0))
+    monkeypatch.setattr(app_module, 'picks_flight', SingleFlight())
+    monkeypatch.setattr(app_module, 'shared_cache', InProcessCache())
+    monkeypatch.setattr(app_module, '_services', {})
+    return app_module
+
+
+def _players(league, n=6):
+    return {p["name"]: p["id"] for p in list(league.players.values())[:n]}
+
+
+def test_gamelog_and_boxscore_sources_agree(server):
+    league = server.league
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    players = _players(league)
+    teams = {name: "ATL" for name in players}
+
+    by_gamelog, errors = fetcher.get_player_stats_many(players, num_games=10)
+    assert not errors
+    by_boxscore, errors = fetcher.get_player_stats_many(players, num_games=10, teams=teams, source="boxscore")
+    assert not errors
+
+    cols = ["GAME_ID", "GAME_DATE", "MATCHUP", "PTS", "REB", "AST", "BLK", "STL", "FG3M", "MIN"]
+    for name in players:
+        pd.testing.assert_frame_equal(by_gamelog[name][cols], by_boxscore[name][cols])
+
+
+def test_boxscore_source_uses_espn_team_urls(server):
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    # Teams ESPN abbreviates differently (GS, NO, NY, SA, UTAH), as byathlete reports them
+    active = [p for p in fetcher.get_active_players_with_stats()
+              if p['team'] in ('GSW', 'NOP', 'NYK', 'SAS', 'UTA')]
+    assert {p['team'] for p in active} == {'GSW', 'NOP', 'NYK', 'SAS', 'UTA'}
+    players = {p['name']: p['id'] for p in active}
+
+    by_boxscore, errors = fetcher.get_player_stats_many(
+        players, num_games=10, teams={p['name']: p['team'] for p in active}, source="boxscore")
+    assert not errors and fetcher.fetch_stats['boxscore_fallback'] == 0
+    assert fetcher.fetch_stats['boxscore_teams'] == 5 and fetcher.fetch_stats['boxscore_schedule_errors'] == []
+    by_gamelog, _ = NBAFetcher(base_url=server.url, web_base_url=server.url).get_player_stats_many(players, num_games=10)
+    for name in players:
+        pd.testing.assert_frame_equal(by_gamelog[name][by_boxscore[name].columns], by_boxscore[name])
+
+
+def test_boxscore_stages_share_the_budget_and_report_schedule_errors(server):
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    players = _players(server.league)
+    teams = {name: "ATL" for name in players}
+    schedule = fetcher.get_team_recent_game_ids
+
+    def dead_for_atl(abbr, *args, **kwargs):
+        if abbr == "ATL":
+            time.sleep(0.2)
+            raise ConnectionError("schedule endpoint down")
+        return schedule(abbr, *args, **kwargs)
+
+    fetcher._engine = GameLogFetchEngine(fetcher)
+    budgets, run = [], fetcher._engine.run
+    fetcher.get_team_recent_game_ids = dead_for_atl
+    fetcher._engine.run = lambda calls, budget=None: budgets.append(budget) or run(calls, budget)
+
+    logs, errors = fetcher.get_player_stats_many(players, num_games=10, budget=30, teams=teams, source="boxscore")
+    assert not errors and set(logs) == set(players)
+    stats = fetcher.fetch_stats
+    assert stats['boxscore_schedule_errors'] == ["ATL"] and stats['boxscore_fallback'] == len(players)
+    # No box scores to fetch: schedules, then the per-player fallback with only what's left
+    assert len(budgets) == 2 and budgets[0] <= 30 and budgets[1] < 30 - 0.2
+
+
+@pytest.mark.parametrize("source", ["gamelog", "boxscore", "store"])
+def test_records_match_frames(source, server, tmp_path):
+    players = _players(server.league)
+    teams = {name: "ATL" for name in players}
+    logs = {}
+    for fmt in ("frame", "records"):
+        store = GameLogStore(str(tmp_path / f"{fmt}.sqlite")) if source == "store" else None
+        fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url, store=store, log_format=fmt)
+        kwargs = {"teams": teams, "source": source} if source == "boxscore" else {"teams": teams}
+        logs[fmt], errors = fetcher.get_player_stats_many(players, num_games=10, **kwargs)
+        assert not errors
+
+    props = {"PTS": {"line": 12.5, "over_price": -110, "under_price": -110},
+             "FG3M": {"line": 1.5, "over_price": 120, "under_price": -140}}
+    for name in players:
+        records = logs["records"][name]
+        assert isinstance(records, GameLog)
+        pd.testing.assert_frame_equal(records.to_frame(), logs["frame"][name])
+        assert GameLog.from_frame(logs["frame"][name]) == records == decode(encode(records))
+    analyzer = NBAAnalyzer()
+    by_format = {fmt: analyzer.analyze_slate({n: (logs[fmt][n], props) for n in players}) for fmt in logs}
+    assert by_format["records"] == by_format["frame"]
+
+
+def test_fetch_engine_holds_slots_until_calls_finish():
+    engine = GameLogFetchEngine(NBAFetcher(), max_concurrency=1, request_deadline=0.1)
+    # A call slower than the deadline keeps its slot; the calls queued behind it
+    # aren't charged for the wait and don't time out
+    calls = {0: lambda: time.sleep(0.4) or 0, **{i: (lambda i=i: i) for i in range(1, 5)}}
+    results, errors = engine.run(calls)
+    assert results == {i: i for i in range(5)} and not errors
+
+
+def test_fetch_engine_deadline_is_the_http_timeout():
+    league = SyntheticLeague(games=1, players_per_team=2, history=5)
+    with StandInServer(league, latency=0.5) as slow:
+        engine = GameLogFetchEngine(NBAFetcher(base_url=slow.url, web_base_url=slow.url),
+                                    max_concurrency=2, request_deadline=0.2)
+        results, errors = engine.fetch(_players(league, 3))
+    assert not results and len(errors) == 3
+    assert all(isinstance(exc, TimeoutError) for exc in errors.values())
+    assert engine.last_run['timeouts'] == 3
+
+
+class _FakeClock:
+    """Stands in for the rate limiter's `time`: sleep() advances monotonic() instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _FakeResponse(*outcome)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', fake)
+    return fake
+
+
+def test_token_bucket_halves_once_per_cooldown_and_recovers_additively(clock):
+    bucket = TokenBucket(rate=8.0, min_rate=1.0, max_rate=10.0, burst=4, cooldown=1.0)
+    # A burst of 429s from concurrent requests is one congestion event
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 4.0 and bucket.throttled == 5
+    clock.now += 0.5
+    bucket.on_throttle()
+    assert bucket.rate == 4.0
+    clock.now += 0.5
+    bucket.on_throttle()
+    assert bucket.rate == 2.0
+    for _ in range(3):
+        clock.now += 1.0
+        bucket.on_throttle()
+    assert bucket.rate == 1.0   # never below min_rate
+
+    for expected in (1.5, 2.0, 2.5):
+        bucket.on_success()
+        assert bucket.rate == expected
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10.0  # nor above max_rate
+
+
+def test_token_bucket_paces_to_its_rate_and_caps_retry_after(clock):
+    bucket = TokenBucket(rate=2.0, min_rate=1.0, max_rate=10.0, burst=2)
+    # The burst goes straight through, then one token every 1 / rate seconds
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 0.5]
+    assert clock.slept == [0.5, 0.5] and clock.now == 1001.0
+
+    clock.now += 60
+    bucket.on_throttle(retry_after=3600)
+    assert bucket.acquire() == MAX_RETRY_AFTER == 30.0
+    clock.now += 60
+    bucket.on_throttle(retry_after=5)
+    assert bucket.acquire() == 5.0
+
+
+def test_throttled_get_retries_429_and_5xx_then_returns_the_last_response(clock):
+    url = "https://api.example.com/x"
+    limiter = HostRateLimiter(limits={'api.example.com': (8.0, 1.0, 10.0, 8)})
+    bucket = limiter.bucket_for(url)
+
+    session = _FakeSession((429, {'Retry-After': '2'}), (503,), (200,))
+    assert throttled_get(session, url, limiter=limiter).status_code == 200
+    assert session.calls == 3 and bucket.throttled == 2
+    assert clock.slept == [2.0]   # the retry after the 429 waited out Retry-After
+
+    # Out of retries: the last throttled response goes back to the caller as-is
+    session = _FakeSession((500,), (500,), (429,), (200,))
+    assert throttled_get(session, url, retries=2, limiter=limiter).status_code == 429
+    assert session.calls == 3
+
+    # 4xx other than 429 isn't congestion: no retry, no slowdown
+    rate = bucket.rate
+    session = _FakeSession((404,))
+    assert throttled_get(session, url, limiter=limiter).status_code == 404
+    assert session.calls == 1 and bucket.rate == rate + bucket.increase
+
+    # Transport errors count as congestion and propagate without a retry
+    clock.now += 10
+    session = _FakeSession(ConnectionError("reset"), (200,))
+    with pytest.raises(ConnectionError):
+        throttled_get(session, url, limiter=limiter)
+    assert session.calls == 1 and bucket.rate == (rate + bucket.increase) / 2
+
+
+def test_pooled_adapter_counts_connections_and_retires_after_in_flight_requests():
+    import requests
+    from src import http_session
+    with StandInServer(SyntheticLeague(games=1, players_per_team=1, history=2), latency=0.3) as slow:
+        url = f"{slow.url}/espn/site/scoreboard"
+        session = requests.Session()
+        first = http_session.PooledAdapter(pool_maxsize=2)
+        session.mount('http://', first)
+        session.mount('https://', first)
+
+        before = http_session.session_stats()
+        assert all(session.get(url).ok for _ in range(3))
+        after = http_session.session_stats()
+        # Keep-alive: three requests, one connection
+        assert after['requests'] - before['requests'] == 3
+        assert after['new_connections'] - before['new_connections'] == 1
+
+        with ThreadPoolExecutor(1) as pool:
+            pending = pool.submit(session.get, url)
+            while not first.in_flight:
+                time.sleep(0.01)
+            # Remounting (a pool resize) must not close the adapter under the running request
+            http_session._mount(session)
+            assert first.retired and not first.closed
+            assert pending.result().ok
+        assert first.closed and not first.in_flight
+        replacement = session.adapters['http://']
+        assert replacement is not first and session.get(url).ok and not replacement.closed
+
+
+def test_shared_session_is_published_with_its_pooled_adapter(monkeypatch):
+    from src import http_session
+    monkeypatch.setattr(http_session, '_session', None)
+    monkeypatch.setattr(http_session, '_pool_maxsize', 0)
+
+    def slow_adapter(**kwargs):
+        # Widens the window between creating the session and mounting its adapter
+        time.sleep(0.05)
+        return http_session.PooledAdapter(**kwargs)
+
+    monkeypatch.setattr(http_session, '_adapter_factory', slow_adapter)
+    start = threading.Barrier(8)
+
+    def first_call(_):
+        start.wait()
+        return http_session.get_session().adapters['https://']
+
+    with ThreadPoolExecutor(8) as pool:
+        adapters = list(pool.map(first_call, range(8)))
+    assert all(isinstance(a, http_session.PooledAdapter) for a in adapters) and len(set(map(id, adapters))) == 1
+
+    # Concurrent resizes each retire only the adapter they replaced, never the mounted one
+    session = http_session.get_session()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(http_session.configure_pool, range(11, 27)))
+    mounted = session.adapters['https://']
+    assert session.adapters['http://'] is mounted and not mounted.retired and mounted._pool_maxsize == 26
+
+
+def test_cassette_replays_recorded_session(server, tmp_path):
+    path = str(tmp_path / "slate.json")
+    players = _players(server.league, 3)
+
+    cassette = install_cassette(path, "record")
+    try:
+        recorded, _ = NBAFetcher(base_url=server.url, web_base_url=server.url).get_player_stats_many(players)
+        props = OddsFetcher(api_key="test", base_url=server.url).get_all_player_props(markets=["player_points"])
+        cassette.save()
+    finally:
+        uninstall_cassette()
+
+    # Replay against a dead host: every response must come from the cassette
+    dead = "http://127.0.0.1:9"
+    install_cassette(path, "replay")
+    try:
+        replayed, errors = NBAFetcher(base_url=dead, web_base_url=dead).get_player_stats_many(players)
+        replayed_props = OddsFetcher(api_key="test", base_url=dead).get_all_player_props(markets=["player_points"])
+    finally:
+        uninstall_cassette()
+
+    assert not errors
+    for name in players:
+        pd.testing.assert_frame_equal(recorded[name], replayed[name])
+    assert replayed_props == props
+
+
+def test_incremental_refresh_revalidates_without_refetching(server, tmp_path):
+    fetcher = NBAFetcher(
+        base_url=server.url,
+        web_base_url=server.url,
+        store=GameLogStore(str(tmp_path / "gamelogs.sqlite")),
+        http_cache=ConditionalCache(str(tmp_path / "http")),
+    )
+    players = _players(server.league)
+    teams = {name: "ATL" for name in players}
+
+    first, _ = fetcher.get_player_stats_many(players, teams=teams)
+    assert fetcher.fetch_stats["store_refetched"] == len(players)
+
+    second, _ = fetcher.get_player_stats_many(players, teams=teams)
+    assert fetcher.fetch_stats["store_fresh"] == len(players)
+    assert fetcher.http_cache.stats()["hits"] >= 1   # ranged scoreboard came back 304
+    for name in players:
+        pd.testing.assert_frame_equal(first[name], second[name])
+
+
+def test_http_cache_evicts_least_recently_used_past_its_byte_cap(server, tmp_path):
+    from src.http_session import get_session
+    directory, session = str(tmp_path / "http"), get_session()
+    a, b, c = list(server.league.players)[:3]
+    url = lambda aid: f"{server.url}/espn/web/athletes/{aid}/gamelog"
+    body = lambda aid: len(json.dumps(server.league.gamelog(aid)).encode())
+
+    cache = ConditionalCache(directory, max_bytes=10**9)
+    for aid in (a, b, c):
+        cache.get_json(session, url(aid))
+    # A 304 saves the body's bytes and makes the entry the most recently used
+    cache.get_json(session, url(a))
+    assert cache.stats()['hits'] == 1 and cache.stats()['bytes_saved'] == body(a)
+    full = cache.stats()['bytes_on_disk']
+    assert cache.stats()['entries'] == 3 and full == sum(os.path.getsize(cache._path(url(x), None)) for x in (a, b, c))
+
+    # A new process with a smaller cap trims to it, least recently used first
+    capped = ConditionalCache(directory, max_bytes=full - 1)
+    assert not os.path.exists(capped._path(url(b), None))
+    assert capped.stats()['evictions'] == 1 and capped.stats()['bytes_on_disk'] <= full - 1
+
+    # Fetching b again goes over the cap by one entry: c is now the oldest
+    capped.get_json(session, url(b))
+    assert not os.path.exists(capped._path(url(c), None))
+    assert all(os.path.exists(capped._path(url(x), None)) for x in (a, b))
+    assert capped.stats()['bytes_on_disk'] <= full - 1
+
+    # Without the index (a directory from before it existed) mtimes give the order
+    legacy = ConditionalCache(str(tmp_path / "legacy"), max_bytes=10**9)
+    for aid in (a, b, c):
+        legacy.get_json(session, url(aid))
+    os.remove(os.path.join(legacy.directory, "lru-index"))
+    for t, aid in enumerate((c, a, b)):
+        os.utime(legacy._path(url(aid), None), (1_000_000 + t, 1_000_000 + t))
+    ConditionalCache(legacy.directory, max_bytes=full - 1)
+    assert not os.path.exists(legacy._path(url(c), None))
+    assert all(os.path.exists(legacy._path(url(x), None)) for x in (a, b))
+
+
+def test_gamelog_parse_tolerates_malformed_rows():
+    data = {
+        "labels": ["MIN", "3PT", "REB", "PTS"],
+        "events": {
+            "1": {"gameDate": "2025-03-01T00:30Z", "opponent": {"displayName": "A"}},
+            "2": {"gameDate": "2025-03-03T00:30Z", "opponent": {"displayName": "B"}},
+            "3": {"gameDate": None},
+        },
+        "seasonTypes": [{"displayName": "2024-25 Regular Season", "categories": [{"events": [
+            {"eventId": "1", "stats": ["30", "2-5", "7", "18"]},
+            {"eventId": "2", "stats": ["DNP", "--", None]},      # junk cells, short row
+            {"eventId": "1", "stats": ["1", "1-1", "1", "1"]},   # duplicate, first wins
+            {"eventId": "3", "stats": ["20", "0-1", "3", "9"]},  # no date, dropped
+        ]}]}],
+    }
+    df = NBAFetcher()._parse_gamelog(data, num_games=None)
+    assert list(df["GAME_ID"]) == ["2", "1"]
+    assert list(df["MIN"]) == [0.0, 30.0]
+    assert list(df["FG3M"]) == [0.0, 2.0]
+    assert list(df["PTS"]) == [0.0, 18.0]
+    assert list(df["AST"]) == [0.0, 0.0]
+
+
+def test_analyze_slate_matches_analyze_player(server):
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    analyzer = NBAAnalyzer(num_games=10)
+    logs, _ = fetcher.get_player_stats_many(_players(server.league), num_games=15)
+    lines = {'PTS': 14.5, 'REB': 5.5, 'AST': 3.5, 'BLK': 0.5, 'STL': 1.5, 'FG3M': 1.5}
+    slate = {
+        name: (df, {stat: {'line': line, 'over_price': -115, 'under_price': 105} for stat, line in lines.items()})
+        for name, df in logs.items()
+    }
+    # a flat series and a short log exercise the zero-variance and no-trend branches
+    first = next(iter(slate))
+    slate[first][0]['STL'] = 1.0
+    slate['Short Log'] = (slate[first][0].head(4), slate[first][1])
+
+    expected = {name: analyzer.analyze_player(df, name, props) for name, (df, props) in slate.items()}
+    actual, errors = analyzer.analyze_slate(slate)
+    assert not errors
+    assert actual == expected
+    assert analyzer.analyze_slate({}) == ({}, {})
+
+
+def test_ladder_scores_pick_side_like_analyze_player(server):
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    analyzer = NBAAnalyzer(num_games=10)
+    raw = OddsFetcher(api_key="test", base_url=server.url).get_all_player_props(markets=["player_points", "player_assists"])
+    simple, ladders = convert_to_simple_format(raw), convert_to_ladder_format(raw)
+    names = list(raw)[:6]
+    ids = {p['name']: p['id'] for p in server.league.players.values()}
+    logs, _ = fetcher.get_player_stats_many({n: ids[n] for n in names})
+
+    for name in names:
+        expected = analyzer.analyze_player(logs[name], name, simple[name])
+        # A ladder holding only the pick-side consensus offer must score exactly like analyze_player
+        only_pick = {
+            p['stat_type']: [{'line': p['line'], 'side': p['pick'].title(), 'price': p['price'], 'bookmaker': 'x'}]
+            for p in expected
+        }
+        single = analyzer.analyze_ladder({name: (logs[name], only_pick)})[0][name]
+        for exp, got in zip(expected, single):
+            scored = {k: v for k, v in exp.items() if k not in ('over_price', 'under_price')}
+            assert {k: got[k] for k in scored} == scored
+
+        full = {p['stat_type']: p for p in analyzer.analyze_ladder({name: (logs[name], ladders[name])})[0][name]}
+        for exp in expected:
+            got = full[exp['stat_type']]
+            assert got['ev'] >= exp['ev']
+            assert got['offers_evaluated'] == len(ladders[name][got['stat_type']])
+
+
+def test_simulation_models_are_seeded_and_sane():
+    analyzer = NBAAnalyzer(num_games=10, model='negbin', draws=4000, seed=11)
+    logs = pd.DataFrame({'BLK': [0.0, 1, 0, 2, 0, 0, 1, 3, 0, 1], 'PTS': [20.0] * 10})
+    first = analyzer.calculate_confidence(logs, 0.5, 'BLK')
+    assert first == analyzer.calculate_confidence(logs, 0.5, 'BLK')
+    # 5 of 10 games over 0.5 blocks; every model should land near even odds
+    for model in ('normal', 'bootstrap', 'negbin'):
+        p = analyzer.calculate_confidence_batch(
+            analyzer.stat_matrix([logs])[0], [10], [[np.nan, np.nan, np.nan, 0.5, np.nan, np.nan, np.nan]], model=model
+        )['p_over'][0, 3]
+        assert 0.35 < p < 0.75
+    # Resampling a flat 20-point scorer's own games never goes under 19.5
+    assert analyzer.calculate_confidence(logs, 19.5, 'PTS', model='bootstrap')['pick'] == 'OVER'
+
+
+def _season(tmp_path, players_per_team=2, history=12):
+    """A stored synthetic season plus a PTS/AST snapshot for every game played."""
+    league = SyntheticLeague(games=1, players_per_team=players_per_team, history=history)
+    store = GameLogStore(str(tmp_path / "gamelogs.sqlite"))
+    fetcher = NBAFetcher()
+    for aid in league.players:
+        store.merge(aid, fetcher._parse_gamelog(league.gamelog(aid), None))
+    frame = store.load_all()
+    frame["DATE"] = frame["GAME_DATE"].dt.tz_convert(SLATE_TZ).dt.strftime("%Y-%m-%d")
+
+    snapshots = {}
+    for rec in frame.itertuples():
+        snapshots.setdefault(rec.DATE, {})[rec.ATHLETE_ID] = {'name': str(rec.ATHLETE_ID), 'props': {
+            'PTS': {'line': 10.5, 'over_price': -110, 'under_price': -110},
+            'AST': {'line': 2.0, 'over_price': 120, 'under_price': -140},
+        }}
+    return frame, snapshots
+
+
+def test_backtest_uses_only_prior_games_and_pool_matches_serial(tmp_path):
+    frame, snapshots = _season(tmp_path)
+    logs = SharedGameLogs.from_frame(frame)
+    try:
+        aid, date = frame["ATHLETE_ID"].iloc[0], frame["DATE"].iloc[6]
+        start, end = day_bounds(date)
+        assert len(logs.window(aid, start, 10)) == 6
+        assert logs.game_on(aid, start, end)[0] == frame["PTS"].iloc[6]
+
+        serial = run_backtest(logs, snapshots)
+        assert serial == run_backtest(logs, snapshots, workers=2)
+    finally:
+        logs.close()
+
+    # The first five dates don't have enough history yet
+    assert {p['date'] for p in serial} == set(sorted(snapshots)[5:])
+    assert {p['result'] for p in serial} <= {'win', 'loss', 'push'}
+    assert report(serial)['all']['graded'] == len(serial)
+
+
+def test_attaching_to_shared_game_logs_leaves_the_block_to_its_creator(tmp_path):
+    frame, _ = _season(tmp_path)
+    logs = SharedGameLogs.from_frame(frame)
+    try:
+        # An unrelated process has its own resource tracker: if attaching registered
+        # the block, that tracker would warn about a leak and unlink it on exit
+        code = f"from src.backtest import SharedGameLogs; SharedGameLogs.attach({logs.spec()!r}).close()"
+        done = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True)
+        assert "leaked" not in done.stderr
+        attached = SharedGameLogs.attach(logs.spec())
+        assert attached.stats[0, 0] == logs.stats[0, 0]
+        attached.close()
+    finally:
+        logs.close()
+
+
+def test_sweep_scores_match_full_backtest(tmp_path):
+    frame, snapshots = _season(tmp_path, players_per_team=3, history=16)
+    logs = SharedGameLogs.from_frame(frame)
+    combos = [{'num_games': 10}, {'num_games': 6, 'trend_weight': 0.4, 'consistency_floor': 0.1, 'trend_baseline': 0.9}]
+    try:
+        features = precompute(logs, snapshots, [6, 10])
+        expected = [report(run_backtest(logs, snapshots, {**c, 'top_n': 3})) for c in combos]
+    finally:
+        logs.close()
+
+    table = run_sweep(features, combos, top_n=3)
+    for combo, rep in zip(combos, expected):
+        row = table[table['num_games'] == combo['num_games']].iloc[0]
+        assert (row['log_loss'], row['hit_rate']) == (rep['all']['log_loss'], rep['all']['hit_rate'])
+        assert (row['picks'], row['roi']) == (rep['ranked']['graded'], rep['ranked']['roi'])
+
+
+def test_parlay_search_finds_exhaustive_top_k_and_uses_co_occurrence():
+    rng = np.random.default_rng(3)
+    games = [str(g) for g in range(20)]
+    scoring = rng.poisson(20, 20).astype(float)
+    logs = {
+        # points and assists move together; the third player is unrelated
+        'A': pd.DataFrame({'GAME_ID': games, 'PTS': scoring, 'AST': scoring / 4}),
+        'B': pd.DataFrame({'GAME_ID': games, 'PTS': rng.poisson(15, 20).astype(float)}),
+    }
+    preds = []
+    for i, (name, stat, line) in enumerate([('A', 'PTS', 19.5), ('A', 'AST', 4.5), ('B', 'PTS', 14.5)] * 3):
+        preds.append({'player_name': name if i < 3 else f"{name}{i}", 'stat_type': stat, 'line': line,
+                      'pick': 'OVER', 'confidence': 50.0 + i, 'payout': 0.9 + 0.05 * i, 'price': -110,
+                      'event_id': 'e1'})
+    logs.update({p['player_name']: logs[p['player_name'][0]] for p in preds})
+
+    parlays, stats = build_parlays(preds, logs, top_k=5, max_legs=3)
+    assert stats['complete'] and stats['pruned'] > 0
+
+    # every 2-3 leg combination, joint probability built up in the search's leg order
+    index = {}
+    legs = sorted((_Leg(p, *_bitsets(p, logs[p['player_name']], index)) for p in preds), key=lambda leg: -leg.gain)
+    evs = []
+    for size in (2, 3):
+        for combo in itertools.combinations(legs, size):
+            p, decimal, played, hits = combo[0].p, combo[0].decimal, combo[0].played, combo[0].hits
+            for leg in combo[1:]:
+                p *= min(1.0, leg.p * conditional_lift(played, hits, leg))
+                decimal, played, hits = decimal * leg.decimal, played & leg.played, hits & leg.hits
+            evs.append(round(p * decimal - 1.0, 4))
+    assert [p['ev'] for p in parlays] == sorted(evs, reverse=True)[:5]
+
+    both = build_parlays(preds[:2], logs, max_legs=2)[0][0]
+    assert both['probability'] > both['independent_probability']
+
+
+def test_parlay_arguments_are_validated(app):
+    pred = {'player_name': 'A', 'stat_type': 'PTS', 'line': 19.5, 'pick': 'OVER', 'confidence': 60.0,
+            'payout': 0.9, 'price': -110, 'event_id': 'e1'}
+    for kwargs in ({'top_k': 0}, {'top_k': -1}, {'min_legs': 0}, {'min_legs': 3, 'max_legs': 2}):
+        with pytest.raises(ValueError):
+            build_parlays([pred], {}, **kwargs)
+    # A one-leg event is a valid (single) parlay once min_legs allows it
+    parlays, _ = build_parlays([pred, {**pred, 'event_id': 'e2', 'player_name': 'B'}, {**pred, 'stat_type': 'AST'}],
+                               {}, min_legs=1, max_legs=2)
+    assert sorted(len(p['legs']) for p in parlays) == [1, 1, 1, 2]
+
+    client = app.app.test_client()
+    for query in ('limit=0', 'limit=-3', 'legs=1', 'limit=ten'):
+        response = client.get(f'/api/parlays?{query}')
+        assert response.status_code == 400 and not response.get_json()['success']
+
+
+def test_picks_index_matches_filter_and_rank():
+    analyzer = NBAAnalyzer()
+    rng = np.random.default_rng(5)
+    preds = [{'player_name': f"Jaren Jackson Jr{'.' if i % 2 else ''} {i % 7}", 'stat_type': ['PTS', 'REB', 'AST'][i % 3],
+              'pick': ['OVER', 'UNDER', 'N/A'][i % 5 % 3], 'confidence': float(rng.integers(40, 90)),
+              'ev': None if i % 11 == 0 else round(float(rng.choice([-0.1, 0.0, 0.05, 0.05, 0.2])), 4)}
+             for i in range(200)]
+    index = PicksIndex(preds)
+    for stat_type, pick, min_ev, min_confidence, top_n in itertools.product(
+            [None, 'PTS', 'BLK'], [None, 'OVER', 'UNDER'], [0.0, 0.05, -1.0], [0.0, 60.0], [5, 0, -3, 500]):
+        filtered = [p for p in preds if (not stat_type or p['stat_type'] == stat_type) and (not pick or p['pick'] == pick)]
+        assert index.top(stat_type, pick, min_ev, min_confidence, top_n) == \
+            analyzer.rank_picks(filtered, min_ev=min_ev, min_confidence=min_confidence, top_n=top_n)
+    assert index.player('jaren jackson jr 3') == [p for p in preds if p['player_name'].endswith(' 3')]
+    assert index.player('nobody') == []
+
+
+def test_summary_aggregates_cover_every_prediction():
+    preds = [{'player_name': f"P{i}", 'stat_type': ['PTS', 'AST'][i % 2], 'pick': ['OVER', 'UNDER'][i % 3 % 2],
+              'confidence': [50, 65, 74.9, 75, 90][i % 5], 'ev': None if i % 7 == 0 else (i % 9 - 4) / 10,
+              'event_id': str(i % 3), 'team': None if i % 4 == 0 else f"T{i % 6}"} for i in range(60)]
+    summary = summarize(preds, players_analyzed=12)
+    assert summary['total_picks'] == 60 and summary['players_analyzed'] == 12
+    assert summary['average_confidence'] == round(sum(p['confidence'] for p in preds) / 60, 1)
+    assert summary['high_confidence_picks'] == sum(p['confidence'] >= 75 for p in preds)
+    assert summary['medium_confidence_picks'] == sum(65 <= p['confidence'] < 75 for p in preds)
+    assert summary['stat_breakdown'] == {'PTS': 30, 'AST': 30}
+    assert sum(summary['ev_histogram'].values()) == sum(p['ev'] is not None for p in preds)
+    for dimension in ('by_event', 'by_team', 'by_pick'):
+        rollups = summary[dimension].values()
+        assert sum(r['count'] for r in rollups) == 60
+        assert sum(r['positive_ev_picks'] for r in rollups) == summary['positive_ev_picks']
+    assert 'N/A' in summary['by_team']
+
+
+def test_single_flight_coalesces_concurrent_callers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def build():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return ['pick']
+
+    with ThreadPoolExecutor(8) as pool:
+        leader = pool.submit(flight.do, 'picks:2025-01-14', build)
+        started.wait(5)
+        followers = [pool.submit(flight.do, 'picks:2025-01-14', build) for _ in range(7)]
+        while flight.stats()['coalesced'] < 7:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(runs) == 1
+    assert results[0] == (['pick'], False) and all(r == (['pick'], True) for r in results[1:])
+    assert results[1][0] is results[0][0]
+    stats = flight.stats()
+    assert (stats['executions'], stats['coalesced'], stats['in_flight']) == (1, 7, [])
+
+    # A failed build raises and releases the key, so the next call runs again
+    with pytest.raises(RuntimeError):
+        flight.do('k', lambda: (_ for _ in ()).throw(RuntimeError("odds down")))
+    assert flight.do('k', lambda: 2) == (2, False)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'kv'])
+def test_shared_cache_backends_version_and_round_trip(backend, tmp_path, server):
+    def make():
+        if backend == 'memory':
+            return shared
+        if backend == 'sqlite':
+            return SQLiteCache(str(tmp_path / 'shared.sqlite'))
+        return KVCache(server.kv_url)
+    shared = InProcessCache()
+    builder, reader = make(), make()
+
+    logs = pd.DataFrame({'GAME_ID': ['401', '402'], 'GAME_DATE': pd.to_datetime(['2025-01-12', '2025-01-10']),
+                         'PTS': [31.0, np.float64(24.0)]})
+    value = {'data': [{'player_name': 'A', 'ev': np.float64(0.12), 'line': 24.5}], 'game_logs': {'A': logs}}
+
+    assert reader.get('picks') is None
+    first = builder.publish('picks', value, ttl=600)
+    entry = reader.get('picks')
+    assert entry.version == first.version == 1 and entry.ttl == 600
+    assert entry.value['data'] == [{'player_name': 'A', 'ev': 0.12, 'line': 24.5}]
+    pd.testing.assert_frame_equal(materialize(entry.value['game_logs'])['A'], logs)
+
+    # Polling with the version already held returns nothing until a newer publish
+    assert reader.get('picks', since=1) is None
+    assert builder.publish('picks', {'data': []}, ttl=60).version == 2
+    newer = reader.get('picks', since=1)
+    assert newer.version == 2 and newer.value == {'data': []}
+    assert reader.stats()['not_modified'] == 1
+
+    # Concurrent publishers each get their own version and the last one wins whole
+    with ThreadPoolExecutor(4) as pool:
+        versions = list(pool.map(lambda i: make().publish('picks', {'data': [i]}, ttl=60).version, range(8)))
+    assert sorted(versions) == list(range(3, 11))
+    last = reader.get('picks')
+    assert last.version == 10 and last.value == {'data': [versions.index(10)]}
+
+
+def test_shared_cache_backend_missing_an_override_fails_when_created():
+    from src.shared_cache import _Backend
+
+    class ReadOnly(_Backend):
+        def get(self, key, since=None):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnly()
+
+
+def test_odds_diff_recomputes_only_moved_props_and_matches_full_rebuild(server):
+    fetcher = NBAFetcher(base_url=server.url, web_base_url=server.url)
+    analyzer = NBAAnalyzer(num_games=10)
+    before = OddsFetcher(api_key="test", base_url=server.url).get_all_player_props(markets=["player_points", "player_assists"])
+    names = list(before)[:8]
+    before = {n: before[n] for n in names}
+    ids = {p['name']: p['id'] for p in server.league.players.values()}
+    logs, _ = fetcher.get_player_stats_many({n: ids[n] for n in names})
+
+    def full(raw):
+        props = convert_to_simple_format(raw)
+        results, _ = analyzer.analyze_slate({n: (logs[n], props[n]) for n in raw})
+        return results
+
+    after = copy.deepcopy(before)
+    after[names[0]]['props']['PTS'][0]['price'] -= 20        # a price moved
+    after[names[1]]['props']['AST'][0]['line'] += 1.0        # a line moved
+    after[names[2]]['props']['AST'][0]['bookmaker'] = 'x'    # same numbers, different book
+    del after[names[3]]['props']['PTS']                      # market pulled
+    del after[names[4]]                                      # player gone
+    after[names[5]]['commence_time'] = '2030-01-01T00:00:00Z'
+
+    diff = OddsDiff(before, after)
+    assert diff.changed == {(names[0], 'PTS'), (names[1], 'AST'), (names[2], 'AST')}
+    assert diff.removed == {(names[3], 'PTS'), (names[4], 'PTS'), (names[4], 'AST')}
+    assert diff.new_players == {names[5]} and diff.dirty(names[5]) is None
+    assert diff.dirty(names[6]) == set() and OddsDiff(after, after).stats()['changed'] == 0
+
+    previous = group_predictions([p for preds in full(before).values() for p in preds])
+    props = convert_to_simple_format(after)
+    pending = {}
+    for n in after:
+        stats = diff.dirty(n)
+        if stats is None or stats:
+            pending[n] = (logs[n], {s: v for s, v in props[n].items() if stats is None or s in stats})
+    assert sum(len(p) for _, p in pending.values()) == 5
+    recomputed, _ = analyzer.analyze_slate(pending)
+    merged = {n: merge_predictions(n, props[n], recomputed.get(n, []), previous, diff.dirty(n)) for n in after}
+    assert merged == full(after)
+
+
+def test_line_history_stores_only_changes_and_replays_snapshots(server, tmp_path):
+    first = OddsFetcher(api_key="test", base_url=server.url).get_all_player_props(markets=["player_points", "player_assists"])
+    names = list(first)
+    ids = {p['name']: p['id'] for p in server.league.players.values()}
+    path = str(tmp_path / 'lines.sqlite')
+    store = LineHistoryStore(path)
+    listed = sum(len(offers) for d in first.values() for offers in d['props'].values())
+
+    assert store.append(first, ts=1_000, player_ids=ids)['changes'] == listed
+    assert store.append(first, ts=1_300)['changes'] == 0
+
+    moved = copy.deepcopy(first)
+    moved[names[0]]['props']['PTS'][0]['price'] -= 10
+    moved[names[0]]['props']['PTS'][1]['line'] += 1.0
+    withdrawn = len(moved[names[1]]['props'].pop('AST'))
+    # Reopening keeps deduplicating against what is on disk
+    store = LineHistoryStore(path)
+    assert store.append(moved, ts=1_600)['changes'] == 2 + withdrawn
+
+    changes = list(store.history(player=names[0], stat_type='PTS', start=1_500))
+    assert [c['ts'] for c in changes].count(1_600) == 2
+    assert len(changes) == len(first[names[0]]['props']['PTS']) + 2 and changes[0]['ts'] == 1_000
+    gone = [c for c in store.history(player=names[1], stat_type='AST', start=1_600) if c['ts'] == 1_600]
+    assert len(gone) == withdrawn and all(c['line'] is None for c in gone)
+    event = first[names[0]]['event_id']
+    assert {c['player_name'] for c in store.history(event_id=event)} == \
+        {n for n, d in first.items() if d['event_id'] == event}
+
+    assert store.snapshot_at(1_599) == first and store.snapshot_at(1_600) == moved
+    assert store.snapshot_at(999) == {}
+
+    closing = store.closing_snapshots()
+    slate = {pid: entry for day in closing.values() for pid, entry in day.items()}
+    expected = convert_to_simple_format(moved)
+    assert {entry['name'] for entry in slate.values()} == set(moved)
+    assert all(entry['props'] == expected[entry['name']] for entry in slate.values())
+    stats = store.stats()
+    assert stats['snapshots'] == 3 and stats['changes_stored'] == listed + 2 + withdrawn
+
+
+def test_refresh_scheduler_tiers_and_quota_pressure():
+    now = datetime(2025, 1, 15, 18, tzinfo=timezone.utc)
+    hours = (0.5, 2, 5, 10, 20)
+    events = [{'event_id': str(h), 'commence_time': (now + timedelta(hours=h)).isoformat()} for h in hours]
+    events += [{'event_id': 'live', 'commence_time': (now - timedelta(minutes=5)).isoformat()},
+               {'event_id': 'tbd', 'commence_time': None}]
+    markets = ['player_points']
+
+    # Quota unknown: plain tiers, nothing for games already under way
+    scheduler = RefreshScheduler(QuotaTracker())
+    expected = {'0.5': 900, '2': 1800, '5': 3600, '10': 10800, '20': MAX_REFRESH_SECONDS,
+                'live': None, 'tbd': MAX_REFRESH_SECONDS}
+    assert scheduler.intervals(events, markets, now) == expected
+    assert scheduler.pressure == 1.0
+    last_fetched = {'2': now - timedelta(seconds=1000), '5': now - timedelta(seconds=4000)}
+    due = scheduler.due_events(events, markets, last_fetched, now)
+    assert [e['event_id'] for e in due] == ['0.5', '5', '10', '20', 'tbd']
+    assert scheduler.next_refresh_seconds(events, markets, now) == 900
+
+    # Refreshing every event at its tier until tip-off costs more than today's budget:
+    # every interval stretches by the same factor
+    scheduler = RefreshScheduler(QuotaTracker(daily_budget=10))
+    intervals = scheduler.intervals(events, markets, now)
+    projected = sum(max(1.0, h * 3600 / expected[str(h)]) for h in hours)
+    assert scheduler.pressure == pytest.approx(projected / 10)
+    assert intervals['0.5'] == pytest.approx(900 * projected / 10)
+    assert intervals['20'] == MAX_REFRESH_SECONDS and intervals['live'] is None
+
+    # Budget spent: nothing is due until tomorrow
+    tracker = QuotaTracker(daily_budget=10)
+    tracker.record({'x-requests-remaining': '90', 'x-requests-used': '10', 'x-requests-last': '10'},
+                   'event_odds', markets)
+    scheduler = RefreshScheduler(tracker)
+    assert set(scheduler.intervals(events, markets, now).values()) == {None}
+    assert scheduler.pressure == float('inf')
+    assert scheduler.due_events(events, markets, {}, now) == []
+    assert scheduler.next_refresh_seconds(events, markets, now) == MAX_REFRESH_SECONDS
+    assert scheduler.stats()['paused']
+
+
+def test_failed_event_fetch_keeps_last_props_and_tipped_off_games_drop(server, monkeypatch):
+    markets = ["player_points"]
+    fetcher = OddsFetcher(api_key="test", base_url=server.url)
+    before = fetcher.get_all_player_props(markets=markets)
+    assert before
+
+    # Every event-odds request fails (404): the previous props are still served
+    with monkeypatch.context() as m:
+        m.setattr(server.league, 'event_odds', lambda event_id, markets: None)
+        assert fetcher.get_all_player_props(markets=markets, use_schedule=False) == before
+        assert fetcher.last_fetch_stats['events_failed'] == server.league.games
+
+        # Nothing cached yet: the events stay unpriced rather than priced with no players
+        fresh = OddsFetcher(api_key="test", base_url=server.url)
+        assert fresh.get_all_player_props(markets=markets) == {}
+        assert fresh._event_cache == {}
+    # ... and are due again on the next refresh
+    assert fresh.get_all_player_props(markets=markets) == before
+
+    # Once the games tip off their props stop being served and leave the cache
+    server.league.now -= timedelta(hours=4)
+    assert fetcher.get_all_player_props(markets=markets) == {}
+    assert fetcher._event_cache == {}
+
+
+def _pick(player):
+    return {'player_name': player, 'stat_type': 'PTS', 'pick': 'OVER', 'confidence': 70, 'ev': 0.1,
+            'event_id': '1', 'team': 'T'}
+
+
+def _cached_build(app, data, age):
+    """Publish a build of `data` and backdate it `age` seconds past its TTL."""
+    snapshot = app._publish_picks({'data': data, 'raw_odds': {'p': {}}, 'game_logs': {'p': data},
+                                   'player_ids': {}, 'slate': None, 'config': None}, 600)
+    app.picks_cache['timestamp'] = snapshot['timestamp'] - timedelta(seconds=600 + age)
+
+
+def test_stale_picks_are_served_while_one_background_refresh_runs(app, monkeypatch):
+    release, builds = threading.Event(), []
+
+    def build(full=False):
+        builds.append(full)
+        release.wait(5)
+        return app._publish_picks({'data': [_pick('new')], 'raw_odds': {}, 'game_logs': {'p': [_pick('new')]},
+                                   'player_ids': {}, 'slate': None, 'config': None}, 600)
+
+    monkeypatch.setattr(app, '_build_picks', build)
+    _cached_build(app, [_pick('old')], age=60)
+
+    with ThreadPoolExecutor(8) as pool:
+        served = list(pool.map(lambda _: app._current_picks(), range(8)))
+    assert all(s['data'] == [_pick('old')] and s['game_logs'] == {'p': [_pick('old')]} for s in served)
+    assert app.picks_refresh['count'] == 1 and app._freshness()['refreshing']
+
+    release.set()
+    app.picks_refresh['thread'].join(5)
+    assert builds == [False]
+    assert app.generate_all_picks() == ([_pick('new')], {})
+    assert not app._freshness()['stale'] and not app._freshness()['refreshing']
+
+
+def test_picks_past_max_stale_are_rebuilt_before_serving(app, monkeypatch):
+    built = []
+    monkeypatch.setattr(app, '_build_picks', lambda full=False: built.append(full) or app._publish_picks(
+        {'data': [_pick('new')], 'raw_odds': {}, 'game_logs': {}, 'player_ids': {}, 'slate': None, 'config': None}, 600))
+
+    _cached_build(app, [_pick('old')], age=app.PICKS_MAX_STALE + 1)
+    assert app.generate_all_picks() == ([_pick('new')], {})
+    assert built == [False] and app.picks_refresh['count'] == 0
+
+    # With stale-while-revalidate off every expired cache is rebuilt first
+    monkeypatch.setattr(app, 'PICKS_STALE_WHILE_REVALIDATE', False)
+    _cached_build(app, [_pick('old')], age=1)
+    assert app.generate_all_picks() == ([_pick('new')], {})
+    assert len(built) == 2 and app.picks_refresh['count'] == 0
+
+
+def test_unresolved_player_ids_are_looked_up_again_on_the_next_build(app, monkeypatch):
+    now = datetime.now(timezone.utc)
+    logs = GameLog.from_rows({'GAME_ID': str(i), 'GAME_DATE': now - timedelta(days=2 * i + 1), 'MATCHUP': 'ATL vs. BOS',
+                              'MIN': 30.0, 'PTS': 20.0 + i, 'REB': 5.0, 'AST': 4.0, 'BLK': 1.0, 'STL': 1.0,
+                              'FG3M': 2.0} for i in range(10))
+    lines = [{'name': side, 'line': 19.5, 'price': -110} for side in ('Over', 'Under')]
+
+    class Odds:
+        def get_all_player_props(self):
+            return {'New Guy': {'event_id': 'e1', 'props': {'PTS': copy.deepcopy(lines)}}}
+
+        def next_refresh_seconds(self):
+            return 600
+
+    class Fetcher:
+        fetch_stats = {}
+        lookups = []
+
+        def find_player_id(self, name, active_players):
+            self.lookups.append(name)
+            return None
+
+        def get_player_stats_many(self, players, **kwargs):
+            return {name: logs for name in players}, {}
+
+    active = []
+    monkeypatch.setattr(app, '_get_cached_active_players', lambda: active)
+    monkeypatch.setitem(app._services, 'fetcher', Fetcher())
+    monkeypatch.setitem(app._services, 'odds_fetcher', Odds())
+
+    first = app._build_picks()
+    assert first['data'] == [] and first['player_ids'] == {} and Fetcher.lookups == ['New Guy']
+
+    # The active-player list has since picked him up: the incremental build resolves him
+    active.append({'name': 'New Guy', 'id': 7, 'team': 'ATL'})
+    second = app._build_picks()
+    assert second['player_ids'] == {'New Guy': 7}
+    assert {p['player_name'] for p in second['data']} == {'New Guy'}
+
+
+def test_build_without_props_replaces_the_whole_snapshot(app, monkeypatch):
+    from src.analyzer import NBAAnalyzer
+    with StandInServer(SyntheticLeague(games=0)) as empty:
+        monkeypatch.setitem(app._services, 'fetcher', NBAFetcher(base_url=empty.url, web_base_url=empty.url))
+        monkeypatch.setitem(app._services, 'analyzer', NBAAnalyzer())
+        monkeypatch.setitem(app._services, 'odds_fetcher', OddsFetcher(api_key="test", base_url=empty.url))
+        _cached_build(app, [_pick('old')], age=app.PICKS_MAX_STALE + 1)
+
+        assert app.generate_all_picks() == ([], {})
+        snapshot = app._snapshot()
+        assert snapshot['game_logs'] == {} and snapshot['slate'] is None
+        assert snapshot['index'].predictions is snapshot['data'] and snapshot['summary'][0] is snapshot['data']
+        assert app.shared_cache.get('picks').value['data'] == []
+
+        # The empty build is cached like any other
+        listed = empty.requests['events']
+        assert app.generate_all_picks() == ([], {})
+        assert empty.requests['events'] == listed
+
+
+@pytest.mark.parametrize("modules, unloaded", [
+    # What app.py imports eagerly
+    ("src.env, src.names, src.odds_diff, src.picks_index, src.picks_summary, src.shared_cache, "
+     "src.single_flight, src.rate_limiter", ("pandas", "numpy", "requests")),
+    # The picks pipeline with GAMELOG_FORMAT=records
+    ("src.fetcher, src.gamelog_store, src.analyzer, src.parlay, src.records", ("pandas",)),
+])
+def test_modules_leave_pandas_unloaded(modules, unloaded):
+    # A fresh interpreter, since this one has pandas loaded
+    code = f"import sys, {modules}; print(sorted(m for m in {unloaded!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
+
+
+@pytest.mark.parametrize("log_format", ["frame", "records"])
+def test_players_out_over_a_week_count_as_inactive(log_format, app):
+    fetcher = NBAFetcher(log_format=log_format)
+    now = datetime.now(timezone.utc)
+    for days_ago, inactive in ((0, False), (10, True)):
+        league = SyntheticLeague(players_per_team=1, history=10, now=now - timedelta(days=days_ago))
+        logs = fetcher._parse_gamelog(league.gamelog(next(iter(league.players))), 10)
+        days_out = app._days_since_last_game(logs)
+        # The league's most recent game was the evening before its `now`
+        assert days_out in (days_ago, days_ago + 1)
+        assert (days_out > 7) == inactive